@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""How many bytes does an agent (player or puck) take?
+
+Creates a bunch of worlds side by side and measures (with tracemalloc) the memory allocated for them.
+To compare with the representation of agents of another revision (eg, cb8a881, before agents were compacted),
+give it with -b: it is checked out in a temporary git worktree, measured there, and both figures are printed.
+
+> python -m benchmarks.agent_memory -w <how_many_worlds> -p <players_per_team> [-b <revision>]
+
+"""
+
+import getopt
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from hockey.core.ice_surface.no_obstacles import IceNxN
+
+
+def show_options():
+    print("To measure memory of agents, do:")
+    print("> python -m benchmarks.agent_memory -w <how_many_worlds> -p <players_per_team> [-b <revision>]")
+
+def bytes_per_agent(how_many_worlds: int, players_per_team: int, batch_physics: bool) -> float:
+    """Average number of bytes allocated per agent (world overhead included)."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    # (older revisions have no batch physics: the argument is only given when it is used)
+    extra_args = {'batch_physics': True} if batch_physics else {}
+    worlds = [IceNxN(width=10, height=10,
+                     how_many_defense=players_per_team,
+                     how_many_offense=players_per_team,
+                     **extra_args) for _ in range(how_many_worlds)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    how_many_agents = sum(len(world.schedule.agents) for world in worlds)
+    return (after - before) / how_many_agents
+
+def bytes_of_one_agent(batch_physics: bool) -> int:
+    """Bytes allocated when adding a single player to an existing world."""
+    from hockey.behaviour.core.rule_based_brain import RuleBasedBrain
+    from hockey.core.player.forward import Forward
+    extra_args = {'batch_physics': True} if batch_physics else {}
+    world = IceNxN(width=10, height=10, how_many_defense=0, how_many_offense=1, **extra_args)
+    brain = RuleBasedBrain()
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    player = Forward(hockey_world_model=world, brain=brain)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del player
+    return after - before
+
+def report(how_many_worlds: int, players_per_team: int, batch_physics: bool) -> str:
+    return "[batch physics = %s] %d worlds of %d agents: %.1f bytes per agent (%d bytes for a single player)" % \
+           (batch_physics, how_many_worlds, 2 * players_per_team + 1,
+            bytes_per_agent(how_many_worlds, players_per_team, batch_physics),
+            bytes_of_one_agent(batch_physics))
+
+def report_at_revision(revision: str, how_many_worlds: int, players_per_team: int) -> str:
+    """Same measure (without batch physics), on the code of another revision."""
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        worktree_dir = os.path.join(tmp_dir, "revision")
+        subprocess.run(["git", "-C", repo_dir, "worktree", "add", "--detach", worktree_dir, revision], check=True,
+                       stdout=subprocess.DEVNULL)
+        try:
+            # (this script, measuring the agents of the revision: its code comes first on the path)
+            env = dict(os.environ, PYTHONPATH=worktree_dir)
+            measured = subprocess.run([sys.executable, os.path.abspath(__file__), "-w", str(how_many_worlds),
+                                       "-p", str(players_per_team), "-o"],
+                                      cwd=worktree_dir, env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True)
+        finally:
+            subprocess.run(["git", "-C", repo_dir, "worktree", "remove", "--force", worktree_dir], check=True)
+    return measured.stdout.strip()
+
+def main(argv):
+    how_many_worlds = 100
+    players_per_team = 5
+    revision_opt = None
+    only_without_batch = False
+    try:
+        opts, args = getopt.getopt(argv, "hw:p:b:o", ["worlds=", "players=", "baseline=", "only-objects"])
+    except getopt.GetoptError:
+        show_options()
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            show_options()
+            sys.exit()
+        elif opt in ("-w", "--worlds"):
+            how_many_worlds = int(arg)
+        elif opt in ("-p", "--players"):
+            players_per_team = int(arg)
+        elif opt in ("-b", "--baseline"):
+            revision_opt = arg
+        elif opt in ("-o", "--only-objects"):
+            only_without_batch = True
+    if only_without_batch:
+        print(report(how_many_worlds, players_per_team, batch_physics=False))
+        return
+    if revision_opt is not None:
+        print("Revision %s:" % (revision_opt))
+        print("\t%s" % (report_at_revision(revision_opt, how_many_worlds, players_per_team)))
+        print("This revision:")
+    for batch_physics in [False, True]:
+        print("\t%s" % (report(how_many_worlds, players_per_team, batch_physics)))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
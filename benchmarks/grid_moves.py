@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""How long does it take to move an agent on a discrete space?
+
+Compares mesa's MultiGrid with OccupancyGrid, on the space itself and through a world's move_agent:
+
+> python -m benchmarks.grid_moves -m <how_many_moves> -s <side_of_the_grid>
+
+"""
+
+import getopt
+import sys
+import timeit
+from random import Random
+
+from geometry.point import Point
+from mesa.space import MultiGrid
+
+from hockey.core.ice_surface.no_obstacles import IceNxN
+from hockey.core.ice_surface.occupancy_grid import OccupancyGrid
+
+
+class Token(object):
+    """Something that can be placed on a grid."""
+
+    def __init__(self):
+        self.pos = None
+
+
+def show_options():
+    print("To time moves on grids, do:")
+    print("> python -m benchmarks.grid_moves -m <how_many_moves> -s <side_of_the_grid>")
+
+def random_cells(how_many: int, side: int):
+    rnd = Random(333)
+    return [(rnd.randint(0, side - 1), rnd.randint(0, side - 1)) for _ in range(how_many)]
+
+def secs_per_move_on_space(a_space, cells) -> float:
+    token = Token()
+    a_space.place_agent(token, cells[0])
+    start = timeit.default_timer()
+    for cell in cells:
+        a_space.move_agent(token, cell)
+    return (timeit.default_timer() - start) / len(cells)
+
+def secs_per_move_on_world(occupancy_grid: bool, cells) -> float:
+    side = max(max(cell) for cell in cells) + 1
+    world = IceNxN(width=side, height=side, how_many_defense=0, how_many_offense=1, occupancy_grid=occupancy_grid)
+    player = world.attack[0]
+    points = [Point(x, y) for (x, y) in cells]
+    start = timeit.default_timer()
+    for a_point in points:
+        world.move_agent(player, a_point)
+    return (timeit.default_timer() - start) / len(points)
+
+def main(argv):
+    how_many_moves = 100000
+    side = 10
+    try:
+        opts, args = getopt.getopt(argv, "hm:s:", ["moves=", "side="])
+    except getopt.GetoptError:
+        show_options()
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            show_options()
+            sys.exit()
+        elif opt in ("-m", "--moves"):
+            how_many_moves = int(arg)
+        elif opt in ("-s", "--side"):
+            side = int(arg)
+    cells = random_cells(how_many_moves, side)
+    on_multi_grid = secs_per_move_on_space(MultiGrid(width=side, height=side, torus=False), cells)
+    on_occupancy_grid = secs_per_move_on_space(OccupancyGrid(width=side, height=side), cells)
+    print("[space] MultiGrid: %.3f usecs per move; OccupancyGrid: %.3f usecs per move (x %.1f)" %
+          (on_multi_grid * 1e6, on_occupancy_grid * 1e6, on_multi_grid / on_occupancy_grid))
+    on_multi_grid = secs_per_move_on_world(False, cells)
+    on_occupancy_grid = secs_per_move_on_world(True, cells)
+    print("[world] MultiGrid: %.3f usecs per move; OccupancyGrid: %.3f usecs per move (x %.1f)" %
+          (on_multi_grid * 1e6, on_occupancy_grid * 1e6, on_multi_grid / on_occupancy_grid))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
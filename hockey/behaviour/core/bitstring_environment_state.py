@@ -1,41 +1,32 @@
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from xcs.bitstrings import BitString as XCSBitString, BitCondition
 from geometry.angle import AngleInRadians
+from geometry.point import Point
 from hockey.behaviour.core.environment_state import EnvironmentState
+from hockey.behaviour.core.quantizers import OneHotQuantizer
+from hockey.behaviour.core.sensing_plan import SensingPlan
 
 
-def angle_to_bitstring(can_see: bool, angle_opt: Optional[AngleInRadians], num_slices_on_angles: int) -> XCSBitString:
+@lru_cache(maxsize=None)
+def angle_quantizer(num_slices_on_angles: int) -> OneHotQuantizer:
+    """One bit per slice of [0, Pi]: slice s covers angles up to s*Pi/num_slices_on_angles."""
     assert num_slices_on_angles > 0
-    as_list = []
-    # can I see the puck?
-    can_see_as_int = int(can_see)
-    # angles:
-    # (1) to puck (if I can see puck only! Otherwise I can't evaluate the angle!)
-    match_on_last = False
-    for slice in range(0, num_slices_on_angles + 1):
-        angle_for_slice = slice * AngleInRadians.PI / num_slices_on_angles
-        match_on_this = (angle_opt is not None) and (angle_opt.value <= angle_for_slice)
-        as_list.append(int(match_on_this and not match_on_last) * can_see_as_int)
-        match_on_last = match_on_last or match_on_this
-    return XCSBitString(as_list)
+    return OneHotQuantizer([a_slice * AngleInRadians.PI / num_slices_on_angles for a_slice in range(0, num_slices_on_angles + 1)])
 
-def distance_to_bitstring(can_see: bool, distance_opt: Optional[float], range_distances: List[float]) -> XCSBitString:
+@lru_cache(maxsize=None)
+def distance_quantizer(range_distances: Tuple[float, ...]) -> OneHotQuantizer:
     assert len(range_distances) > 0
-    if distance_opt is None:
-        distance = float("inf")
-    else:
-        distance = distance_opt
-    as_list = []
-    # can I see the puck?
-    can_see_as_int = int(can_see)
-    # (1) to puck (if I can see puck only! Otherwise I can't evaluate the distance!)
-    match_on_last = False
-    for distance_to_evaluate in range_distances:
-        match_on_this = distance <= distance_to_evaluate
-        as_list.append(int(match_on_this and not match_on_last) * can_see_as_int)
-        match_on_last = match_on_last or match_on_this
-    return XCSBitString(as_list)
+    return OneHotQuantizer(list(range_distances))
+
+def angle_to_bitstring(can_see: bool, angle_opt: Optional[AngleInRadians], num_slices_on_angles: int) -> XCSBitString:
+    # angle to puck only if I can see puck! Otherwise I can't evaluate the angle.
+    return angle_quantizer(num_slices_on_angles).bits(None if angle_opt is None else angle_opt.value, valid=can_see)
+
+def distance_to_bitstring(can_see: bool, distance_opt: Optional[float], range_distances: List[float]) -> XCSBitString:
+    # distance to puck only if I can see puck! Otherwise I can't evaluate the distance.
+    return distance_quantizer(tuple(range_distances)).bits(distance_opt, valid=can_see)
 
 def is_closer_than(can_see: bool, distance: float, cmp_distance: float) -> bool:
     return can_see and (distance <= cmp_distance)
@@ -193,15 +184,65 @@ class BitstringEnvironmentState(object):
         return list(map(lambda function_name: int(getattr(self.full_state, function_name)()),
                         BitstringEnvironmentState.bit_fns))
 
+    # compiled plans, by list of bits:
+    compiled_plans = {}
+
+    @classmethod
+    def sensing_plan(cls) -> SensingPlan:
+        """Generated function computing (at once) the same bits as build_defs."""
+        key = tuple(cls.bit_fns)
+        plan = cls.compiled_plans.get(key)
+        if plan is None:
+            plan = SensingPlan(cls.bit_fns)
+            cls.compiled_plans[key] = plan
+        return plan
+
     NUM_SLICES_ON_ANGLES = 20 # how many slices I want to see in [0, Pi]
     DISTANCE_RANGE = list(range(10, 60 + 1, 10)) # distances I want to bitcheck for
 
     def __init__(self, full_state: EnvironmentState):
         self.full_state = full_state
 
+    @classmethod
+    def of(cls, full_state: EnvironmentState) -> 'BitstringEnvironmentState':
+        """Bitstring view of a state; made once, as states are refreshed in place (see Player.sense)."""
+        if full_state.bitstring_state_opt is None:
+            full_state.bitstring_state_opt = cls(full_state=full_state)
+        return full_state.bitstring_state_opt
+
     def as_bitstring(self) -> XCSBitString:
         """Builds a bitstring out of the information sensed by an agent."""
 
-        self.full_state.update()
-        # ok then! Return!
-        return XCSBitString(self.build_defs())
+        # (same bits as 'self.full_state.update(); self.build_defs()', looked up or computed in one go)
+        me = self.full_state.me
+        sensing_table_opt = me.model.sensing_table
+        if (sensing_table_opt is not None) and (sensing_table_opt.bit_fns == self.bit_fns):
+            bits_opt = sensing_table_opt.lookup(me, puck_owner_opt=self.full_state.puck_owner_opt)
+            if bits_opt is not None:
+                return bits_opt
+        return XCSBitString(self.sensing_plan()(me=me, puck_owner_opt=self.full_state.puck_owner_opt))
+
+    def as_canonical_bitstring(self) -> Tuple[XCSBitString, bool]:
+        """
+        Bits of this situation or, if the ice uses symmetry (see SkatingIce.use_symmetry), of its canonical image.
+
+        Returns:
+            (bits, flipped). If flipped, an action chosen on these bits has to be mirrored (see symmetry.mirror_action).
+
+        """
+        me = self.full_state.me
+        symmetry_opt = me.model.symmetry_opt
+        if symmetry_opt is None:
+            return self.as_bitstring(), False
+        sensing_table_opt = me.model.sensing_table
+        if (sensing_table_opt is not None) and (sensing_table_opt.bit_fns == self.bit_fns):
+            found_opt = sensing_table_opt.lookup_canonical(me, puck_owner_opt=self.full_state.puck_owner_opt)
+            if found_opt is not None:
+                return found_opt
+        # (not on a table: the canonical image is sensed from its coordinates; no-one is moved)
+        my_pos, puck_pos = me.pos, me.model.puck.pos
+        my_xy, puck_xy, heading_xy, flipped = symmetry_opt.canonical((my_pos.x, my_pos.y), (puck_pos.x, puck_pos.y), me.looking_at_xy())
+        if not flipped:
+            return self.as_bitstring(), False
+        bits = self.sensing_plan().at(me, self.full_state.puck_owner_opt, pos=Point(*my_xy), heading=heading_xy, puck_pos=Point(*puck_xy))
+        return XCSBitString(bits), True
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""A compact, columnar file format for brains (ie, XCS populations), that can be memory-mapped.
+
+Layout of a file:
+    * MAGIC (8 bytes), format version and header length (2 little-endian uint32).
+    * header: json (rules, bits per condition, actions, parameters of the algorithm, and where each column is).
+    * columns: one raw little-endian array per rule attribute, each starting at a multiple of ALIGNMENT bytes.
+Conditions are (mask, value) rows of uint64 words (see packed_bits); actions are stored as ints.
+Loading a file only reads its header: columns are mapped from disk when first used, and no rule object is built
+until the brain is turned back into a model (see Brain.to_model).
+
+"""
+
+import json
+import pickle
+import struct
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import xcs
+from xcs.bitstrings import BitCondition
+
+from hockey.behaviour.core.action import HockeyAction
+from hockey.behaviour.core.packed_bits import as_bitstring, as_words, how_many_words, pack, pack_condition
+from hockey.behaviour.core.population_index import IndexedClassifierSet, indexed_model
+from util import backends
+
+MAGIC = b'XCSBRAIN'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+__PREAMBLE__ = struct.Struct('<8sII') # magic, version, header length
+
+# rule attribute -> dtype of its column
+RULE_COLUMNS = {
+    'prediction': '<f8', # (the 'average_reward' of a rule)
+    'error': '<f8',
+    'fitness': '<f8',
+    'experience': '<i8',
+    'action_set_size': '<f8',
+    'numerosity': '<i8',
+    'time_stamp': '<i8',
+}
+
+ACTION_TYPES = {'HockeyAction': HockeyAction, 'bool': bool, 'int': int}
+
+
+def __action_type__(action) -> str:
+    if isinstance(action, HockeyAction):
+        return 'HockeyAction'
+    if isinstance(action, bool):
+        return 'bool'
+    if isinstance(action, int) and not isinstance(action, Enum):
+        return 'int'
+    raise ValueError("Don't know how to store action '%s' (of type %s)" % (action, type(action).__name__))
+
+def encode_action(action) -> int:
+    return int(action.value) if isinstance(action, HockeyAction) else int(action)
+
+def decode_action(action_id: int, action_type: str):
+    return ACTION_TYPES[action_type](int(action_id))
+
+def __algorithm_parameters__(algorithm: xcs.XCSAlgorithm) -> Dict[str, Any]:
+    """Parameters of an algorithm that can be stored as json (eg, not its exploration strategy)."""
+    parameters = {}
+    for name, default in vars(type(algorithm)).items():
+        if name.startswith('_') or isinstance(default, property) or callable(default):
+            continue
+        value = getattr(algorithm, name)
+        if (value is None) or isinstance(value, (bool, int, float)):
+            parameters[name] = value
+    return parameters
+
+def __aligned__(offset: int) -> int:
+    return ((offset + ALIGNMENT - 1) // ALIGNMENT) * ALIGNMENT
+
+
+class Brain(object):
+    """The rules of a population, as columns (numpy arrays; memory-mapped if the brain was loaded)."""
+
+    def __init__(self, header: Dict[str, Any], columns: Dict[str, np.ndarray], file_name_opt: Optional[str] = None):
+        self.header = header
+        self.columns = columns # (only the ones already there)
+        self.file_name_opt = file_name_opt
+
+    def __len__(self):
+        return self.header['rules']
+
+    @property
+    def condition_bits(self) -> int:
+        return self.header['condition_bits']
+
+    def column(self, name: str) -> np.ndarray:
+        """A column; if the brain was loaded, it is mapped from the file the first time it's asked for."""
+        if name not in self.columns:
+            where = self.header['columns'][name]
+            shape = tuple(where['shape'])
+            if (self.file_name_opt is None) or (0 in shape):
+                self.columns[name] = np.empty(shape, dtype=where['dtype'])
+            else:
+                self.columns[name] = np.memmap(self.file_name_opt, dtype=where['dtype'], mode='r', offset=where['offset'], shape=shape)
+        return self.columns[name]
+
+    @classmethod
+    def of_model(cls, model: xcs.ClassifierSet) -> 'Brain':
+        rules = list(model)
+        condition_bits = len(rules[0].condition) if len(rules) > 0 else 0
+        possible_actions = sorted(model.possible_actions, key=encode_action)
+        action_types = set(__action_type__(an_action) for an_action in possible_actions)
+        if len(action_types) > 1:
+            raise ValueError("Actions have to be all of the same type (got %s)" % (sorted(action_types)))
+        words = how_many_words(condition_bits)
+        columns = {
+            'condition_mask': np.zeros((len(rules), words), dtype='<u8'),
+            'condition_value': np.zeros((len(rules), words), dtype='<u8'),
+            'action': np.array([encode_action(rule.action) for rule in rules], dtype='<i8'),
+        }
+        for row, rule in enumerate(rules):
+            mask, value = pack_condition(rule.condition)
+            columns['condition_mask'][row] = as_words(mask, condition_bits)
+            columns['condition_value'][row] = as_words(value, condition_bits)
+        columns['prediction'] = np.array([rule.average_reward for rule in rules], dtype=RULE_COLUMNS['prediction'])
+        for name in ['error', 'fitness', 'experience', 'action_set_size', 'numerosity', 'time_stamp']:
+            columns[name] = np.array([getattr(rule, name) for rule in rules], dtype=RULE_COLUMNS[name])
+        header = {
+            'version': FORMAT_VERSION,
+            'rules': len(rules),
+            'condition_bits': condition_bits,
+            'action_type': action_types.pop() if len(action_types) > 0 else 'int',
+            'actions': [encode_action(an_action) for an_action in possible_actions],
+            'time_stamp': model.time_stamp,
+            'algorithm': __algorithm_parameters__(model.algorithm),
+        }
+        return cls(header=header, columns=columns)
+
+    def as_bytes(self) -> bytes:
+        """The whole file."""
+        names = ['condition_mask', 'condition_value', 'action'] + list(RULE_COLUMNS.keys())
+        arrays = [np.ascontiguousarray(self.column(name)) for name in names]
+        header = dict(self.header)
+        # offsets depend on the length of the header, that depends on the offsets: a fixed-width number settles it.
+        header['columns'] = {name: {'dtype': an_array.dtype.str, 'shape': list(an_array.shape), 'offset': 0}
+                             for name, an_array in zip(names, arrays)}
+        header_length = len(json.dumps(header).encode('utf-8')) + len(names) * 20
+        offset = __aligned__(__PREAMBLE__.size + header_length)
+        for name, an_array in zip(names, arrays):
+            header['columns'][name]['offset'] = offset
+            offset = __aligned__(offset + an_array.nbytes)
+        header_bytes = json.dumps(header).encode('utf-8').ljust(header_length)
+        assert len(header_bytes) == header_length
+        chunks = [__PREAMBLE__.pack(MAGIC, FORMAT_VERSION, header_length), header_bytes]
+        position = __PREAMBLE__.size + header_length
+        for name, an_array in zip(names, arrays):
+            chunks.append(b'\0' * (header['columns'][name]['offset'] - position))
+            chunks.append(an_array.tobytes())
+            position = header['columns'][name]['offset'] + an_array.nbytes
+        return b''.join(chunks)
+
+    def save(self, full_file_name: str):
+        with open(full_file_name, 'wb') as f:
+            f.write(self.as_bytes())
+
+    @classmethod
+    def load(cls, full_file_name: str) -> 'Brain':
+        """Reads the header only (columns are mapped when used)."""
+        with open(full_file_name, 'rb') as f:
+            preamble = f.read(__PREAMBLE__.size)
+            if len(preamble) < __PREAMBLE__.size:
+                raise ValueError("'%s' is not a brain file (too short)" % (full_file_name))
+            magic, version, header_length = __PREAMBLE__.unpack(preamble)
+            if magic != MAGIC:
+                raise ValueError("'%s' is not a brain file" % (full_file_name))
+            if version > FORMAT_VERSION:
+                raise ValueError("'%s' has a brain in format %d; I only know up to %d" % (full_file_name, version, FORMAT_VERSION))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        return cls(header=header, columns={}, file_name_opt=full_file_name)
+
+    def conditions(self) -> List[BitCondition]:
+        masks, values = self.column('condition_mask'), self.column('condition_value')
+        return [BitCondition(as_bitstring(self.__as_int__(values[row]), self.condition_bits),
+                             as_bitstring(self.__as_int__(masks[row]), self.condition_bits))
+                for row in range(len(self))]
+
+    @staticmethod
+    def __as_int__(words: Iterable) -> int:
+        return sum(int(a_word) << (64 * w) for w, a_word in enumerate(words))
+
+    def actions(self) -> List:
+        return [decode_action(action_id, self.header['action_type']) for action_id in self.column('action')]
+
+    def to_model(self, algorithm_opt: Optional[xcs.XCSAlgorithm] = None) -> IndexedClassifierSet:
+        """The population (with the parameters of its algorithm, unless one is given)."""
+        algorithm = algorithm_opt
+        if algorithm is None:
+            algorithm = xcs.XCSAlgorithm()
+            for name, value in self.header['algorithm'].items():
+                setattr(algorithm, name, value)
+        possible_actions = [decode_action(action_id, self.header['action_type']) for action_id in self.header['actions']]
+        model = IndexedClassifierSet(algorithm, possible_actions)
+        model._time_stamp = self.header['time_stamp']
+        columns = {name: self.column(name) for name in RULE_COLUMNS}
+        for row, (condition, action) in enumerate(zip(self.conditions(), self.actions())):
+            rule = xcs.XCSClassifierRule(condition, action, algorithm, int(columns['time_stamp'][row]))
+            rule.average_reward = float(columns['prediction'][row])
+            rule.error = float(columns['error'][row])
+            rule.fitness = float(columns['fitness'][row])
+            rule.experience = int(columns['experience'][row])
+            rule.action_set_size = float(columns['action_set_size'][row])
+            rule.numerosity = int(columns['numerosity'][row])
+            model._population.setdefault(condition, {})[action] = rule
+        return model
+
+    def matching(self, situation) -> np.ndarray:
+        """Booleans: which rules match a situation (a bitstring, or a packed one), without building any rule."""
+        packed = situation if isinstance(situation, int) else pack(situation)
+        situation_words = as_words(packed, self.condition_bits)
+        return backends.kernel('match_conditions')(self.column('condition_mask'), self.column('condition_value'), situation_words)
+
+
+def is_brain_file(full_file_name: str) -> bool:
+    """Is it in this format (as opposed to, eg, a pickled model)?"""
+    with open(full_file_name, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def of_pickled_model(data: bytes) -> bytes:
+    """A brain file, out of a pickled model (eg, a snapshot being written in the background)."""
+    return Brain.of_model(pickle.loads(data)).as_bytes()
+
+def load_model(full_file_name: str) -> IndexedClassifierSet:
+    """A model from a brain file, or from a pickled model."""
+    if is_brain_file(full_file_name):
+        return Brain.load(full_file_name).to_model()
+    with open(full_file_name, 'rb') as f:
+        return indexed_model(pickle.load(f))
@@ -1,10 +1,30 @@
 
 from typing import Optional, Tuple
 from geometry.point import Point
-from geometry.angle import AngleInRadians, AngleInDegrees
+from geometry.angle import AngleInRadians
 from core.environment_state import EnvironmentState as CoreEnvironmentState
 from hockey.core.player.base import Player
 from hockey.core.player.forward import Forward
+from util.geometry import predicates
+from hockey.behaviour.core.quantizers import ANGLE_BITS, DISTANCE_BITS, SPEED_BITS, folded_degrees
+
+
+def __bits_angle_to_puck__(angle2puck_opt: Optional[AngleInRadians]) -> Optional[str]:
+    """Bit representation of this angle in DEGREES, with usual semantics (repr[i] is bit i)"""
+    if angle2puck_opt is None:
+        return None
+    return ANGLE_BITS.string(folded_degrees(angle2puck_opt.value))
+
+def __bits_distance_to_puck__(dist_to_puck_opt: Optional[float]) -> Optional[str]:
+    """Returns a bit representation of this distance, with usual semantics (repr[i] is bit i)"""
+    if dist_to_puck_opt is None:
+        return None
+    return DISTANCE_BITS.string(int(round(dist_to_puck_opt)))
+
+def __bits_speed__(speed_in_ft_per_sec: float) -> str:
+    """Returns a bit representation of this speed, with usual semantics (repr[i] is bit i)"""
+    return SPEED_BITS.string(int(round(speed_in_ft_per_sec)))
+
 
 class EnvironmentState(CoreEnvironmentState):
     """
@@ -18,46 +38,16 @@ class EnvironmentState(CoreEnvironmentState):
         self.me = me
         self.puck_owner_opt = puck_owner_opt
         self.puck_pos_opt = puck_pos_opt
+        # (its bitstring view, made once: see BitstringEnvironmentState.of)
+        self.bitstring_state_opt = None
 
-    def update(self):
-        def __bits_angle_to_puck__(angle2puck_opt: Optional[AngleInRadians]) -> Optional[str]:
-            """
-            Returns a bit representation of this angle in DEGREES, with usual semantics (repr[i] is bit i)
-            Args:
-                angle2puck_opt: 
-
-            Returns:
-                the angle in degrees, in binary format.
-
-            """
-            if angle2puck_opt is None:
-                return None
-            degrees = AngleInDegrees.from_radians(angle_in_radians=angle2puck_opt)
-            degrees_value = int(round(degrees.value))
-            # print("radians = %s, degrees = %s (value = %d)" % (angle2puck_opt, degrees, degrees_value))
-            if degrees_value >= 270:
-                return self.__int_to_bits__(an_int=int(round(360-degrees_value)), how_many_bits=7)
-            elif degrees_value <= 90:
-                return self.__int_to_bits__(an_int=int(round(degrees_value)), how_many_bits=7)
-            else:
-                raise RuntimeError("How come %d degrees????" % degrees_value)
-            #
-            # if angle2puck_opt >= AngleInRadians(AngleInRadians.THREE_HALFS_OF_PI):
-            #     return self.__int_to_bits__(an_int=int(round(AngleInRadians.PI * 2 - angle2puck_opt.value)),
-            #                                 how_many_bits=7)
-            # else:  # angle_to_puck_opt <= AngleInRadians(AngleInRadians.PI_HALF):
-            #     return self.__int_to_bits__(an_int=int(round(angle2puck_opt.value)), how_many_bits=7)
-
-        def __bits_distance_to_puck__(dist_to_puck_opt: Optional[float]) -> Optional[str]:
-            """Returns a bit representation of this distance, with usual semantics (repr[i] is bit i)"""
-            if dist_to_puck_opt is None:
-                return None
-            return self.__int_to_bits__(an_int=int(round(dist_to_puck_opt)), how_many_bits=8)
-
-        def __bits_speed__(speed_in_ft_per_sec: float) -> str:
-            """Returns a bit representation of this distance, with usual semantics (repr[i] is bit i)"""
-            return self.__int_to_bits__(an_int=int(round(speed_in_ft_per_sec)), how_many_bits=6)
+    def refresh(self, puck_owner_opt: Optional[Player], puck_pos_opt: Optional[Point]) -> 'EnvironmentState':
+        """In place: the state is sensed again (see Player.sense)."""
+        self.puck_owner_opt = puck_owner_opt
+        self.puck_pos_opt = puck_pos_opt
+        return self
 
+    def update(self):
         self.vector2puck_opt = self.me.vector_me_to_puck_opt()
         self.vector2puck_x_bits_opt = None if self.vector2puck_opt is None else __bits_distance_to_puck__(abs(self.vector2puck_opt.x))
         self.vector2puck_y_bits_opt = None if self.vector2puck_opt is None else __bits_distance_to_puck__(abs(self.vector2puck_opt.y))
@@ -90,13 +80,6 @@ class EnvironmentState(CoreEnvironmentState):
     # ********************************************************************
     # Puck
 
-    def __int_to_bits__(self, an_int: int, how_many_bits: int) -> str:
-        """Returns a bit representation of a number, with usual semantics (repr[i] is bit i)"""
-        result = "{0:b}".format(an_int)[::-1]
-        assert len(result) <= how_many_bits, \
-            "To encode number %d we need %d bits - but %d are allowed" % (an_int, len(result), how_many_bits)
-        return result + ("0" * (how_many_bits - len(result)))
-
     def __bit_i_distance_to_puck__(self, i: int) -> int:
         bits = self.distance2puck_bits_opt
         if bits is None:
@@ -281,17 +264,15 @@ class EnvironmentState(CoreEnvironmentState):
 
     def puck_straight_ahead(self) -> bool:
         """Can I See the puck approx right ahead?"""
-        angle_to_puck = self.me.angle_to_puck_opt()
         # is my puck more or less 10 degrees away from me?
-        return ((angle_to_puck is not None) and
-                ((angle_to_puck.value <= AngleInRadians.PI_HALF/5) or
-                 (angle_to_puck.value >= (AngleInRadians.PI * 2 - AngleInRadians.PI_HALF/5))))
+        return predicates.straight_ahead(*self.me.looking_at_xy(), *self.me.vector_to_puck_xy())
 
     def puck_to_my_right(self) -> bool:
         """Can I See the puck to my right?"""
-        angle_to_puck = self.me.angle_to_puck_opt()
-        return ((angle_to_puck is not None) and
-                (angle_to_puck.value >= AngleInRadians.THREE_HALFS_OF_PI) and
+        heading_x, heading_y = self.me.looking_at_xy()
+        x, y = self.me.vector_to_puck_xy()
+        return (predicates.in_front(heading_x, heading_y, x, y) and
+                predicates.to_the_right(heading_x, heading_y, x, y) and
                 not self.puck_straight_ahead())
 
     def puck_to_my_left(self) -> bool:
@@ -428,13 +409,11 @@ class EnvironmentState(CoreEnvironmentState):
 
     def goal_post_1_to_my_right(self) -> bool:
         """Can I See the goal post 1 to my right?"""
-        a1, _ = self.me.angles_to_goal()
-        return ((a1 is not None) and (a1.value >= AngleInRadians.THREE_HALFS_OF_PI))
+        return self.me.goal_posts_to_my_right()[0]
 
     def goal_post_2_to_my_right(self) -> bool:
         """Can I See the goal post 1 to my right?"""
-        _, a2 = self.me.angles_to_goal()
-        return ((a2 is not None) and (a2.value >= AngleInRadians.THREE_HALFS_OF_PI))
+        return self.me.goal_posts_to_my_right()[1]
 
 
     def __angle_to_goal_post_2__(self) -> Optional[float]:
@@ -14,6 +14,7 @@ from xcs.scenarios import Scenario
 from hockey.behaviour.core.action import HockeyAction
 from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
 from hockey.core.ice_surface.ice_rink import SkatingIce
+from hockey.core.ice_surface.symmetry import mirror_action
 
 
 class LearnToPlayHockeyProblem(Scenario, metaclass=abc.ABCMeta):
@@ -67,6 +68,7 @@ class LearnToPlayHockeyProblem(Scenario, metaclass=abc.ABCMeta):
     def reset_players_and_puck(self):
         self.player_sensing_idx = 0
         self.player_sensing = None
+        self.sensed_mirror_image = False
         self.puck_turn_idx = random.randint(0, len(self.players_to_sample)) + 1
 
     def reset(self):
@@ -97,6 +99,10 @@ class LearnToPlayHockeyProblem(Scenario, metaclass=abc.ABCMeta):
         # self.hockey_world.datacollector.collect(self.hockey_world)
         self.hockey_world.update_running_flag()
 
+    def action_on_ice(self, action: HockeyAction) -> HockeyAction:
+        """What the player sensing does: the action chosen, mirrored if it was chosen on the mirror image of the situation."""
+        return mirror_action(action) if self.sensed_mirror_image else action
+
     def sense(self) -> BitString:
         # senses each one of the players in the world, one after the other
         self.player_sensing_idx = (self.player_sensing_idx + 1) % len(self.players_to_sample)
@@ -106,7 +112,8 @@ class LearnToPlayHockeyProblem(Scenario, metaclass=abc.ABCMeta):
             self.puck_turn_idx = random.randint(0, len(self.players_to_sample))
         self.player_sensing = self.players_to_sample[self.player_sensing_idx]
         self.player_sensing.update_unable_time()
-        return BitstringEnvironmentState(full_state=self.player_sensing.sense()).as_bitstring()
+        bits, self.sensed_mirror_image = BitstringEnvironmentState.of(self.player_sensing.sense()).as_canonical_bitstring()
+        return bits
 
 class Feedback(object):
 
@@ -160,7 +167,7 @@ class GrabThePuckProblem(LearnToPlayHockeyProblem):
         if self.player_sensing is None:
             return None
         else:
-            action_successful = self.player_sensing.apply_actions([action]) # TODO: should I penalize for impossible actions (eg, shooting when puck is not owned. Function returns 'False' in that case).
+            action_successful = self.player_sensing.apply_actions([self.action_on_ice(action)]) # TODO: should I penalize for impossible actions (eg, shooting when puck is not owned. Function returns 'False' in that case).
             have_puck_after = self.player_sensing.have_puck
 
             seconds_in_simulation = self.seconds_in_simulation()
@@ -218,7 +225,7 @@ class ScoreAGoalProblem(LearnToPlayHockeyProblem):
         if self.player_sensing is None:
             return None
         else:
-            action_successful = self.player_sensing.apply_actions([action]) # TODO: should I penalize for impossible actions (eg, shooting when puck is not owned. Function returns 'False' in that case).
+            action_successful = self.player_sensing.apply_actions([self.action_on_ice(action)]) # TODO: should I penalize for impossible actions (eg, shooting when puck is not owned. Function returns 'False' in that case).
             have_puck_after = self.player_sensing.have_puck
 
             seconds_in_simulation = self.seconds_in_simulation()
@@ -290,7 +297,7 @@ class Full5On5Rewards(LearnToPlayHockeyProblem):
         else:
             goals_before = self.hockey_world.goals_scored
             #  let's get the player to execute this action on his/her environment:
-            self.player_sensing.apply_actions([action])
+            self.player_sensing.apply_actions([self.action_on_ice(action)])
             if self.hockey_world.goals_scored > goals_before:
                 return 1.0 # reward!!!!
             else:
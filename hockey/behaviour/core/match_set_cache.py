@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""A bounded (LRU) cache of what was computed for a situation, valid while the population doesn't change.
+
+On a discrete rink players sense a small number of distinct situations, over and over: what we computed for
+one of them (its match set, the predictions of its actions...) can be reused, as long as the rules that
+computed it are still the same. Every entry is stored with a 'version' (eg, the population version of an
+IndexedClassifierSet); looking it up with another version is a miss.
+
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class MatchSetCache(object):
+    """Situation -> value, for the 'capacity' situations used most recently."""
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError("Capacity of a cache has to be positive (got %d)" % capacity)
+        self.capacity = capacity
+        self.entries = OrderedDict() # type: OrderedDict
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, situation_key: Hashable, version: Hashable) -> Optional[Any]:
+        """Value stored for a situation, if any was stored with this version."""
+        entry_opt = self.entries.get(situation_key)
+        if (entry_opt is None) or (entry_opt[0] != version):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(situation_key)
+        self.hits += 1
+        return entry_opt[1]
+
+    def put(self, situation_key: Hashable, version: Hashable, value: Any):
+        self.entries[situation_key] = (version, value)
+        self.entries.move_to_end(situation_key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def __str__(self):
+        return "%d situations cached (capacity %d): %d hits, %d misses (hit rate %.2f)" % \
+               (len(self), self.capacity, self.hits, self.misses, self.hit_rate())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Situations and conditions packed into integers.
+
+A situation of n bits is an int where bit i is the i-th bit sensed. A condition is a (mask, value) pair:
+the mask has a 1 where the condition cares about a bit, and the value has the bits it asks for (0 where
+it doesn't care). A condition matches a situation when (situation & mask) == value.
+For a whole population, masks and values are kept as rows of uint64 words, and matched all at once.
+
+"""
+
+import numpy as np
+from typing import Iterable, List, Tuple
+
+from xcs.bitstrings import BitString as XCSBitString, BitCondition
+
+from util import backends
+
+WORD_BITS = 64
+
+PackedCondition = Tuple[int, int] # (mask, value)
+
+
+def pack(bits: Iterable) -> int:
+    """A sequence of bits (ints, booleans, a BitString, ...) as an int; bit i of the result is bits[i]."""
+    result = 0
+    for i, a_bit in enumerate(bits):
+        if a_bit:
+            result |= (1 << i)
+    return result
+
+def unpack(packed: int, length: int) -> List[int]:
+    return [(packed >> i) & 1 for i in range(length)]
+
+def as_bitstring(packed: int, length: int) -> XCSBitString:
+    return XCSBitString(unpack(packed, length))
+
+def pack_condition(condition: BitCondition) -> PackedCondition:
+    return (pack(condition.mask), pack(condition.bits))
+
+def matches(situation: int, condition: PackedCondition) -> bool:
+    mask, value = condition
+    return (situation & mask) == value
+
+def how_many_words(length: int) -> int:
+    return max(1, (length + WORD_BITS - 1) // WORD_BITS)
+
+def as_words(packed: int, length: int) -> np.ndarray:
+    """An int (of 'length' bits) as uint64 words, least significant first."""
+    return np.array([(packed >> (WORD_BITS * w)) & ((1 << WORD_BITS) - 1) for w in range(how_many_words(length))],
+                    dtype=np.uint64)
+
+@backends.register('match_conditions')
+def __match_conditions_numpy__(masks: np.ndarray, values: np.ndarray, situation_words: np.ndarray) -> np.ndarray:
+    """Booleans: which rows of (masks, values) match a situation (all of them uint64 words)."""
+    return ((situation_words[None, :] & masks) == values).all(axis=1)
+
+def __match_conditions_loop__(masks: np.ndarray, values: np.ndarray, situation_words: np.ndarray) -> np.ndarray:
+    """Same, one condition at a time, stopping on the first word that doesn't match (compiled by the numba backend)."""
+    result = np.ones(masks.shape[0], dtype=np.bool_)
+    for row in range(masks.shape[0]):
+        for word in range(masks.shape[1]):
+            if (situation_words[word] & masks[row, word]) != values[row, word]:
+                result[row] = False
+                break
+    return result
+
+backends.register_jit('match_conditions', __match_conditions_loop__)
+
+def pack_rows(bit_matrix: np.ndarray) -> np.ndarray:
+    """(n, length) matrix of bits (eg, from SkatingIce.sense_players) to (n, words) uint64: one packed situation per row."""
+    n, length = bit_matrix.shape
+    result = np.zeros((n, how_many_words(length)), dtype=np.uint64)
+    for column in range(length):
+        word, shift = divmod(column, WORD_BITS)
+        result[:, word] |= bit_matrix[:, column].astype(np.uint64) << np.uint64(shift)
+    return result
+
+
+class PackedConditions(object):
+    """Conditions of a population, as (mask, value) words; matched against a situation all at once."""
+
+    def __init__(self, conditions: List[BitCondition], length: int):
+        self.conditions = list(conditions)
+        self.length = length
+        words = how_many_words(length)
+        self.masks = np.zeros((len(self.conditions), words), dtype=np.uint64)
+        self.values = np.zeros((len(self.conditions), words), dtype=np.uint64)
+        for row, a_condition in enumerate(self.conditions):
+            mask, value = pack_condition(a_condition)
+            self.masks[row] = as_words(mask, length)
+            self.values[row] = as_words(value, length)
+
+    def __len__(self):
+        return len(self.conditions)
+
+    def match(self, situation: int) -> np.ndarray:
+        """Booleans: which conditions match this (packed) situation."""
+        return backends.kernel('match_conditions')(self.masks, self.values, as_words(situation, self.length))
+
+    def matching(self, situation: int) -> List[BitCondition]:
+        """The conditions that match this (packed) situation, in order."""
+        return [self.conditions[row] for row in np.flatnonzero(self.match(situation))]
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""An index over the conditions of an XCS population: match sets are built without scanning it.
+
+Each condition has a slot (a bit position in some Python ints). For each bit of the situations we keep
+two bitsets: the slots of the conditions that need that bit to be 1, and of the ones that need it to be 0.
+Each bit of a situation rules out the conditions asking for its other value; the conditions left match.
+That is one big-int operation per bit of the situation, instead of one test per condition.
+The index is kept up to date as rules are added to or discarded from the population (see IndexedClassifierSet).
+
+"""
+
+from typing import Dict, Iterable, List, Optional, Union
+
+import xcs
+from xcs.bitstrings import BitString as XCSBitString, BitCondition
+
+from hockey.behaviour.core.match_set_cache import MatchSetCache
+from hockey.behaviour.core.packed_bits import pack, pack_condition
+
+
+def __slots_in__(bitset: int) -> List[int]:
+    """Positions of the bits that are on, lowest first."""
+    slots = []
+    while bitset:
+        lowest = bitset & -bitset
+        slots.append(lowest.bit_length() - 1)
+        bitset ^= lowest
+    return slots
+
+
+class PopulationIndex(object):
+    """Conditions (all of the same length), matched all at once against a situation."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.conditions = [] # type: List[Optional[BitCondition]]
+        self.slots = {} # type: Dict[BitCondition, int]
+        self.free_slots = [] # type: List[int]
+        self.live = 0
+        # for each bit: slots of the conditions that need it to be 1 (resp. 0)
+        self.need_one = [0] * length
+        self.need_zero = [0] * length
+
+    @classmethod
+    def of(cls, conditions: Iterable[BitCondition], length: int) -> 'PopulationIndex':
+        index = cls(length)
+        for a_condition in conditions:
+            index.add(a_condition)
+        return index
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, condition: BitCondition) -> bool:
+        return condition in self.slots
+
+    def __update_bits__(self, condition: BitCondition, slot_bit: int, adding: bool):
+        mask, value = pack_condition(condition)
+        for i in range(self.length):
+            if (mask >> i) & 1:
+                per_bit = self.need_one if (value >> i) & 1 else self.need_zero
+                per_bit[i] = (per_bit[i] | slot_bit) if adding else (per_bit[i] & ~slot_bit)
+
+    def add(self, condition: BitCondition):
+        if condition in self.slots:
+            return
+        if len(condition) != self.length:
+            raise ValueError("Condition '%s' has %d bits; this index is for %d" % (condition, len(condition), self.length))
+        if len(self.free_slots) > 0:
+            slot = self.free_slots.pop()
+            self.conditions[slot] = condition
+        else:
+            slot = len(self.conditions)
+            self.conditions.append(condition)
+        self.slots[condition] = slot
+        self.live |= (1 << slot)
+        self.__update_bits__(condition, 1 << slot, adding=True)
+
+    def discard(self, condition: BitCondition):
+        slot = self.slots.pop(condition, None)
+        if slot is None:
+            return
+        self.__update_bits__(condition, 1 << slot, adding=False)
+        self.live &= ~(1 << slot)
+        self.conditions[slot] = None
+        self.free_slots.append(slot)
+
+    def match(self, situation: Union[XCSBitString, int]) -> List[BitCondition]:
+        """Conditions that match a situation (a bitstring, or a packed one)."""
+        packed = situation if isinstance(situation, int) else pack(situation)
+        ruled_out = 0
+        for i in range(self.length):
+            ruled_out |= self.need_zero[i] if (packed >> i) & 1 else self.need_one[i]
+        return [self.conditions[slot] for slot in __slots_in__(self.live & ~ruled_out)]
+
+
+class IndexedClassifierSet(xcs.ClassifierSet):
+    """
+    A ClassifierSet whose match sets come from a PopulationIndex (same rules as scanning the population).
+    The rules matching a situation are also cached (see MatchSetCache) until the population changes: any rule
+    added or discarded bumps 'population_version'.
+    Index and cache are built on first use, and are not pickled.
+    """
+
+    MATCH_SET_CACHE_SIZE = 4096
+
+    def __init__(self, algorithm, possible_actions):
+        xcs.ClassifierSet.__init__(self, algorithm, possible_actions)
+        self.index_opt = None
+        self.match_set_cache_opt = None
+        self.population_version = 0
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['index_opt'] = None
+        state['match_set_cache_opt'] = None
+        return state
+
+    @property
+    def match_set_cache(self) -> MatchSetCache:
+        if self.match_set_cache_opt is None:
+            self.match_set_cache_opt = MatchSetCache(capacity=self.MATCH_SET_CACHE_SIZE)
+        return self.match_set_cache_opt
+
+    def matching_conditions(self, situation: XCSBitString) -> List[BitCondition]:
+        """Conditions of the population that match a situation."""
+        if self.index_opt is None:
+            self.index_opt = PopulationIndex.of(self._population.keys(), length=len(situation))
+        return self.index_opt.match(situation)
+
+    def match(self, situation, covering: bool = True):
+        """
+        Same as ClassifierSet.match, but the matching conditions are looked up on the index.
+        Without covering (eg, when evaluating a brain) the population is left as it is.
+        """
+        situation_key = pack(situation)
+        cached_opt = self.match_set_cache.get(situation_key, self.population_version)
+        if cached_opt is None:
+            by_action = {}
+            for condition in self.matching_conditions(situation):
+                for action, rule in self._population[condition].items():
+                    if action in by_action:
+                        by_action[action][condition] = rule
+                    else:
+                        by_action[action] = {condition: rule}
+        else:
+            # (action sets get their own copies: subsumption deletes rules from them)
+            by_action = {action: dict(rules) for action, rules in cached_opt.items()}
+        match_set = xcs.MatchSet(self, situation, by_action)
+        covered = covering and self._algorithm.covering_is_required(match_set)
+        if covered:
+            rule = self._algorithm.cover(match_set)
+            assert rule.condition(situation)
+            replaced = self.add(rule)
+            for replaced_rule in replaced:
+                action = replaced_rule.action
+                condition = replaced_rule.condition
+                if action in by_action and condition in by_action[action]:
+                    del by_action[action][condition]
+                    if not by_action[action]:
+                        del by_action[action]
+            if rule.action not in by_action:
+                by_action[rule.action] = {}
+            by_action[rule.action][rule.condition] = rule
+            match_set = xcs.MatchSet(self, situation, by_action)
+        if (cached_opt is None) or covered:
+            self.match_set_cache.put(situation_key, self.population_version, {action: dict(rules) for action, rules in by_action.items()})
+        return match_set
+
+    def add(self, rule):
+        # (a new condition is indexed before pruning, which might discard it right away)
+        if (self.index_opt is not None) and (rule.condition not in self._population):
+            self.index_opt.add(rule.condition)
+        self.population_version += 1
+        return xcs.ClassifierSet.add(self, rule)
+
+    def discard(self, rule, count=1):
+        removed = xcs.ClassifierSet.discard(self, rule, count)
+        self.population_version += 1
+        if removed and (self.index_opt is not None) and (rule.condition not in self._population):
+            self.index_opt.discard(rule.condition)
+        return removed
+
+
+def indexed_model(model: xcs.ClassifierSet) -> IndexedClassifierSet:
+    """An indexed version of a model (eg, of one just unpickled). It takes over the model's population."""
+    if isinstance(model, IndexedClassifierSet):
+        return model
+    indexed = IndexedClassifierSet.__new__(IndexedClassifierSet)
+    indexed.__dict__.update(model.__dict__)
+    indexed.index_opt = None
+    indexed.match_set_cache_opt = None
+    indexed.population_version = 0
+    return indexed
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Table-driven quantizers: from a value (or an array of values) to its bits.
+
+All bit patterns are computed when the quantizer is built; quantizing is a bucket lookup
+(bisect / searchsorted) followed by an index into the table.
+
+"""
+
+import math
+from bisect import bisect_left
+from typing import List, Optional
+
+import numpy as np
+from xcs.bitstrings import BitString as XCSBitString
+
+
+class OneHotQuantizer(object):
+    """
+    Value -> bit of the first threshold it doesn't exceed (ie, value <= threshold). All bits are off if the
+    value is above every threshold, or if it's not valid (eg, it can't be seen).
+    """
+
+    def __init__(self, thresholds: List[float]):
+        assert len(thresholds) > 0
+        assert all(a <= b for a, b in zip(thresholds, thresholds[1:])), "thresholds have to be sorted"
+        self.thresholds = list(thresholds)
+        self.thresholds_array = np.array(thresholds, dtype=np.float64)
+        length = len(thresholds)
+        # row i: bit i on. Last row: all off.
+        self.table = np.vstack([np.eye(length, dtype=np.uint8), np.zeros((1, length), dtype=np.uint8)])
+        self.patterns = [XCSBitString(row.tolist()) for row in self.table]
+
+    def __len__(self):
+        return len(self.thresholds)
+
+    def index(self, value: float) -> int:
+        """Bit that is on for this value (len(self) if none)."""
+        return bisect_left(self.thresholds, value)
+
+    def index_opt(self, value_opt: Optional[float], valid: bool = True) -> int:
+        """index() of the value; len(self) if there is no value (or it's not valid)."""
+        if (not valid) or (value_opt is None):
+            return len(self.thresholds)
+        return bisect_left(self.thresholds, value_opt)
+
+    def bits(self, value_opt: Optional[float], valid: bool = True) -> XCSBitString:
+        return self.patterns[self.index_opt(value_opt, valid)]
+
+    def index_array(self, values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """index() of each value (len(self) where not valid)."""
+        indices = np.searchsorted(self.thresholds_array, values, side='left')
+        return np.where(valid, indices, len(self.thresholds))
+
+    def bits_array(self, values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """(n, len(self)) matrix of uint8, one row per value."""
+        return self.table[self.index_array(values, valid)]
+
+
+class BinaryQuantizer(object):
+    """Non-negative int -> its binary representation, with bit i at position i."""
+
+    def __init__(self, how_many_bits: int):
+        assert 0 < how_many_bits <= 16, "table would be too big"
+        self.how_many_bits = how_many_bits
+        values = np.arange(1 << how_many_bits)
+        self.table = ((values[:, None] >> np.arange(how_many_bits)[None, :]) & 1).astype(np.uint8)
+        self.strings = [''.join(str(a_bit) for a_bit in row) for row in self.table.tolist()]
+
+    def checked(self, an_int: int) -> int:
+        """The same int, once we know it can be represented."""
+        assert 0 <= an_int < len(self.strings), \
+            "To encode number %d we need %d bits - but %d are allowed" % (an_int, an_int.bit_length(), self.how_many_bits)
+        return an_int
+
+    def string(self, an_int: int) -> str:
+        """Bit representation of a number, with usual semantics (repr[i] is bit i)."""
+        return self.strings[self.checked(an_int)]
+
+    def bits_array(self, values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """(n, how_many_bits) matrix of uint8, one row per value (all 0 where not valid)."""
+        values = np.where(valid, values, 0)
+        assert ((values >= 0) & (values < self.table.shape[0])).all(), \
+            "values %s don't fit in %d bits" % (values, self.how_many_bits)
+        return self.table[values]
+
+
+def folded_degrees(radians: float) -> int:
+    """
+    An angle in front of a player ([0, Pi/2] or [3Pi/2, 2Pi]) in degrees, irrespective of the side: in [0, 90].
+    (what EnvironmentState encodes)
+    """
+    degrees = int(round(math.degrees(radians)))
+    if degrees >= 270:
+        return 360 - degrees
+    elif degrees <= 90:
+        return degrees
+    else:
+        raise RuntimeError("How come %d degrees????" % degrees)
+
+
+def folded_degrees_array(radians: np.ndarray) -> np.ndarray:
+    """Same as folded_degrees, on arrays (angles not in front of the player are not checked)."""
+    degrees = np.round(np.degrees(radians)).astype(np.int64)
+    return np.where(degrees >= 270, 360 - degrees, degrees)
+
+
+DISTANCE_BITS = BinaryQuantizer(8)
+ANGLE_BITS = BinaryQuantizer(7)
+SPEED_BITS = BinaryQuantizer(6)
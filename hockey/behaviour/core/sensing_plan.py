@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""Sensing plans: one generated function that computes all the bits of a situation.
+
+EnvironmentState answers each bit with its own method, and many of them recompute the same things
+(can I see the puck? what is the angle to it? who has it?). A plan looks at the bits asked for, computes
+each quantity they need exactly once, in dependency order, and returns the bits as a list of ints.
+The result is the same as BitstringEnvironmentState.build_defs (see test_sensing_plan).
+
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from geometry.angle import AngleInRadians
+from geometry.point import Point
+from geometry.vector import Vec2d
+
+from util.geometry import predicates
+from hockey.core.player.base import Player
+from hockey.core.player.forward import Forward
+from hockey.behaviour.core.quantizers import ANGLE_BITS, DISTANCE_BITS, SPEED_BITS, OneHotQuantizer, folded_degrees
+
+
+def __bits_of_angle__(angle_opt: Optional[AngleInRadians]) -> Optional[int]:
+    """Same as EnvironmentState.update's __bits_angle_to_puck__."""
+    if angle_opt is None:
+        return None
+    return ANGLE_BITS.checked(folded_degrees(angle_opt.value))
+
+def __min_angle_value__(angle_opt: Optional[AngleInRadians]) -> Optional[float]:
+    """Angle irrespective of the side ('right' or 'left')."""
+    if angle_opt is None:
+        return None
+    elif angle_opt.value <= AngleInRadians.PI_HALF:
+        return angle_opt.value
+    else:
+        return AngleInRadians.PI * 2 - angle_opt.value
+
+
+# thresholds of the 'closer than' bits, and of the 'less than' bits (same arithmetic as EnvironmentState, so
+# limits are the same floats):
+CLOSER_THAN = OneHotQuantizer(list(range(10, 60 + 1, 10)))
+TENTHS_OF_PI = OneHotQuantizer([AngleInRadians.PI / 10] + [k*AngleInRadians.PI / 10 for k in range(2, 10)] + [AngleInRadians.PI])
+
+
+# Quantities shared by the bits: name -> (expression, names it depends on).
+# Listed in dependency order; the arguments are 'me' (the Player sensing), 'puck_owner_opt' and the situation
+# itself: 'pos' (mine), 'heading' (where I look at, as (x, y)) and 'puck_pos'. Nothing is read from where
+# me and the puck are on the ice, so a situation can be sensed without moving anyone (see SensingPlan.at).
+QUANTITIES = OrderedDict([
+    ('on_top', ("pos == puck_pos", [])),
+    ('to_puck', ("(puck_pos.x - pos.x, puck_pos.y - pos.y)", [])),
+    ('in_front', ("predicates.in_front(heading[0], heading[1], to_puck[0], to_puck[1])", ['to_puck'])),
+    ('looking_at', ("Vec2d(heading[0], heading[1])", [])),
+    ('vector_to_puck', ("Vec2d.from_to(from_pt=pos, to_pt=puck_pos)", [])),
+    # (the angle itself is only computed for the bits that encode it)
+    ('angle_opt', ("looking_at.angle_to(vector_to_puck) if in_front else None", ['looking_at', 'vector_to_puck', 'in_front'])),
+    ('can_see', ("on_top or in_front", ['on_top', 'in_front'])),
+    ('vector_opt', ("vector_to_puck if can_see else None", ['vector_to_puck', 'can_see'])),
+    ('distance_opt', ("None if vector_opt is None else vector_opt.norm()", ['vector_opt'])),
+    ('distance_bits_opt', ("None if distance_opt is None else DISTANCE_BITS.checked(int(round(distance_opt)))", ['distance_opt'])),
+    ('x_bits_opt', ("None if vector_opt is None else DISTANCE_BITS.checked(int(round(abs(vector_opt.x))))", ['vector_opt'])),
+    ('y_bits_opt', ("None if vector_opt is None else DISTANCE_BITS.checked(int(round(abs(vector_opt.y))))", ['vector_opt'])),
+    ('speed_bits', ("SPEED_BITS.checked(int(round(me.current_speed())))", [])),
+    ('angle_bits_opt', ("__bits_of_angle__(angle_opt)", ['angle_opt'])),
+    ('min_angle_opt', ("__min_angle_value__(angle_opt)", ['angle_opt'])),
+    ('min_angle_slice', ("TENTHS_OF_PI.index_opt(min_angle_opt)", ['min_angle_opt'])),
+    ('distance_slice', ("CLOSER_THAN.index_opt(distance_opt, valid=can_see)", ['distance_opt', 'can_see'])),
+    ('straight_ahead', ("predicates.straight_ahead(heading[0], heading[1], to_puck[0], to_puck[1])", ['to_puck'])),
+    ('to_my_right', ("in_front and predicates.to_the_right(heading[0], heading[1], to_puck[0], to_puck[1]) and not straight_ahead",
+                     ['in_front', 'to_puck', 'straight_ahead'])),
+    ('can_reach', ("(me.unable_to_play_puck_time <= 0) and can_see and "
+                   "(on_top or predicates.within_reach(heading[0], heading[1], to_puck[0], to_puck[1], me.reach))",
+                   ['can_see', 'on_top', 'to_puck'])),
+    # goal (same as Player's can_see_goal_posts, angles_to_goal and goal_posts_to_my_right):
+    ('posts_vectors', ("me.model.vectors_to_goal(pos)", [])),
+    ('posts_in_front', ("tuple(predicates.in_front(heading[0], heading[1], v.x, v.y) for v in posts_vectors)", ['posts_vectors'])),
+    ('posts_visible', ("(False, False) if pos.x > me.model.goal_position[0] else posts_in_front", ['posts_in_front'])),
+    ('posts_angles', ("tuple(looking_at.angle_to(v) if seen else None for v, seen in zip(posts_vectors, posts_in_front))",
+                      ['looking_at', 'posts_vectors', 'posts_in_front'])),
+    ('posts_to_my_right', ("tuple(seen and predicates.to_the_right(heading[0], heading[1], v.x, v.y) for v, seen in zip(posts_vectors, posts_in_front))",
+                           ['posts_vectors', 'posts_in_front'])),
+    ('post_1_min_angle_opt', ("__min_angle_value__(posts_angles[0])", ['posts_angles'])),
+    ('post_2_min_angle_opt', ("__min_angle_value__(posts_angles[1])", ['posts_angles'])),
+    ('post_1_min_angle_slice', ("TENTHS_OF_PI.index_opt(post_1_min_angle_opt)", ['post_1_min_angle_opt'])),
+    ('post_2_min_angle_slice', ("TENTHS_OF_PI.index_opt(post_2_min_angle_opt)", ['post_2_min_angle_opt'])),
+    ('posts_distances', ("me.model.distance_to_goal_posts(pos)", [])),
+    ('post_1_distance_opt', ("posts_distances[0] if posts_visible[0] else None", ['posts_distances', 'posts_visible'])),
+    ('post_2_distance_opt', ("posts_distances[1] if posts_visible[1] else None", ['posts_distances', 'posts_visible'])),
+    ('post_1_distance_slice', ("CLOSER_THAN.index_opt(post_1_distance_opt)", ['post_1_distance_opt'])),
+    ('post_2_distance_slice', ("CLOSER_THAN.index_opt(post_2_distance_opt)", ['post_2_distance_opt'])),
+])
+
+
+def __bit_expressions__() -> Dict[str, Tuple[str, List[str]]]:
+    """Bit name (as in EnvironmentState) -> (expression, quantities it needs)."""
+    bits = {
+        'attacking': ("type(me) == Forward", []),
+        'have_puck': ("(puck_owner_opt is not None) and (me.unique_id == puck_owner_opt.unique_id)", []),
+        'my_team_has_puck': ("(puck_owner_opt is not None) and (type(puck_owner_opt) == type(me))", []),
+        'can_I_reach_puck': ("can_reach", ['can_reach']),
+        'can_see_puck': ("can_see", ['can_see']),
+        'bit_sign_x_vector_to_puck': ("(vector_opt is not None) and (vector_opt.x > 0)", ['vector_opt']),
+        'bit_sign_y_vector_to_puck': ("(vector_opt is not None) and (vector_opt.y > 0)", ['vector_opt']),
+        'puck_straight_ahead': ("straight_ahead", ['straight_ahead']),
+        'puck_to_my_right': ("to_my_right", ['to_my_right']),
+        'puck_to_my_left': ("can_see and not to_my_right", ['can_see', 'to_my_right']),
+        'can_see_goal': ("posts_visible[0] or posts_visible[1]", ['posts_visible']),
+        'can_see_goal_post_1': ("posts_visible[0]", ['posts_visible']),
+        'can_see_goal_post_2': ("posts_visible[1]", ['posts_visible']),
+        'goal_post_1_to_my_right': ("posts_to_my_right[0]", ['posts_to_my_right']),
+        'goal_post_2_to_my_right': ("posts_to_my_right[1]", ['posts_to_my_right']),
+    }
+    for i in range(8):
+        bits['bit_%d_distance_to_puck' % i] = ("0 if distance_bits_opt is None else (distance_bits_opt >> %d) & 1" % i, ['distance_bits_opt'])
+        bits['bit_%d_x_vector_to_puck' % i] = ("0 if x_bits_opt is None else (x_bits_opt >> %d) & 1" % i, ['x_bits_opt'])
+        bits['bit_%d_y_vector_to_puck' % i] = ("0 if y_bits_opt is None else (y_bits_opt >> %d) & 1" % i, ['y_bits_opt'])
+    for i in range(7):
+        bits['bit_%d_angle_to_puck' % i] = ("0 if angle_bits_opt is None else (angle_bits_opt >> %d) & 1" % i, ['angle_bits_opt'])
+    for i in range(6):
+        bits['bit_%d_speed_to_puck' % i] = ("(speed_bits >> %d) & 1" % i, ['speed_bits'])
+    # 'closer than' and 'less than' bits: the value is under the i-th threshold iff its slice is at most i.
+    for i, n_feet in enumerate(CLOSER_THAN.thresholds):
+        bits['puck_closer_than_%d_feet' % n_feet] = ("distance_slice <= %d" % i, ['distance_slice'])
+        for post in [1, 2]:
+            bits['goal_post_%d_closer_than_%d_feet' % (post, n_feet)] = \
+                ("post_%d_distance_slice <= %d" % (post, i), ['post_%d_distance_slice' % post])
+    for k in range(1, 10 + 1):
+        name_of_k = "pi_over_10" if k == 1 else "%dpi_over_10" % k
+        for prefix, quantity in [('angle_to_puck', 'min_angle_slice'),
+                                 ('angle_to_goal_post_1', 'post_1_min_angle_slice'),
+                                 ('angle_to_goal_post_2', 'post_2_min_angle_slice')]:
+            bits['%s_less_than_%s' % (prefix, name_of_k)] = ("%s <= %d" % (quantity, k - 1), [quantity])
+    return bits
+
+BIT_EXPRESSIONS = __bit_expressions__()
+
+
+class SensingPlan(object):
+    """Compiled sensing for a list of bits."""
+
+    def __init__(self, bit_fns: List[str]):
+        unknown = [name for name in bit_fns if name not in BIT_EXPRESSIONS]
+        if len(unknown) > 0:
+            raise ValueError("Don't know how to compile bits %s" % (unknown))
+        self.bit_fns = list(bit_fns)
+        self.source = SensingPlan.generate_source(self.bit_fns)
+        namespace = {
+            'Forward': Forward,
+            'Vec2d': Vec2d,
+            'CLOSER_THAN': CLOSER_THAN,
+            'DISTANCE_BITS': DISTANCE_BITS,
+            'SPEED_BITS': SPEED_BITS,
+            'TENTHS_OF_PI': TENTHS_OF_PI,
+            'predicates': predicates,
+            '__bits_of_angle__': __bits_of_angle__,
+            '__min_angle_value__': __min_angle_value__,
+        }
+        exec(compile(self.source, "<sensing plan>", "exec"), namespace)
+        self.sense = namespace['sense'] # type: Callable[[Player, Optional[Player], Point, Tuple[float, float], Point], List[int]]
+
+    @classmethod
+    def quantities_needed(cls, bit_fns: List[str]) -> Set[str]:
+        """Names of the quantities (see QUANTITIES) these bits need, directly or not."""
+        needed = set()
+        def need(name: str):
+            if name not in needed:
+                needed.add(name)
+                for a_dependency in QUANTITIES[name][1]:
+                    need(a_dependency)
+        for name in bit_fns:
+            for a_quantity in BIT_EXPRESSIONS[name][1]:
+                need(a_quantity)
+        return needed
+
+    @classmethod
+    def generate_source(cls, bit_fns: List[str]) -> str:
+        """Source code of a function 'sense(me, puck_owner_opt, pos, heading, puck_pos) -> List[int]' for these bits."""
+        needed = cls.quantities_needed(bit_fns)
+        lines = ["def sense(me, puck_owner_opt, pos, heading, puck_pos):"]
+        lines += ["    %s = %s" % (name, expression) for name, (expression, _) in QUANTITIES.items() if name in needed]
+        lines.append("    return [")
+        lines += ["        int(%s), # %s" % (BIT_EXPRESSIONS[name][0], name) for name in bit_fns]
+        lines.append("    ]")
+        return "\n".join(lines) + "\n"
+
+    def __call__(self, me: Player, puck_owner_opt: Optional[Player]) -> List[int]:
+        return self.sense(me, puck_owner_opt, me.pos, me.looking_at_xy(), me.model.puck.pos)
+
+    def at(self, me: Player, puck_owner_opt: Optional[Player], pos: Point, heading: Tuple[float, float], puck_pos: Point) -> List[int]:
+        """Bits 'me' would sense if it was at 'pos', looking at 'heading', with the puck at 'puck_pos'."""
+        return self.sense(me, puck_owner_opt, pos, heading, puck_pos)
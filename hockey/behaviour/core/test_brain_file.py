@@ -0,0 +1,83 @@
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+import numpy as np
+import xcs
+from xcs.bitstrings import BitString as XCSBitString
+from xcs.scenarios import MUXProblem
+
+from hockey.behaviour.core.action import HockeyAction
+from hockey.behaviour.core.brain_file import ALIGNMENT, Brain, decode_action, encode_action, is_brain_file, load_model, \
+    of_pickled_model
+from hockey.behaviour.core.population_index import indexed_model
+
+
+class TestBrainFile(unittest.TestCase):
+    """A brain must come back from its file as it was."""
+
+    def setUp(self):
+        """Initialization"""
+        random.seed(11)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.tmp_dir.name, "brain_episode_1.xcsb")
+        scenario = MUXProblem(training_cycles=1000, address_size=2)
+        algorithm = xcs.XCSAlgorithm()
+        algorithm.exploration_probability = .2
+        self.model = indexed_model(algorithm.new_model(scenario))
+        self.model.run(scenario, learn=True)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        Brain.of_model(self.model).save(self.file_name)
+        self.assertTrue(is_brain_file(self.file_name))
+        brain = Brain.load(self.file_name)
+        self.assertEqual(len(brain.columns), 0) # nothing read yet
+        self.assertEqual(len(brain), len(list(self.model)))
+        for name in brain.header['columns']:
+            self.assertEqual(brain.header['columns'][name]['offset'] % ALIGNMENT, 0)
+        self.assertIsInstance(brain.column('fitness'), np.memmap)
+        model = brain.to_model()
+        self.assertEqual(model.time_stamp, self.model.time_stamp)
+        self.assertEqual(model.algorithm.exploration_probability, .2)
+        self.assertEqual(set(model.possible_actions), set(self.model.possible_actions))
+        for rule in self.model:
+            loaded = model.get(rule)
+            self.assertIsNotNone(loaded)
+            for name in ['average_reward', 'error', 'fitness', 'experience', 'action_set_size', 'numerosity', 'time_stamp']:
+                self.assertEqual(getattr(loaded, name), getattr(rule, name))
+        # rules can also be matched straight on the columns:
+        for _ in range(20):
+            situation = XCSBitString.random(brain.condition_bits)
+            matching = [(c, a) for c, a, m in zip(brain.conditions(), brain.actions(), brain.matching(situation)) if m]
+            self.assertEqual(sorted(map(str, matching)), sorted(str((r.condition, r.action)) for r in self.model if r.condition(situation)))
+
+    def test_of_pickled_model(self):
+        with open(self.file_name, 'wb') as f:
+            f.write(of_pickled_model(pickle.dumps(self.model)))
+        self.assertEqual(len(Brain.load(self.file_name).to_model()), len(self.model))
+
+    def test_pickles_still_load(self):
+        pickle_file_name = os.path.join(self.tmp_dir.name, "brain_episode_1.bin")
+        with open(pickle_file_name, 'wb') as f:
+            pickle.dump(self.model, f)
+        self.assertFalse(is_brain_file(pickle_file_name))
+        self.assertEqual(len(load_model(pickle_file_name)), len(self.model))
+
+    def test_hockey_actions(self):
+        for action in HockeyAction:
+            self.assertEqual(decode_action(encode_action(action), 'HockeyAction'), action)
+
+    def test_not_a_brain(self):
+        with open(self.file_name, 'wb') as f:
+            f.write(b'definitely not a brain')
+        with self.assertRaises(ValueError):
+            Brain.load(self.file_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
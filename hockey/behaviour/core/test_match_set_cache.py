@@ -0,0 +1,56 @@
+import random
+import unittest
+
+import xcs
+from xcs.bitstrings import BitString as XCSBitString
+from xcs.scenarios import MUXProblem
+
+from hockey.behaviour.core.match_set_cache import MatchSetCache
+from hockey.behaviour.core.population_index import indexed_model
+
+
+class TestMatchSetCache(unittest.TestCase):
+
+    def setUp(self):
+        """Initialization"""
+        random.seed(7)
+
+    def test_lru_and_versions(self):
+        cache = MatchSetCache(capacity=2)
+        cache.put(1, 0, 'one')
+        cache.put(2, 0, 'two')
+        self.assertEqual(cache.get(1, 0), 'one')
+        cache.put(3, 0, 'three') # 2 is the least recently used
+        self.assertIsNone(cache.get(2, 0))
+        self.assertEqual(cache.get(3, 0), 'three')
+        self.assertIsNone(cache.get(1, 1)) # stored with another version
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        with self.assertRaises(ValueError):
+            MatchSetCache(capacity=0)
+
+    def test_model_reuses_match_sets(self):
+        scenario = MUXProblem(training_cycles=1000, address_size=2)
+        model = indexed_model(xcs.XCSAlgorithm().new_model(scenario))
+        model.run(scenario, learn=True)
+        situations = [XCSBitString.random(6) for _ in range(10)]
+        # a frozen population: after the first lookup of each situation, all are hits.
+        model.match_set_cache.clear()
+        model.match_set_cache.reset_counters()
+        for _ in range(5):
+            for situation in situations:
+                match_set = model.match(situation, covering=False)
+                scanned = set((condition, action) for condition, actions in model._population.items() if condition(situation) for action in actions)
+                self.assertEqual(set((c, a) for a, action_set in match_set._action_sets.items() for c in action_set._rules), scanned)
+        self.assertEqual(model.match_set_cache.misses, len(set(situations)))
+        # any change of the population invalidates what was cached:
+        version = model.population_version
+        rule = next(iter(model))
+        model.discard(rule, count=rule.numerosity)
+        self.assertGreater(model.population_version, version)
+        misses = model.match_set_cache.misses
+        model.match(situations[0], covering=False)
+        self.assertEqual(model.match_set_cache.misses, misses + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from random import Random
+
+import numpy as np
+from xcs.bitstrings import BitString as XCSBitString, BitCondition
+
+from hockey.behaviour.core import packed_bits
+from hockey.behaviour.core.packed_bits import PackedConditions, as_bitstring, matches, pack, pack_condition, pack_rows, \
+    unpack
+from util import backends
+
+
+class TestPackedBits(unittest.TestCase):
+    """Packed situations and conditions have to behave as xcs' bitstrings and conditions."""
+
+    def setUp(self):
+        """Initialization"""
+        self.rnd = Random(333)
+
+    def __random_condition__(self, length: int) -> BitCondition:
+        return BitCondition(''.join(self.rnd.choice('01##') for _ in range(length)))
+
+    def __random_situation__(self, length: int) -> XCSBitString:
+        return XCSBitString([self.rnd.randint(0, 1) for _ in range(length)])
+
+    def test_round_trip(self):
+        for length in [1, 26, 64, 70]:
+            situation = self.__random_situation__(length)
+            self.assertEqual(as_bitstring(pack(situation), length), situation)
+            self.assertEqual(unpack(pack(situation), length), [int(a_bit) for a_bit in situation])
+
+    def test_same_matches_as_xcs(self):
+        for length in [26, 64, 100]:
+            conditions = [self.__random_condition__(length) for _ in range(50)]
+            # (some conditions that match a lot)
+            conditions += [BitCondition('#' * (length - 2) + '1#'), BitCondition('#' * length)]
+            packed_conditions = PackedConditions(conditions, length=length)
+            for _ in range(50):
+                situation = self.__random_situation__(length)
+                expected = [a_condition(situation) for a_condition in conditions]
+                packed_situation = pack(situation)
+                self.assertEqual(packed_conditions.match(packed_situation).tolist(), expected)
+                self.assertEqual([matches(packed_situation, pack_condition(a_condition)) for a_condition in conditions], expected)
+                self.assertEqual(packed_conditions.matching(packed_situation),
+                                 [a_condition for a_condition, matched in zip(conditions, expected) if matched])
+
+    def test_matching_on_every_backend(self):
+        length = 100
+        conditions = [self.__random_condition__(length) for _ in range(50)] + [BitCondition('#' * length)]
+        packed_conditions = PackedConditions(conditions, length=length)
+        for _ in range(50):
+            situation = self.__random_situation__(length)
+            expected = [a_condition(situation) for a_condition in conditions]
+            words = packed_bits.as_words(pack(situation), length)
+            for match_fn in [backends.kernel('match_conditions', a_backend) for a_backend in backends.available()] + \
+                            [packed_bits.__match_conditions_loop__]:
+                self.assertEqual(match_fn(packed_conditions.masks, packed_conditions.values, words).tolist(), expected)
+
+    def test_pack_rows(self):
+        bit_matrix = np.array([[self.rnd.randint(0, 1) for _ in range(70)] for _ in range(5)], dtype=np.uint8)
+        rows = pack_rows(bit_matrix)
+        self.assertEqual(rows.shape, (5, 2))
+        for row in range(5):
+            packed = pack(bit_matrix[row].tolist())
+            self.assertEqual(int(rows[row, 0]) + (int(rows[row, 1]) << 64), packed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import pickle
+import random
+import unittest
+
+import xcs
+from xcs.bitstrings import BitString as XCSBitString, BitCondition
+from xcs.scenarios import MUXProblem
+
+from hockey.behaviour.core.population_index import PopulationIndex, indexed_model
+
+
+def random_condition(length: int) -> BitCondition:
+    bits = XCSBitString([random.random() < .5 for _ in range(length)])
+    mask = XCSBitString([random.random() < .3 for _ in range(length)])
+    return BitCondition(bits, mask)
+
+
+class TestPopulationIndex(unittest.TestCase):
+    """The index must find the same conditions as scanning them all."""
+
+    def setUp(self):
+        """Initialization"""
+        random.seed(5)
+
+    def test_same_as_scan(self):
+        length = 12
+        conditions = set(random_condition(length) for _ in range(300))
+        index = PopulationIndex.of(conditions, length=length)
+        for _ in range(20):
+            # conditions come and go:
+            for a_condition in random.sample(sorted(conditions, key=str), 20):
+                conditions.discard(a_condition)
+                index.discard(a_condition)
+            for a_condition in [random_condition(length) for _ in range(15)]:
+                conditions.add(a_condition)
+                index.add(a_condition)
+            self.assertEqual(len(index), len(conditions))
+            for _ in range(20):
+                situation = XCSBitString.random(length)
+                self.assertEqual(set(index.match(situation)), set(c for c in conditions if c(situation)))
+
+    def test_same_match_sets_as_classifier_set(self):
+        scenario = MUXProblem(training_cycles=2000, address_size=3)
+        algorithm = xcs.XCSAlgorithm()
+        algorithm.max_population_size = 50 # so that rules get deleted
+        model = indexed_model(algorithm.new_model(scenario))
+        model.run(scenario, learn=True)
+        self.assertIsNotNone(model.index_opt)
+        self.assertEqual(len(model.index_opt), len(model._population))
+        for _ in range(50):
+            situation = XCSBitString.random(model.index_opt.length)
+            match_set = model.match(situation, covering=False)
+            matched = set((condition, action) for action, action_set in match_set._action_sets.items() for condition in action_set._rules)
+            scanned = set((condition, action) for condition, actions in model._population.items() if condition(situation) for action in actions)
+            self.assertEqual(matched, scanned)
+
+    def test_index_not_pickled(self):
+        scenario = MUXProblem(training_cycles=100, address_size=2)
+        model = indexed_model(xcs.XCSAlgorithm().new_model(scenario))
+        model.run(scenario, learn=True)
+        self.assertIsNotNone(model.index_opt)
+        reloaded = indexed_model(pickle.loads(pickle.dumps(model)))
+        self.assertIsNone(reloaded.index_opt)
+        self.assertEqual(len(reloaded), len(model))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import math
+import random
+import unittest
+
+import numpy as np
+
+from hockey.behaviour.core.quantizers import OneHotQuantizer, BinaryQuantizer, folded_degrees, folded_degrees_array
+
+
+def one_hot_by_looping(valid: bool, value_opt, thresholds) -> list:
+    """How angle_to_bitstring and distance_to_bitstring used to do it."""
+    value = float("inf") if value_opt is None else value_opt
+    as_list = []
+    match_on_last = False
+    for a_threshold in thresholds:
+        match_on_this = value <= a_threshold
+        as_list.append(int(match_on_this and not match_on_last) * int(valid))
+        match_on_last = match_on_last or match_on_this
+    return as_list
+
+
+class TestQuantizers(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1)
+        self.angles = [s * math.pi / 20 for s in range(0, 20 + 1)]
+        self.distances = list(range(10, 60 + 1, 10))
+
+    def test_one_hot_as_loop(self):
+        for thresholds in [self.angles, self.distances]:
+            q = OneHotQuantizer(thresholds)
+            values = [None, -1.0, thresholds[-1] * 2] + thresholds + [random.uniform(0, thresholds[-1] * 1.1) for _ in range(200)]
+            for a_value in values:
+                for valid in [True, False]:
+                    self.assertEqual(list(q.bits(a_value, valid)), one_hot_by_looping(valid, a_value, thresholds))
+            numbers = np.array([v for v in values if v is not None])
+            valid = np.array([random.random() < 0.8 for _ in numbers])
+            expected = [one_hot_by_looping(ok, v, thresholds) for v, ok in zip(numbers, valid)]
+            self.assertEqual(q.bits_array(numbers, valid).tolist(), expected)
+
+    def test_binary(self):
+        q = BinaryQuantizer(7)
+        for an_int in range(128):
+            self.assertEqual(q.string(an_int), "{0:b}".format(an_int)[::-1].ljust(7, "0"))
+        with self.assertRaises(AssertionError):
+            q.string(128)
+        values = np.array([0, 5, 127, 90])
+        rows = q.bits_array(values, valid=np.array([True, True, True, False]))
+        self.assertEqual(["".join(str(b) for b in row) for row in rows.tolist()], [q.string(0), q.string(5), q.string(127), q.string(0)])
+
+    def test_folded_degrees(self):
+        radians = [0, math.pi / 4, math.pi / 2, 3 * math.pi / 2, 7 * math.pi / 4, 2 * math.pi - 1e-3]
+        self.assertEqual([folded_degrees(r) for r in radians], [0, 45, 90, 90, 45, 0])
+        self.assertEqual(folded_degrees_array(np.array(radians)).tolist(), [0, 45, 90, 90, 45, 0])
+        with self.assertRaises(RuntimeError):
+            folded_degrees(math.pi)
+
+
+if __name__ == '__main__':
+    unittest.main()
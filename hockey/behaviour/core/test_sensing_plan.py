@@ -0,0 +1,79 @@
+import unittest
+from random import Random
+
+from geometry.point import Point
+from xcs.bitstrings import BitString as XCSBitString
+
+from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
+from hockey.behaviour.core.sensing_plan import SensingPlan, BIT_EXPRESSIONS
+from hockey.core.ice_surface.half_rink import HockeyHalfRink
+
+
+class TestSensingPlan(unittest.TestCase):
+    """A compiled plan has to sense what EnvironmentState senses."""
+
+    def setUp(self):
+        """Initialization"""
+        self.rnd = Random(333)
+        self.half_ice_rink = HockeyHalfRink(width=5, height=5, how_many_defense=2, how_many_offense=2)
+        self.players = self.half_ice_rink.defense + self.half_ice_rink.attack
+
+    def __random_situation__(self):
+        world = self.half_ice_rink
+        world.release_puck()
+        for an_agent in [world.puck] + self.players:
+            world.space.place_agent(an_agent, pos=Point(self.rnd.randint(0, world.width - 1), self.rnd.randint(0, world.height - 1)))
+        for player in self.players:
+            player.set_looking_at_xy(*[(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)][self.rnd.randint(0, 3)])
+            player.unable_to_play_puck_time = self.rnd.choice([0, 0, 0.5])
+        if self.rnd.random() < 0.5:
+            world.give_puck_to(self.rnd.choice(self.players))
+
+    def __check_same_bits__(self, bit_fns):
+        plan = SensingPlan(bit_fns)
+        for _ in range(200):
+            self.__random_situation__()
+            for player in self.players:
+                full_state = player.sense()
+                full_state.update()
+                expected = [int(getattr(full_state, name)()) for name in bit_fns]
+                self.assertEqual(plan(me=player, puck_owner_opt=full_state.puck_owner_opt), expected,
+                                 msg="\n" + plan.source)
+
+    def test_same_as_build_defs(self):
+        self.__check_same_bits__(BitstringEnvironmentState.bit_fns)
+        full_state = self.players[0].sense()
+        full_state.update()
+        bitstring_state = BitstringEnvironmentState(full_state=full_state)
+        self.assertEqual(bitstring_state.as_bitstring(), XCSBitString(bitstring_state.build_defs()))
+
+    def test_every_known_bit(self):
+        self.__check_same_bits__(sorted(BIT_EXPRESSIONS.keys()))
+
+    def test_mirror_image_on_half_rink(self):
+        """The half-rink is symmetric: the canonical image of a situation is sensed without moving anyone."""
+        world = self.half_ice_rink
+        world.use_symmetry()
+        self.__random_situation__()
+        world.release_puck()
+        me = self.players[0]
+        world.move_agent(me, Point(1, 4))
+        world.move_agent(world.puck, Point(3, 1))
+        me.set_looking_at_xy(0.0, 1.0)
+        bits, flipped = BitstringEnvironmentState(full_state=me.sense()).as_canonical_bitstring()
+        self.assertTrue(flipped)
+        self.assertEqual((me.pos, world.puck.pos, me.looking_at_xy()), (Point(1, 4), Point(3, 1), (0.0, 1.0)))
+        # same bits as sensing the mirror image (about the center of the goal):
+        world.move_agent(me, Point(1, 1))
+        world.move_agent(world.puck, Point(3, 4))
+        me.set_looking_at_xy(0.0, -1.0)
+        self.assertEqual(bits, BitstringEnvironmentState(full_state=me.sense()).as_bitstring())
+        self.assertEqual(BitstringEnvironmentState(full_state=me.sense()).as_canonical_bitstring(), (bits, False))
+
+    def test_unknown_bit(self):
+        with self.assertRaises(ValueError):
+            SensingPlan(['attacking', 'not_a_bit'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Struct-of-arrays physics for everything that moves on ice.
+
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+from util.base import FEET_IN_METER, GRAVITY_ACCELERATION
+from util.geometry.container import fold_into_walls_array
+
+
+class BatchPhysics(object):
+    """
+    Positions, speeds and headings of all objects on ice, stored as arrays (one row per object).
+    Objects ask to move (see 'request_move'); all pending moves are then computed in one vectorized call.
+    Walls and friction behave as in util.geometry.container.Container.particle_move.
+    """
+
+    def __init__(self, width: float, height: float, capacity: int = 16):
+        """
+        Args:
+            width: of the container the objects move in (coordinates go from 0 to width).
+            height: of the container the objects move in (coordinates go from 0 to height).
+            capacity: initial number of rows. Arrays grow when more objects register.
+        """
+        assert capacity > 0
+        self.width = width
+        self.height = height
+        self.count = 0
+        self.agents = []
+        self.positions = np.zeros((capacity, 2))
+        self.speeds = np.zeros((capacity, 2))
+        self.headings = np.zeros((capacity, 2))
+        self.frictions = np.zeros(capacity) # 0 means 'no friction'
+        self.durations = np.zeros(capacity) # how long is each pending move
+        self.pending = np.zeros(capacity, dtype=bool)
+
+    def __grow__(self):
+        """Doubles the number of rows available."""
+        def doubled(an_array: np.ndarray) -> np.ndarray:
+            bigger = np.zeros((2 * an_array.shape[0],) + an_array.shape[1:], dtype=an_array.dtype)
+            bigger[:an_array.shape[0]] = an_array
+            return bigger
+        self.positions = doubled(self.positions)
+        self.speeds = doubled(self.speeds)
+        self.headings = doubled(self.headings)
+        self.frictions = doubled(self.frictions)
+        self.durations = doubled(self.durations)
+        self.pending = doubled(self.pending)
+
+    def register(self, an_agent) -> int:
+        """Reserves a row for an agent. Returns the index of that row."""
+        if self.count == self.positions.shape[0]:
+            self.__grow__()
+        row = self.count
+        self.count += 1
+        self.agents.append(an_agent)
+        return row
+
+    def request_move(self, row: int, for_how_long: float, friction_constant_opt: Optional[float] = None):
+        """Marks an agent as moving on the next call to 'advance_pending'."""
+        self.pending[row] = True
+        self.durations[row] = for_how_long
+        self.frictions[row] = 0.0 if friction_constant_opt is None else friction_constant_opt
+
+    def pending_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.pending[:self.count])
+
+    def advance_pending(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Moves all pending agents: speeds (friction, rebounds) and headings are updated on the arrays.
+        Positions are NOT written: the caller has to place the agents on its space (see SkatingIce.advance_pending_agents).
+
+        Returns:
+            The rows that moved, and their new positions (one line per row).
+
+        """
+        rows = self.pending_rows()
+        self.pending[rows] = False
+        speeds = self.speeds[rows]
+        # First, apply deceleration because of friction (for reference: https://www.youtube.com/watch?v=y1kqH63-828)
+        frictions = self.frictions[rows][:, None]
+        speeds = np.sign(speeds) * \
+                 np.maximum(0.0, (np.abs(speeds * FEET_IN_METER) - GRAVITY_ACCELERATION * frictions) / FEET_IN_METER)
+        # Then move, rebounding from walls
+        new_positions, flipped = fold_into_walls_array(
+            positions=self.positions[rows],
+            displacements=speeds * self.durations[rows][:, None],
+            min_valid=0.0,
+            max_valid=np.array([self.width, self.height]))
+        speeds = np.where(flipped, -speeds, speeds)
+        self.speeds[rows] = speeds
+        # gaze follows speed (essentially because there are reboundings)
+        norms = np.hypot(speeds[:, 0], speeds[:, 1])
+        moving = norms != 0
+        self.headings[rows[moving]] = speeds[moving] / norms[moving][:, None]
+        return rows, new_positions
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""What every player senses, computed for all players at once.
+
+Same definitions as EnvironmentState (and Player.can_see_puck, Player.can_reach_puck, ...), but on arrays:
+row i of each array is player i. Results are bits, as in BitstringEnvironmentState.
+Where things are (in front, to the right, ...) is answered without angles (see util.geometry.predicates).
+Lengths and angles are computed on the selected backend (see util.backends).
+
+"""
+
+import math
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from util import backends
+from util.geometry import predicates
+from hockey.behaviour.core.quantizers import ANGLE_BITS, DISTANCE_BITS, OneHotQuantizer, folded_degrees_array
+
+TWO_PI = 2 * math.pi
+HALF_PI = math.pi / 2
+# angles on the limits of what a player sees are kept visible (it's what the angles of Vec2d give on a grid):
+ANGLE_TOLERANCE = 1e-9
+
+# bits sensed by default (same as BitstringEnvironmentState.bit_fns):
+DEFAULT_BITS = ['attacking', 'have_puck', 'my_team_has_puck', 'can_I_reach_puck', 'can_see_puck'] + \
+               ['bit_%d_distance_to_puck' % i for i in range(8)] + \
+               ['puck_straight_ahead', 'puck_to_my_right'] + \
+               ['bit_%d_angle_to_puck' % i for i in range(7)]
+
+# thresholds of the 'closer than' and of the 'less than' bits (as EnvironmentState):
+CLOSER_THAN = OneHotQuantizer(list(range(10, 60 + 1, 10)))
+TENTHS_OF_PI = OneHotQuantizer([math.pi / 10] + [k * math.pi / 10 for k in range(2, 10)] + [math.pi])
+
+
+def angles_from_headings(headings: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Counter-clockwise angle, in [0, 2Pi), from each heading to each vector (as Vec2d.angle_to)."""
+    return backends.kernel('angles_from_headings')(headings, vectors)
+
+def norms(vectors: np.ndarray) -> np.ndarray:
+    """Length of each (row) vector."""
+    return backends.kernel('norms')(vectors)
+
+# kernels (see util.backends):
+
+@backends.register('angles_from_headings')
+def __angles_from_headings_numpy__(headings: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    angles = np.arctan2(vectors[:, 1], vectors[:, 0]) - np.arctan2(headings[:, 1], headings[:, 0])
+    return np.mod(angles, TWO_PI)
+
+def __angles_from_headings_loop__(headings: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    angles = np.empty(vectors.shape[0])
+    for i in range(vectors.shape[0]):
+        angles[i] = (math.atan2(vectors[i, 1], vectors[i, 0]) - math.atan2(headings[i, 1], headings[i, 0])) % TWO_PI
+    return angles
+
+@backends.register('norms')
+def __norms_numpy__(vectors: np.ndarray) -> np.ndarray:
+    return np.hypot(vectors[:, 0], vectors[:, 1])
+
+def __norms_loop__(vectors: np.ndarray) -> np.ndarray:
+    result = np.empty(vectors.shape[0])
+    for i in range(vectors.shape[0]):
+        result[i] = math.hypot(vectors[i, 0], vectors[i, 1])
+    return result
+
+backends.register_jit('angles_from_headings', __angles_from_headings_loop__)
+backends.register_jit('norms', __norms_loop__)
+
+def min_angles(angles: np.ndarray) -> np.ndarray:
+    """Angle irrespective of the side ('right' or 'left')."""
+    return np.where(angles <= HALF_PI + ANGLE_TOLERANCE, angles, TWO_PI - angles)
+
+def sense_team(positions: np.ndarray,
+               headings: np.ndarray,
+               attacking: np.ndarray,
+               unable_to_play: np.ndarray,
+               reaches: np.ndarray,
+               puck_pos: Tuple[float, float],
+               owner_row_opt: Optional[int],
+               goal_posts_opt: Optional[Tuple[Tuple[float, float], Tuple[float, float]]] = None) -> Dict[str, np.ndarray]:
+    """
+    Quantities sensed by each player. Pure function of its arguments.
+
+    Args:
+        positions, headings: (n, 2) arrays, where players are and where they look at.
+        attacking: (n,) booleans, True for forwards.
+        unable_to_play: (n,) seconds each player still has to wait before playing the puck.
+        reaches: (n,) reach of each player, in feet.
+        puck_pos: where the puck is.
+        owner_row_opt: row of the player that has the puck (None if it is free).
+        goal_posts_opt: positions of both goal posts (if the ice has a goal).
+
+    Returns:
+        arrays (one value per player), by name.
+
+    """
+    n = positions.shape[0]
+    to_puck = np.asarray(puck_pos, dtype=np.float64)[None, :] - positions
+    on_top = (to_puck[:, 0] == 0) & (to_puck[:, 1] == 0)
+    in_front = predicates.in_front_array(headings, to_puck)
+    can_see = on_top | in_front
+    distances = norms(to_puck)
+    can_reach = (unable_to_play <= 0) & can_see & (on_top | predicates.within_reach_array(headings, to_puck, reaches))
+    have_puck = np.zeros(n, dtype=bool)
+    my_team_has_puck = np.zeros(n, dtype=bool)
+    if owner_row_opt is not None:
+        have_puck[owner_row_opt] = True
+        my_team_has_puck = attacking == attacking[owner_row_opt]
+    straight_ahead = predicates.straight_ahead_array(headings, to_puck)
+    to_my_right = in_front & predicates.to_the_right_array(headings, to_puck) & ~straight_ahead
+    sensed = {
+        'attacking': attacking,
+        'have_puck': have_puck,
+        'my_team_has_puck': my_team_has_puck,
+        'on_top_of_puck': on_top,
+        'heading': headings,
+        'vector_to_puck': to_puck,
+        'puck_in_front': in_front,
+        'distance_to_puck': distances,
+        'can_see_puck': can_see,
+        'can_I_reach_puck': can_reach,
+        'puck_straight_ahead': straight_ahead,
+        'puck_to_my_right': to_my_right,
+        'puck_to_my_left': can_see & ~to_my_right,
+    }
+    if goal_posts_opt is not None:
+        goal_x = goal_posts_opt[0][0]
+        for idx, a_post in enumerate(goal_posts_opt):
+            to_post = np.asarray(a_post, dtype=np.float64)[None, :] - positions
+            post_in_front = predicates.in_front_array(headings, to_post)
+            sensed['distance_to_goal_post_%d' % (idx + 1)] = norms(to_post)
+            # (behind the goal, no post is seen)
+            sensed['can_see_goal_post_%d' % (idx + 1)] = post_in_front & (positions[:, 0] <= goal_x)
+            sensed['goal_post_%d_to_my_right' % (idx + 1)] = post_in_front & predicates.to_the_right_array(headings, to_post)
+    return sensed
+
+def bits_from(sensed: Dict[str, np.ndarray], bit_fns: List[str]) -> np.ndarray:
+    """(n_players, len(bit_fns)) matrix of uint8, with the bits named as in EnvironmentState."""
+    can_see = sensed['can_see_puck']
+    angle_visible = sensed['puck_in_front']
+    distances = sensed['distance_to_puck']
+    distance_bits = DISTANCE_BITS.bits_array(np.round(distances).astype(np.int64), can_see)
+    # (a value is under the i-th threshold iff its slice is at most i)
+    distance_slices = CLOSER_THAN.index_array(distances, can_see)
+    if any(('angle_to_puck' in name) for name in bit_fns):
+        # angles are only computed for the bits that encode them:
+        angles = angles_from_headings(sensed['heading'], sensed['vector_to_puck'])
+        angle_bits = ANGLE_BITS.bits_array(folded_degrees_array(angles), angle_visible)
+        angle_slices = TENTHS_OF_PI.index_array(min_angles(angles), angle_visible)
+    n = can_see.shape[0]
+    result = np.zeros((n, len(bit_fns)), dtype=np.uint8)
+    for column, name in enumerate(bit_fns):
+        if name in sensed and sensed[name].dtype == bool:
+            result[:, column] = sensed[name]
+        elif name.startswith('bit_') and name.endswith('_distance_to_puck'):
+            result[:, column] = distance_bits[:, int(name.split('_')[1])]
+        elif name.startswith('bit_') and name.endswith('_angle_to_puck'):
+            result[:, column] = angle_bits[:, int(name.split('_')[1])]
+        elif name.startswith('angle_to_puck_less_than_'):
+            k = name[len('angle_to_puck_less_than_'):-len('pi_over_10')]
+            result[:, column] = angle_slices <= (int(k) if k != '' else 1) - 1
+        elif name.startswith('puck_closer_than_') and (int(name.split('_')[3]) in CLOSER_THAN.thresholds):
+            result[:, column] = distance_slices <= CLOSER_THAN.thresholds.index(int(name.split('_')[3]))
+        elif name.startswith('goal_post_') and ('_closer_than_' in name) and (('can_see_' + name[:len('goal_post_1')]) in sensed) and \
+                (int(name.split('_')[5]) in CLOSER_THAN.thresholds):
+            post = name[:len('goal_post_1')]
+            post_slices = CLOSER_THAN.index_array(sensed['distance_to_' + post], sensed['can_see_' + post])
+            result[:, column] = post_slices <= CLOSER_THAN.thresholds.index(int(name.split('_')[5]))
+        else:
+            raise ValueError("Don't know how to sense '%s' in batch" % (name))
+    return result
+
+def sense_team_bits(positions: np.ndarray,
+                    headings: np.ndarray,
+                    attacking: np.ndarray,
+                    unable_to_play: np.ndarray,
+                    reaches: np.ndarray,
+                    puck_pos: Tuple[float, float],
+                    owner_row_opt: Optional[int],
+                    goal_posts_opt: Optional[Tuple[Tuple[float, float], Tuple[float, float]]] = None,
+                    bit_fns: List[str] = DEFAULT_BITS) -> np.ndarray:
+    """sense_team, then bits_from: (n_players, n_bits) matrix of uint8."""
+    sensed = sense_team(positions, headings, attacking, unable_to_play, reaches, puck_pos, owner_row_opt, goal_posts_opt)
+    return bits_from(sensed, bit_fns)
@@ -13,8 +13,14 @@ from typing import Callable, Optional, Tuple, List
 
 from hockey.behaviour.core.action import HockeyAction
 from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
+from hockey.behaviour.core.brain_file import load_model
+from hockey.behaviour.core.match_set_cache import MatchSetCache
+from hockey.behaviour.core.packed_bits import pack
+from hockey.behaviour.core.population_index import indexed_model
 from hockey.core.ice_surface.half_rink import HockeyHalfRink
+from hockey.core.ice_surface.symmetry import mirror_action
 from hockey.core.player.base import Player
+from util.background_writer import BackgroundWriter, write_atomically
 
 
 # Diverse actions for the player to perform.
@@ -42,23 +48,31 @@ class Evaluator(object):
 
     def __init__(self,
                  player: Player,
-                 load_from_full_file_name: str,
+                 load_from_full_file_name: Optional[str],
                  total_number_of_actions: int,
                  steps_in_height: int,
-                 steps_in_widht: int):
+                 steps_in_widht: int,
+                 model_opt: Optional[xcs.ClassifierSet] = None):
+        """Evaluates the brain in a file or, if 'model_opt' is given, that one (eg, the one a simulator keeps in memory)."""
         print("setting random")
         random.seed(333)
-        if not Path(load_from_full_file_name).is_file():
-            raise RuntimeError("'%s' doesn't look like a model file name" % (load_from_full_file_name))
         self.load_from = load_from_full_file_name
         self.player = player
         self.world = self.player.model
-        last_modified_str = time.ctime(os.stat(self.load_from).st_mtime)
-        print("[Evaluator] Loading model from file '%s' (last modified on %s)..." % (self.load_from, last_modified_str))
         self.model = None
-        with open(self.load_from, 'rb') as f:
-            self.model = pickle.load(f)
+        if model_opt is not None:
+            self.model = indexed_model(model_opt)
+        else:
+            if (load_from_full_file_name is None) or (not Path(load_from_full_file_name).is_file()):
+                raise RuntimeError("'%s' doesn't look like a model file name" % (load_from_full_file_name))
+            last_modified_str = time.ctime(os.stat(self.load_from).st_mtime)
+            print("[Evaluator] Loading model from file '%s' (last modified on %s)..." % (self.load_from, last_modified_str))
+            self.model = load_model(self.load_from)
+        # (a brain we don't own is given back as it was)
+        exploration_probability_before = self.model.algorithm.exploration_probability
         self.model.algorithm.exploration_probability = 0
+        # situation -> (match set, its action sets sorted by prediction); the brain doesn't learn here, so all sweeps share them.
+        self.predictions_cache = MatchSetCache()
         # self.model.algorithm
         self.total_number_of_actions = total_number_of_actions
         assert self.total_number_of_actions > 0
@@ -78,6 +92,8 @@ class Evaluator(object):
         self.optimal_actions["look_at_left_and_near"] = (look_at_left_and_near, [HockeyAction.TURN_HARD_LEFT, HockeyAction.SKATE_MIN_SPEED])
         self.perf_matrixes = {}
         self.quality = self.update_quality() # based on how much the actions of this brain match the optimals.
+        if model_opt is not None:
+            self.model.algorithm.exploration_probability = exploration_probability_before
 
 
     def quality_performance(self, result_matrix) -> Tuple[float, float]:
@@ -91,6 +107,8 @@ class Evaluator(object):
         self.pre_sense_fn = pre_sense_fn
         print("[WARMING UP problem '%s'] sweeping ice size height = %d, width = %d..." %
               (self.problem_name, self.world.HEIGHT_ICE, self.world.WIDTH_HALF_ICE))
+        # (on symmetric ice, a situation and its mirror image are sensed the same: each is matched once)
+        situations_matched = set()
         for h in self.heights_to_sample:
             if verbose and h % 10 == 0:
                 print("sweeping height %d out of %d" % (h, self.world.HEIGHT_ICE))
@@ -101,10 +119,12 @@ class Evaluator(object):
                 pre_sense_fn(self.player)
                 assert self.player.pos == Point(w, h)
                 # let's sense the environment and see what the brain says to do:
-                situation_sensed = BitstringEnvironmentState(full_state=self.player.sense()).as_bitstring()
-                match_set2 = self.model.match(situation_sensed)
-        #         if len(match_set2) == 0:
-        #             print("Nothing here!!!!")
+                situation_sensed, _ = BitstringEnvironmentState.of(self.player.sense()).as_canonical_bitstring()
+                situation_key = pack(situation_sensed)
+                if situation_key not in situations_matched:
+                    situations_matched.add(situation_key)
+                    # (no covering: the brain might be the one being trained)
+                    self.model.match(situation_sensed, covering=False)
         print("[WARMING UP] DONE")
 
     def __performance_matrix__(self,
@@ -142,7 +162,7 @@ class Evaluator(object):
         # distance_to_grab = 10
         # result_matrix[0:distance_to_grab - 1, 0:distance_to_grab - 1] = 1 # I am "just a cote" of the puck, so action by default will be 'pick up'
 
-        self.actions_on_sensing = {}
+        self.actions_on_sensing = {} # (packed situation) -> actions proposed
         if (verbose):
             print("sweeping ice size height = %d, width = %d..." % (self.world.HEIGHT_ICE, self.world.WIDTH_HALF_ICE))
         for h in self.heights_to_sample:
@@ -156,28 +176,22 @@ class Evaluator(object):
                     pre_sense_fn(self.player)
                     assert self.player.pos == Point(w, h)
                     # let's sense the environment and see what the brain says to do:
-                    situation_sensed = BitstringEnvironmentState(full_state=self.player.sense()).as_bitstring()
+                    # (on symmetric ice the situation might be the mirror image of this one: then so is the action)
+                    situation_sensed, flipped = BitstringEnvironmentState.of(self.player.sense()).as_canonical_bitstring()
                     bitstring_matrix[h,w] = situation_sensed
-                    self.sensing_matrix[h, w] = hash(situation_sensed)
-
-                    # ************************************************************
-                    # ************************************************************
-                    # ************************************************************
-                    # Find the conditions that match against the current situation, and
-                    # group them according to which action(s) they recommend.
-                    by_action = {}
-                    for condition, actions in self.model._population.items():
-                        if not condition(situation_sensed):
-                            continue
-
-                        for action, rule in actions.items():
-                            if action in by_action:
-                                by_action[action][condition] = rule
-                            else:
-                                by_action[action] = {condition: rule}
-
-                    # Construct the match set.
-                    match_set = xcs.MatchSet(self.model, situation_sensed, by_action)
+                    situation_key = pack(situation_sensed)
+                    self.sensing_matrix[h, w] = situation_key
+
+                    # (predictions only change when rules are added/discarded, or when they learn - which advances the time stamp)
+                    model_version = (self.model.population_version, self.model.time_stamp)
+                    cached_opt = self.predictions_cache.get(situation_key, model_version)
+                    if cached_opt is None:
+                        # (no covering: evaluating leaves the population as it is)
+                        match_set = self.model.match(situation_sensed, covering=False)
+                        sorted_list = sorted([[k, v] for k, v in match_set._action_sets.items()], key=lambda ssss: ssss[1].prediction, reverse=True)
+                        self.predictions_cache.put(situation_key, model_version, (match_set, sorted_list))
+                    else:
+                        match_set, sorted_list = cached_opt
                     # ************************************************************
                     # ************************************************************
                     # ************************************************************
@@ -194,24 +208,23 @@ class Evaluator(object):
                     #                           if abs(action_sets[an_action].prediction) > limit_for_choosing }
 
                     # 1 if perfect, 0: completely off.
-                    dict_as_list = [[k, v] for k, v in action_sets.items()]
-                    if len(dict_as_list) > 0:
-                        sorted_list = sorted(dict_as_list, key=lambda ssss: ssss[1].prediction, reverse=True)
+                    if len(sorted_list) > 0:
                         best_action = sorted_list[0][0]
                         # result_matrix[h, w] = hash(best_action)
 
-                        actions_proposed = self.actions_on_sensing.get(situation_sensed, [])
+                        actions_proposed = self.actions_on_sensing.get(situation_key, [])
                         actions_proposed = \
                             actions_proposed if len([elt for elt in actions_proposed if elt[0] == best_action]) > 0 \
                                 else actions_proposed + [(best_action, 0, sorted_list)]
                         new_actions_proposed = list(map(lambda t: t if t[0] != best_action else (t[0], t[1] + 1, t[2]), actions_proposed))
-                        self.actions_on_sensing[situation_sensed] = new_actions_proposed
+                        self.actions_on_sensing[situation_key] = new_actions_proposed
 
+                        action_on_ice = mirror_action(best_action) if flipped else best_action
                         result_matrix[h, w] = \
-                            1 if (best_action in set(optimal_actions)) \
-                                else 0.5 if (best_action in set(near_optimal_actions)) \
+                            1 if (action_on_ice in set(optimal_actions)) \
+                                else 0.5 if (action_on_ice in set(near_optimal_actions)) \
                                 else 0
-                        self.distance2optimal[h, w] = (1 if best_action in optimal_actions else -1) * \
+                        self.distance2optimal[h, w] = (1 if action_on_ice in optimal_actions else -1) * \
                                                       action_sets[best_action].prediction_weight
                     else:
                         result_matrix[h, w] = 0
@@ -261,7 +274,7 @@ class Evaluator(object):
 
 
         if (verbose):
-            print("DONE!!!")
+            print("DONE!!! (predictions: %s)" % (self.predictions_cache))
         assert len(np.argwhere(self.distance2optimal == -1)) == 0
         return result_matrix
 
@@ -286,12 +299,15 @@ class Evaluator(object):
         self.quality = (m / len(self.optimal_actions), s / len(self.optimal_actions))
         return self.quality
 
-    def save_performances_to(self, full_file_name: str) -> bool:
+    def save_performances_to(self, full_file_name: str, writer_opt: Optional[BackgroundWriter] = None) -> bool:
+        """Saves (atomically) the performance matrices; if a writer is given, in the background."""
         if len(self.perf_matrixes) == 0:
             print("[saving performances] dictionary with matrices is empty. Nor saving anything.")
             return False
-        with open(full_file_name, "wb") as pickle_out:
-            pickle.dump(self.perf_matrixes, pickle_out)
+        if writer_opt is not None:
+            writer_opt.write(full_file_name, self.perf_matrixes)
+        else:
+            write_atomically(full_file_name, pickle.dumps(self.perf_matrixes))
         return True
 
 
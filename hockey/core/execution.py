@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""How much checking (asserts, reporting strings, prints) does the simulation do?
+
+"""
+
+from enum import Enum, auto
+
+
+class ExecutionMode(Enum):
+    CHECKED = auto() # every tick is validated and reported
+    SAMPLED = auto() # one tick every so often is validated and reported
+    UNCHECKED = auto() # no validation, no reporting
+
+
+class ExecutionPolicy(object):
+    """Decides, for a tick of the world, if the sanity checks (and debugging strings) run."""
+
+    def __init__(self, mode: ExecutionMode = ExecutionMode.CHECKED, check_one_tick_every: int = 10):
+        """
+        Args:
+            mode: see ExecutionMode.
+            check_one_tick_every: (only for ExecutionMode.SAMPLED) ticks 0, n, 2n, ... are checked.
+        """
+        assert check_one_tick_every >= 1
+        self.mode = mode
+        self.check_one_tick_every = check_one_tick_every
+
+    @classmethod
+    def sampling(cls, fraction_of_ticks: float) -> 'ExecutionPolicy':
+        """Checks (approximately) this fraction of the ticks."""
+        assert 0 < fraction_of_ticks <= 1
+        return cls(mode=ExecutionMode.SAMPLED, check_one_tick_every=max(1, round(1 / fraction_of_ticks)))
+
+    def checks(self, tick: int) -> bool:
+        """Does this tick have to be checked? Deterministic (no random numbers are drawn)."""
+        if self.mode is ExecutionMode.CHECKED:
+            return True
+        elif self.mode is ExecutionMode.UNCHECKED:
+            return False
+        else:
+            return tick % self.check_one_tick_every == 0
+
+    def __str__(self):
+        if self.mode is ExecutionMode.SAMPLED:
+            return "%s (1 tick every %d)" % (self.mode.name, self.check_one_tick_every)
+        return self.mode.name
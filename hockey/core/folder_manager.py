@@ -15,13 +15,15 @@ class FolderManager(object):
         self.brain_evals_dir = os.path.join(self.brain_dir, "evals")
         self.model_dir = os.path.join(self.experiment_dir, "model")
         self.agents_dir = os.path.join(self.experiment_dir, "agents")
+        self.tables_dir = os.path.join(self.experiment_dir, "tables")
 
     def directories2str(self) -> str:
         return "experiment_dir = '%s'\n" % (self.experiment_dir) + \
                "brain_dir = '%s'\n" % (self.brain_dir) + \
                "brain_evals_dir = '%s'\n" % (self.brain_evals_dir) + \
                "model_dir = '%s'\n" % (self.model_dir) + \
-               "agents_dir = '%s'\n" % (self.agents_dir)
+               "agents_dir = '%s'\n" % (self.agents_dir) + \
+               "tables_dir = '%s'\n" % (self.tables_dir)
 
     def makedirs(self):
         os.makedirs(self.experiment_dir, exist_ok=True)
@@ -29,6 +31,7 @@ class FolderManager(object):
         os.makedirs(self.brain_evals_dir, exist_ok=True)
         os.makedirs(self.model_dir, exist_ok=True)
         os.makedirs(self.agents_dir, exist_ok=True)
+        os.makedirs(self.tables_dir, exist_ok=True)
 
     def __name_composer__(self, root_dir: str, str_id: str, idx_descr: str, idx: int, full: bool, ext: str) -> str:
         f_name = "%s_%s_%s_%d.%s" % (self.templates_prefix, str_id, idx_descr, idx, ext)
@@ -37,6 +40,10 @@ class FolderManager(object):
     def brain_file_name(self, episode: int, full: bool) -> str:
         return self.__name_composer__(root_dir=self.brain_dir, str_id="brain", idx_descr="episode", idx=episode, full=full, ext="bin")
 
+    def compact_brain_file_name(self, episode: int, full: bool) -> str:
+        """Same brain as in 'brain_file_name', in a columnar format that loads fast (see brain_file.Brain)."""
+        return self.__name_composer__(root_dir=self.brain_dir, str_id="brain", idx_descr="episode", idx=episode, full=full, ext="xcsb")
+
     def brain_eval_file_name(self, episode: int, full: bool) -> str:
         return self.__name_composer__(root_dir=self.brain_evals_dir, str_id="eval", idx_descr="episode", idx=episode, full=full, ext="csv")
 
@@ -46,10 +53,18 @@ class FolderManager(object):
     def agents_file_name(self, run_number: int, full: bool) -> str:
         return self.__name_composer__(root_dir=self.agents_dir, str_id="agents", idx_descr="run", idx=run_number, full=full, ext="pd")
 
+    def sensing_table_file_name(self, width: int, height: int, full: bool, symmetric: bool = False) -> str:
+        """Situations sensed on a rink of this size (see SensingTable)."""
+        f_name = "%s_sensing_%dx%d%s.npy" % (self.templates_prefix, width, height, "_mirror" if symmetric else "")
+        return os.path.join(self.tables_dir, f_name) if full else f_name
+
     def newest_brain_file(self) -> Optional[str]:
         """Gets newest brain in a folder - None is there is nothing there or the directory doesn't exist."""
         return find_newest_file_in_dir(self.brain_dir, file_pattern='*.bin')
 
+    def newest_compact_brain_file(self) -> Optional[str]:
+        return find_newest_file_in_dir(self.brain_dir, file_pattern='*.xcsb')
+
     def chose_brain_file_name(self) -> Tuple[int, str]:
         newest_brain = self.newest_brain_file()
         if newest_brain is None:
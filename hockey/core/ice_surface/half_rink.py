@@ -9,9 +9,11 @@ from geometry.vector import Vec2d
 from mesa.datacollection import DataCollector
 from typing import Optional, Tuple
 
+from hockey.core.execution import ExecutionPolicy
 from hockey.core.folder_manager import FolderManager
 from hockey.behaviour.core.rule_based_brain import RuleBasedBrain
 from hockey.core.ice_surface.ice_rink import SkatingIce
+from hockey.core.ice_surface.symmetry import MirrorSymmetry
 from hockey.core.player.defense import Defense
 from hockey.core.puck import Puck
 from util.geometry.lines import cells_between
@@ -39,7 +41,11 @@ class HockeyHalfRink(SkatingIce):
                  width: int,
                  height: int,
                  how_many_defense: int,
-                 how_many_offense: int):
+                 how_many_offense: int,
+                 batch_physics: bool = False,
+                 event_driven_puck: bool = False,
+                 execution_opt: Optional[ExecutionPolicy] = None,
+                 occupancy_grid: bool = False):
         """
         
         Args:
@@ -47,13 +53,21 @@ class HockeyHalfRink(SkatingIce):
             height: how many divisions on Y
             how_many_defense: 
             how_many_offense: 
+            batch_physics: see SkatingIce.
+            event_driven_puck: see SkatingIce.
+            execution_opt: see SkatingIce.
+            occupancy_grid: see SkatingIce.
         """
         assert how_many_defense >= 0 and how_many_offense >= 0
         SkatingIce.__init__(self,
                             width,
                             height,
                             how_many_defense,
-                            how_many_offense)
+                            how_many_offense,
+                            batch_physics,
+                            event_driven_puck,
+                            execution_opt,
+                            occupancy_grid)
         # data collector
         self.datacollector = DataCollector(
             model_reporters={
@@ -65,14 +79,15 @@ class HockeyHalfRink(SkatingIce):
             },
             agent_reporters={
                 "timestamp": lambda agent: agent.model.schedule.steps * agent.model.one_step_in_seconds,
+                "kind": lambda agent: agent.kind,
                 "pos_x": lambda agent: agent.pos.x,
                 "pos_y": lambda agent: agent.pos.y,
                 "speed_x": lambda agent: agent.speed.x,
                 "speed_y": lambda agent: agent.speed.y,
                 "speed_magnitude": lambda agent: agent.speed.norm(),
-                "topuck_x": lambda agent: agent.model.vector_to_puck(a_pos = agent.pos).x if type(agent) != Puck else "",
-                "topuck_y": lambda agent: agent.model.vector_to_puck(a_pos = agent.pos).y if type(agent) != Puck else "",
-                "angle2puck": lambda agent: agent.model.angle_to_puck(a_pos = agent.pos, looking_at = agent.vector_looking_at()) if type(agent) != Puck else "",
+                "topuck_x": lambda agent: agent.vector_to_puck().x if type(agent) != Puck else "",
+                "topuck_y": lambda agent: agent.vector_to_puck().y if type(agent) != Puck else "",
+                "angle2puck": lambda agent: agent.angle_to_puck() if type(agent) != Puck else "",
                 "last_action": lambda agent: agent.last_action if type(agent) != Puck else "",
                 "have_puck": lambda agent: agent.have_puck if type(agent) != Puck else "",
                 "can_see_puck": lambda agent: agent.can_see_puck() if type(agent) != Puck else "",
@@ -170,7 +185,7 @@ class HockeyHalfRink(SkatingIce):
         """Run one step of the model. """
         goals_before = self.goals_scored
         shots_before = self.shots
-        self.schedule.step()
+        self.step_agents()
         self.collect_data_if_is_time()
         if self.shots > shots_before:
             self.puck.prob_of_goal = 0.0
@@ -179,6 +194,13 @@ class HockeyHalfRink(SkatingIce):
             self.reset_agents()
         self.update_running_flag()
 
+    def use_symmetry(self):
+        """See SkatingIce. What players sense is symmetric about the center of the goal (walls are not sensed)."""
+        self.symmetry_opt = MirrorSymmetry(axis_y=HockeyHalfRink.GOALIE_CENTER.y)
+
+    def goal_posts_opt(self) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        return ((self.GOALIE_POST_1.x, self.GOALIE_POST_1.y), (self.GOALIE_POST_2.x, self.GOALIE_POST_2.y))
+
     def vectors_to_goal(self, a_pos: Point) -> Tuple[Vec2d, Vec2d]:
         return (Vec2d.from_to(from_pt=a_pos, to_pt=self.GOALIE_POST_1),
                 Vec2d.from_to(from_pt=a_pos, to_pt=self.GOALIE_POST_2))
@@ -7,7 +7,6 @@ import random
 
 from mesa import Model
 from mesa.datacollection import DataCollector
-from mesa.space import ContinuousSpace
 from mesa.time import RandomActivation
 from geometry.point import Point
 from geometry.vector import Vec2d
@@ -16,13 +15,16 @@ from geometry.angle import AngleInRadians
 from util.base import choose_first_option_by_roulette
 from util.geometry.lines import cells_between
 from hockey.core.puck import Puck
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from hockey.behaviour.core.rule_based_brain import RuleBasedBrain
 from hockey.core.player.base import Player
 from hockey.core.player.defense import Defense
 from hockey.core.player.forward import Forward
 from hockey.core.model import TIME_PER_FRAME
+from hockey.core.execution import ExecutionPolicy
+from hockey.core.ice_surface.indexed_space import IndexedContinuousSpace
+from hockey.core.ice_surface.symmetry import MirrorSymmetry
 
 class HockeyHalfRinkContinuous(Model):
     """The attacking side of a Hockey Rink."""
@@ -46,7 +48,12 @@ class HockeyHalfRinkContinuous(Model):
         """Returns a random position inside of the half-ice."""
         return Point(random.random() * self.width, random.random() * self.height)
 
-    def __init__(self, how_many_defense: int, how_many_offense: int, one_step_in_seconds: float, collect_data_every_secs: float, record_this_many_minutes: int):
+    def __init__(self, how_many_defense: int, how_many_offense: int, one_step_in_seconds: float, collect_data_every_secs: float, record_this_many_minutes: int,
+                 event_driven_puck: bool = False):
+        """
+        Args:
+            event_driven_puck: if True, a free puck is only moved on the space when something happens to it (see Puck.fly).
+        """
         assert one_step_in_seconds > 0 and how_many_defense >= 0 and how_many_offense >= 0
         Model.__init__(self)
         self.HOW_MANY_MINUTES_TO_RECORD = record_this_many_minutes
@@ -54,12 +61,20 @@ class HockeyHalfRinkContinuous(Model):
         self.one_step_in_seconds = one_step_in_seconds
         # every how many steps do I have to collect data:
         self.collect_every_steps = (1 / self.one_step_in_seconds) * collect_data_every_secs
-        self.height = HockeyHalfRink.HEIGHT_ICE
-        self.width = HockeyHalfRink.WIDTH_HALF_ICE
+        self.height = HockeyHalfRinkContinuous.HEIGHT_ICE
+        self.width = HockeyHalfRinkContinuous.WIDTH_HALF_ICE
         self.schedule = RandomActivation(self)
         # if this was a Grid, the attribute would be called 'self.grid'
         # But because it is continuous, it is called 'self.space'
-        self.space = ContinuousSpace(x_max=self.width, y_max=self.height, torus=False)
+        # (indexed, so proximity queries don't look at every agent)
+        self.space = IndexedContinuousSpace(x_max=self.width, y_max=self.height, torus=False)
+        self.physics = None # no batch physics here
+        self.transitions = None
+        self.sensing_table = None
+        self.symmetry_opt = None # type: Optional[MirrorSymmetry]
+        self.event_driven_puck = event_driven_puck
+        self.execution = ExecutionPolicy()
+        self.puck_owner_opt = None # (not kept here: see who_has_the_puck)
         # data collector
         self.datacollector = DataCollector(
             model_reporters={
@@ -71,14 +86,15 @@ class HockeyHalfRinkContinuous(Model):
             },
             agent_reporters={
                 "timestamp": lambda agent: agent.model.schedule.steps * agent.model.one_step_in_seconds,
+                "kind": lambda agent: agent.kind,
                 "pos_x": lambda agent : agent.pos.x,
                 "pos_y": lambda agent: agent.pos.y,
                 "speed_x": lambda agent: agent.speed.x,
                 "speed_y": lambda agent: agent.speed.y,
                 "speed_magnitude": lambda agent: agent.speed.norm(),
-                "topuck_x": lambda agent: agent.model.vector_to_puck(a_pos = agent.pos).x if type(agent) != Puck else "",
-                "topuck_y": lambda agent: agent.model.vector_to_puck(a_pos = agent.pos).y if type(agent) != Puck else "",
-                "angle2puck": lambda agent: agent.model.angle_to_puck(a_pos = agent.pos, looking_at = agent.vector_looking_at()) if type(agent) != Puck else "",
+                "topuck_x": lambda agent: agent.vector_to_puck().x if type(agent) != Puck else "",
+                "topuck_y": lambda agent: agent.vector_to_puck().y if type(agent) != Puck else "",
+                "angle2puck": lambda agent: agent.angle_to_puck() if type(agent) != Puck else "",
                 "last_action": lambda agent: agent.last_action if type(agent) != Puck else "",
                 "have_puck": lambda agent: agent.have_puck if type(agent) != Puck else "",
                 "can_see_puck": lambda agent: agent.can_see_puck() if type(agent) != Puck else "",
@@ -86,7 +102,7 @@ class HockeyHalfRinkContinuous(Model):
             }
         )
         #
-        self.goal_position = (HockeyHalfRink.GOALIE_X,(HockeyHalfRink.GOALIE_Y_BOTTOM, HockeyHalfRink.GOALIE_Y_TOP))
+        self.goal_position = (HockeyHalfRinkContinuous.GOALIE_X,(HockeyHalfRinkContinuous.GOALIE_Y_BOTTOM, HockeyHalfRinkContinuous.GOALIE_Y_TOP))
         self.count_defense = how_many_defense
         self.count_attackers = how_many_offense
         # Set up agents
@@ -135,7 +151,7 @@ class HockeyHalfRinkContinuous(Model):
         self.space.place_agent(self.puck, pos = Point(0,0))
         [defense_player.reset(to_speed=0.01) for defense_player in self.defense]
         [attack_player.reset(to_speed=0.01) for attack_player in self.attack]
-        p_player = Point(HockeyHalfRink.WIDTH_HALF_ICE - 1,HockeyHalfRink.HEIGHT_ICE - 1)
+        p_player = Point(HockeyHalfRinkContinuous.WIDTH_HALF_ICE - 1,HockeyHalfRinkContinuous.HEIGHT_ICE - 1)
         [self.space.place_agent(defense_player, pos = p_player) for defense_player in self.defense]
         [self.space.place_agent(attacker, pos = p_player) for attacker in self.attack]
         # TODO: _this_ is really 'random': (have to puck it back)
@@ -205,6 +221,26 @@ class HockeyHalfRinkContinuous(Model):
     def distance_to_puck(self, a_pos: Point) -> float:
         return Vec2d.from_to(from_pt=a_pos, to_pt=self.puck.pos).norm()
 
+    def move_agent(self, an_agent, new_pt: Point):
+        self.space.move_agent(an_agent, new_pt)
+
+    def is_continuous(self) -> bool:
+        return True
+
+    def players_within(self, a_pos: Point, radius: float) -> List[Player]:
+        """Players at distance <= radius of a position."""
+        return [agent for agent in self.space.agents_within(a_pos, radius) if agent is not self.puck]
+
+    def nearest_teammate_of(self, a_player: Player, max_radius_opt: Optional[float] = None) -> Optional[Player]:
+        return self.space.nearest_agent(a_player.pos,
+                                        accept=lambda agent: (agent is not a_player) and (agent is not self.puck) and (type(agent) == type(a_player)),
+                                        max_radius_opt=max_radius_opt)
+
+    def nearest_opponent_of(self, a_player: Player, max_radius_opt: Optional[float] = None) -> Optional[Player]:
+        return self.space.nearest_agent(a_player.pos,
+                                        accept=lambda agent: (agent is not self.puck) and (type(agent) != type(a_player)),
+                                        max_radius_opt=max_radius_opt)
+
     def release_puck(self):
         current_owner = self.who_has_the_puck()
         if current_owner is not None:
@@ -228,6 +264,21 @@ class HockeyHalfRinkContinuous(Model):
     def is_puck_taken(self) -> bool:
         return not (self.who_has_the_puck() is None)
 
+    def checks_now(self) -> bool:
+        return self.execution.checks(self.schedule.steps)
+
+    def use_symmetry(self):
+        """See SkatingIce. This ice (and its goal) is symmetric about the center of the goal."""
+        self.symmetry_opt = MirrorSymmetry(axis_y=HockeyHalfRinkContinuous.GOALIE_CENTER.y)
+
+    def use_sensing_table(self, folder_manager) -> bool:
+        """No table on continuous ice."""
+        return False
+
+    def is_puck_owned_by_team_of(self, agent) -> bool:
+        current_owner = self.who_has_the_puck()
+        return (current_owner is not None) and (type(current_owner) == type(agent))
+
 
     def collect_data_if_is_time(self):
         # self.schedule.steps
@@ -318,7 +369,8 @@ class HockeyHalfRinkContinuous(Model):
 
 
 if __name__ == "__main__":
-    hockey_rink = HockeyHalfRink(how_many_offense=5, how_many_defense=5)
+    hockey_rink = HockeyHalfRinkContinuous(how_many_offense=5, how_many_defense=5, one_step_in_seconds=TIME_PER_FRAME,
+                                           collect_data_every_secs=1, record_this_many_minutes=1)
     d = Defense(hockey_world_model=hockey_rink, brain=RuleBasedBrain())
     print(d)
     # while True:
@@ -6,6 +6,7 @@
 
 import random
 import os
+import numpy as np
 import pandas as pd
 
 from mesa import Model
@@ -18,9 +19,14 @@ from geometry.angle import AngleInRadians
 
 from util.base import choose_first_option_by_roulette
 from hockey.core.puck import Puck
-from typing import Optional
+from typing import List, Optional, Tuple
 
+from hockey.core.batch_physics import BatchPhysics
+from hockey.core.batch_sensing import DEFAULT_BITS, sense_team_bits
+from hockey.core.execution import ExecutionPolicy
 from hockey.core.folder_manager import FolderManager
+from hockey.core.ice_surface.occupancy_grid import OccupancyGrid
+from hockey.core.ice_surface.symmetry import MirrorSymmetry
 from hockey.behaviour.core.rule_based_brain import RuleBasedBrain
 from hockey.core.object_on_ice import ObjectOnIce
 from hockey.core.player.base import Player
@@ -38,6 +44,7 @@ class SkatingIce(Model):
     def move_agent(self, an_agent: ObjectOnIce, new_pt: Point):
         """Moves the agent depending on where we live."""
         # TODO: this is horribly inefficient, but it provides the flexibility of switching between discrete and continuous spaces.
+        # (on discrete ice, an OccupancyGrid makes the move itself cheap: see benchmarks.grid_moves)
         # if we are on a continuous space I can move to the real place. Otherwise I have to "cast" to a integer space.
         if self.is_continuous():
             self.space.move_agent(an_agent, new_pt)
@@ -47,11 +54,61 @@ class SkatingIce(Model):
     def is_continuous(self) -> bool:
         return isinstance(self.space, ContinuousSpace)
 
+    def checks_now(self) -> bool:
+        """Do sanity checks (and reporting) have to run on this tick? See ExecutionPolicy."""
+        return self.execution.checks(self.schedule.steps)
+
+    def use_symmetry(self):
+        """
+        Players sense the canonical image of their situations, and mirror the actions they choose
+        (see BitstringEnvironmentState.as_canonical_bitstring). This ice is symmetric about its middle row.
+        """
+        self.symmetry_opt = MirrorSymmetry.of_grid(self.height)
+
+    def use_sensing_table(self, folder_manager: FolderManager) -> bool:
+        """
+        Players' situations are looked up on a precomputed table, kept on the experiment's folder.
+        Only some ice has one (see IceNxN). If symmetry is used (see use_symmetry), the table only has canonical situations.
+
+        Returns:
+            True if the table is used.
+
+        """
+        return False
+
+    def defers_moves(self) -> bool:
+        """True if agents' moves are being collected, to be applied all at once at the end of the step."""
+        return (self.physics is not None) and self.moves_deferred
+
+    def advance_pending_agents(self):
+        """Moves (on the space) all agents that requested a move to the batch physics."""
+        rows, new_positions = self.physics.advance_pending()
+        for row, (x, y) in zip(rows.tolist(), new_positions.tolist()):
+            self.move_agent(self.physics.agents[row], Point(x, y))
+
+    def step_agents(self):
+        """Every agent acts. With batch physics, all the moves are then computed at once."""
+        if self.physics is None:
+            self.schedule.step()
+            return
+        self.moves_deferred = True
+        try:
+            self.schedule.step()
+        finally:
+            self.moves_deferred = False
+        self.advance_pending_agents()
+        for player in self.defense + self.attack:
+            player.wrap_up_move()
+
     def __init__(self,
                  width: int,
                  height: int,
                  how_many_defense: int,
-                 how_many_offense: int):
+                 how_many_offense: int,
+                 batch_physics: bool = False,
+                 event_driven_puck: bool = False,
+                 execution_opt: Optional[ExecutionPolicy] = None,
+                 occupancy_grid: bool = False):
         """
 
         Args:
@@ -59,6 +116,11 @@ class SkatingIce(Model):
             height: how many divisions on Y
             how_many_defense: 
             how_many_offense: 
+            batch_physics: if True, positions and speeds of agents are kept on arrays and moved all at once.
+            event_driven_puck: if True, a stopped puck is not stepped (positions on a grid are rounded on every tick, so
+                there is no skipping a moving one; continuous ice can: see HockeyHalfRinkContinuous and Puck.fly).
+            execution_opt: how much checking is done while simulating. If None, everything is checked.
+            occupancy_grid: if True, the space is an OccupancyGrid instead of mesa's MultiGrid.
         """
         assert how_many_defense >= 0 and how_many_offense >= 0
         Model.__init__(self)
@@ -67,7 +129,27 @@ class SkatingIce(Model):
         self.schedule = RandomActivation(self)
         # if this was a Grid, the attribute would be called 'self.grid'
         # But because it is continuous, it is called 'self.space'
-        self.space = MultiGrid(width=self.width, height=self.height, torus=False)
+        if occupancy_grid:
+            self.space = OccupancyGrid(width=self.width, height=self.height, torus=False)
+        else:
+            self.space = MultiGrid(width=self.width, height=self.height, torus=False)
+        # physics have to exist before agents are created (they register there)
+        if batch_physics:
+            margin = 0.01 if self.is_continuous() else 1 # same as ObjectOnIce's container
+            self.physics = BatchPhysics(width=self.width - margin, height=self.height - margin)
+        else:
+            self.physics = None
+        self.moves_deferred = False
+        self.event_driven_puck = event_driven_puck
+        self.execution = ExecutionPolicy() if execution_opt is None else execution_opt
+        # precomputed moves (see transition_table.py); only discrete worlds may have them.
+        self.transitions = None
+        # precomputed situations (see sensing_table.py); only discrete worlds may have them.
+        self.sensing_table = None
+        # if not None, players sense the canonical image of their situations (see use_symmetry).
+        self.symmetry_opt = None # type: Optional[MirrorSymmetry]
+        # who has the puck (None if it is free). Only changed by give_puck_to and Player.release_puck:
+        self.puck_owner_opt = None
         # data collector
         self.datacollector = DataCollector(
             model_reporters={
@@ -77,15 +159,15 @@ class SkatingIce(Model):
             },
             agent_reporters={
                 "timestamp": lambda agent: agent.model.schedule.steps * agent.model.one_step_in_seconds,
+                "kind": lambda agent: agent.kind,
                 "pos_x": lambda agent: agent.pos.x,
                 "pos_y": lambda agent: agent.pos.y,
                 "speed_x": lambda agent: agent.speed.x,
                 "speed_y": lambda agent: agent.speed.y,
                 "speed_magnitude": lambda agent: agent.speed.norm(),
-                "topuck_x": lambda agent: agent.model.vector_to_puck(a_pos=agent.pos).x if type(agent) != Puck else "",
-                "topuck_y": lambda agent: agent.model.vector_to_puck(a_pos=agent.pos).y if type(agent) != Puck else "",
-                "angle2puck": lambda agent: agent.model.angle_to_puck(a_pos=agent.pos,
-                                                                      looking_at=agent.vector_looking_at()) if type(agent) != Puck else "",
+                "topuck_x": lambda agent: agent.vector_to_puck().x if type(agent) != Puck else "",
+                "topuck_y": lambda agent: agent.vector_to_puck().y if type(agent) != Puck else "",
+                "angle2puck": lambda agent: agent.angle_to_puck() if type(agent) != Puck else "",
                 "last_action": lambda agent: agent.last_action if type(agent) != Puck else "",
                 "have_puck": lambda agent: agent.have_puck if type(agent) != Puck else "",
                 "can_see_puck": lambda agent: agent.can_see_puck() if type(agent) != Puck else "",
@@ -212,28 +294,62 @@ class SkatingIce(Model):
     def distance_to_puck(self, a_pos: Point) -> float:
         return Vec2d.from_to(from_pt=a_pos, to_pt=self.puck.pos).norm()
 
+    def players_within(self, a_pos: Point, radius: float) -> List[Player]:
+        """Players at distance <= radius of a position. (Scans them: grids are small; see IndexedContinuousSpace)"""
+        x, y = a_pos
+        return [player for player in self.defense + self.attack if (player.pos.x - x) ** 2 + (player.pos.y - y) ** 2 <= radius * radius]
+
+    def __nearest_of__(self, a_player: Player, candidates: List[Player], max_radius_opt: Optional[float]) -> Optional[Player]:
+        x, y = a_player.pos
+        candidates = [player for player in candidates if player is not a_player]
+        if len(candidates) == 0:
+            return None
+        closest = min(candidates, key=lambda player: (player.pos.x - x) ** 2 + (player.pos.y - y) ** 2)
+        if (max_radius_opt is not None) and ((closest.pos.x - x) ** 2 + (closest.pos.y - y) ** 2 > max_radius_opt ** 2):
+            return None
+        return closest
+
+    def nearest_teammate_of(self, a_player: Player, max_radius_opt: Optional[float] = None) -> Optional[Player]:
+        return self.__nearest_of__(a_player, [player for player in self.defense + self.attack if type(player) == type(a_player)], max_radius_opt)
+
+    def nearest_opponent_of(self, a_player: Player, max_radius_opt: Optional[float] = None) -> Optional[Player]:
+        return self.__nearest_of__(a_player, [player for player in self.defense + self.attack if type(player) != type(a_player)], max_radius_opt)
+
     def release_puck(self):
         current_owner = self.who_has_the_puck()
         if current_owner is not None:
-            current_owner.release_puck()
+            current_owner.release_puck() # (it clears 'puck_owner_opt')
 
     def give_puck_to(self, agent):
         if not agent.have_puck:
             self.release_puck()
             agent.have_puck = True
+            self.puck_owner_opt = agent
             self.puck.is_taken = True
             self.space.place_agent(self.puck, pos=agent.pos)
 
+    def __check_puck_ownership_or_explode__(self):
+        """Owner kept by the world, players' flags and puck's flag have to agree."""
+        owners = [player for player in self.defense + self.attack if player.have_puck]
+        expected_owners = [] if self.puck_owner_opt is None else [self.puck_owner_opt]
+        if owners != expected_owners:
+            raise RuntimeError("Puck owner is %s, but players %s think they have it" %
+                               (self.puck_owner_opt, [player.unique_id for player in owners]))
+        if self.puck.is_taken != (self.puck_owner_opt is not None):
+            raise RuntimeError("Puck owner is %s, but puck is_taken = %s" % (self.puck_owner_opt, self.puck.is_taken))
+
     def who_has_the_puck(self) -> Optional[Player]:
         """Returns None in no-one has the puck; otherwise returns the agent that has it."""
-        for player in self.defense + self.attack:
-            if player.have_puck:
-                # print("[ICE] %s has the puck (its pos: %s; puck's: %s)" % (player.unique_id, player.pos, self.puck.pos))
-                return player
-        return None
+        return self.puck_owner_opt
 
     def is_puck_taken(self) -> bool:
-        return not (self.who_has_the_puck() is None)
+        return self.puck_owner_opt is not None
+
+    def is_puck_owned_by(self, agent) -> bool:
+        return self.puck_owner_opt is agent
+
+    def is_puck_owned_by_team_of(self, agent) -> bool:
+        return (self.puck_owner_opt is not None) and (type(self.puck_owner_opt) == type(agent))
 
     def collect_data_if_is_time(self):
         assert self.has_run_been_setup()
@@ -248,10 +364,39 @@ class SkatingIce(Model):
     def step(self):
         """Run one step of the model. """
         assert self.has_run_been_setup()
-        self.schedule.step()
+        # (once per tick, not on every query: who_has_the_puck is called on every sensing)
+        if self.checks_now():
+            self.__check_puck_ownership_or_explode__()
+        self.step_agents()
         self.collect_data_if_is_time()
         self.update_running_flag()
 
+    def goal_posts_opt(self) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """Where both goal posts are. None: this ice has no goal."""
+        return None
+
+    def sense_players(self, bit_fns: List[str] = DEFAULT_BITS) -> np.ndarray:
+        """
+        What all players sense, in one pass (see batch_sensing).
+
+        Returns:
+            (n_players, n_bits) matrix of uint8; players are in order 'self.defense + self.attack'.
+
+        """
+        players = self.defense + self.attack
+        positions = np.array([(player.pos.x, player.pos.y) for player in players], dtype=np.float64).reshape(-1, 2)
+        headings = np.array([player.looking_at_xy() for player in players], dtype=np.float64).reshape(-1, 2)
+        owner = self.puck_owner_opt
+        return sense_team_bits(positions=positions,
+                               headings=headings,
+                               attacking=np.array([type(player) == Forward for player in players], dtype=bool),
+                               unable_to_play=np.array([player.unable_to_play_puck_time for player in players], dtype=np.float64),
+                               reaches=np.array([player.reach for player in players], dtype=np.float64),
+                               puck_pos=(self.puck.pos.x, self.puck.pos.y),
+                               owner_row_opt=None if owner is None else players.index(owner),
+                               goal_posts_opt=self.goal_posts_opt(),
+                               bit_fns=bit_fns)
+
     def vector_to_puck(self, a_pos: Point) -> Vec2d:
         return Vec2d.from_to(from_pt=a_pos, to_pt=self.puck.pos)
 
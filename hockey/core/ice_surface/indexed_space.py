@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Continuous space that keeps its agents on a spatial index (see util.geometry.buckets).
+
+"""
+
+from typing import List, Optional
+
+from geometry.point import Point
+from mesa.space import ContinuousSpace
+
+from util.geometry.buckets import BucketIndex
+
+
+class IndexedContinuousSpace(ContinuousSpace):
+    """mesa's ContinuousSpace, plus proximity queries that don't look at every agent."""
+
+    def __init__(self, x_max: float, y_max: float, torus: bool, cell_size: float = 5):
+        """
+        Args:
+            x_max, y_max, torus: see ContinuousSpace.
+            cell_size: side of the buckets of the index (about the radius of the usual queries is best).
+        """
+        ContinuousSpace.__init__(self, x_max=x_max, y_max=y_max, torus=torus)
+        self.index = BucketIndex(width=x_max, height=y_max, cell_size=cell_size)
+
+    def place_agent(self, agent, pos):
+        ContinuousSpace.place_agent(self, agent, pos)
+        x, y = pos
+        self.index.add(agent, x, y)
+
+    def move_agent(self, agent, pos):
+        ContinuousSpace.move_agent(self, agent, pos)
+        x, y = pos
+        self.index.add(agent, x, y) # (moves it if it's there)
+
+    def remove_agent(self, agent):
+        ContinuousSpace.remove_agent(self, agent)
+        self.index.remove(agent)
+
+    def agents_within(self, a_pos: Point, radius: float) -> List:
+        """Agents at distance <= radius of a position."""
+        x, y = a_pos
+        return self.index.within(x, y, radius)
+
+    def nearest_agent(self, a_pos: Point, accept=lambda agent: True, max_radius_opt: Optional[float] = None):
+        """Closest (accepted) agent to a position; None if there is none. See BucketIndex.nearest."""
+        x, y = a_pos
+        return self.index.nearest(x, y, accept=accept, max_radius_opt=max_radius_opt)
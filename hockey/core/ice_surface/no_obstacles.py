@@ -3,7 +3,14 @@
 
 """
 
+from typing import Optional
+
+from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
+from hockey.core.execution import ExecutionPolicy
+from hockey.core.folder_manager import FolderManager
 from hockey.core.ice_surface.ice_rink import SkatingIce
+from hockey.core.ice_surface.sensing_table import SensingTable
+from hockey.core.ice_surface.transition_table import TransitionTable
 
 class IceNxN(SkatingIce):
     """The attacking side of a Hockey Rink."""
@@ -12,7 +19,13 @@ class IceNxN(SkatingIce):
                  width: int,
                  height: int,
                  how_many_defense: int,
-                 how_many_offense: int):
+                 how_many_offense: int,
+                 batch_physics: bool = False,
+                 transition_table: bool = False,
+                 transition_table_dir_opt: Optional[str] = None,
+                 event_driven_puck: bool = False,
+                 execution_opt: Optional[ExecutionPolicy] = None,
+                 occupancy_grid: bool = False):
         """
 
         Args:
@@ -20,6 +33,12 @@ class IceNxN(SkatingIce):
             height: how many divisions on Y
             how_many_defense: 
             how_many_offense: 
+            batch_physics: see SkatingIce.
+            transition_table: if True, players' moves are looked up on a precomputed table.
+            transition_table_dir_opt: where to cache that table (if None, it is built every time).
+            event_driven_puck: see SkatingIce.
+            execution_opt: see SkatingIce.
+            occupancy_grid: see SkatingIce.
             one_step_in_seconds: 
             collect_data_every_secs: 
             record_this_many_minutes: 
@@ -29,14 +48,42 @@ class IceNxN(SkatingIce):
                             width,
                             height,
                             how_many_defense,
-                            how_many_offense)
+                            how_many_offense,
+                            batch_physics,
+                            event_driven_puck,
+                            execution_opt,
+                            occupancy_grid)
+        if transition_table:
+            self.transitions = TransitionTable.load_or_build(width=self.width, height=self.height, directory_opt=transition_table_dir_opt)
+
+    def use_sensing_table(self, folder_manager: FolderManager) -> bool:
+        """See SkatingIce. The table is built (once) for the size of this ice, the reach of its players and the bits they sense."""
+        bit_fns = BitstringEnvironmentState.bit_fns
+        players = self.defense + self.attack
+        if (len(players) == 0) or not SensingTable.can_tabulate(bit_fns):
+            return False
+        # (a symmetric table is about the same axis as this ice: see SkatingIce.use_symmetry)
+        symmetric = self.symmetry_opt is not None
+        self.sensing_table = SensingTable.load_or_build(width=self.width,
+                                                        height=self.height,
+                                                        reach=players[0].reach,
+                                                        bit_fns=bit_fns,
+                                                        full_file_name_opt=folder_manager.sensing_table_file_name(self.width, self.height, full=True, symmetric=symmetric),
+                                                        symmetric=symmetric)
+        return True
 
 class Ice5x5(IceNxN):
     """The attacking side of a Hockey Rink."""
 
     def __init__(self,
                  how_many_defense: int,
-                 how_many_offense: int):
+                 how_many_offense: int,
+                 batch_physics: bool = False,
+                 transition_table: bool = False,
+                 transition_table_dir_opt: Optional[str] = None,
+                 event_driven_puck: bool = False,
+                 execution_opt: Optional[ExecutionPolicy] = None,
+                 occupancy_grid: bool = False):
         """
 
         Args:
@@ -44,6 +91,12 @@ class Ice5x5(IceNxN):
             height: how many divisions on Y
             how_many_defense: 
             how_many_offense: 
+            batch_physics: see SkatingIce.
+            transition_table: see IceNxN.
+            transition_table_dir_opt: see IceNxN.
+            event_driven_puck: see SkatingIce.
+            execution_opt: see SkatingIce.
+            occupancy_grid: see SkatingIce.
             one_step_in_seconds: 
             collect_data_every_secs: 
             record_this_many_minutes: 
@@ -52,4 +105,10 @@ class Ice5x5(IceNxN):
                             5,
                             5,
                             how_many_defense,
-                            how_many_offense)
+                            how_many_offense,
+                            batch_physics,
+                            transition_table,
+                            transition_table_dir_opt,
+                            event_driven_puck,
+                            execution_opt,
+                            occupancy_grid)
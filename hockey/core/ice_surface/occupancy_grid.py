@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Discrete space: an array counting agents per cell, plus the cell of each agent.
+
+Same API as mesa's MultiGrid (the parts of it used by the worlds), without its per-cell lists and sets.
+
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+class OccupancyGrid(object):
+    """Drop-in replacement for mesa.space.MultiGrid on discrete ice."""
+
+    def __init__(self, width: int, height: int, torus: bool = False):
+        assert not torus, "ice has walls"
+        self.width = width
+        self.height = height
+        self.torus = torus
+        self.occupancy = np.zeros((width, height), dtype=np.int32) # how many agents on each cell
+        self.cell_of = {} # type: Dict[object, Tuple[int, int]]
+
+    def out_of_bounds(self, pos) -> bool:
+        x, y = pos
+        return not ((0 <= x < self.width) and (0 <= y < self.height))
+
+    def __cell__(self, pos) -> Tuple[int, int]:
+        x, y = pos
+        cell = (int(x), int(y))
+        if (cell[0] != x) or (cell[1] != y) or self.out_of_bounds(cell):
+            raise IndexError("%s is not a cell of a %dx%d grid" % (str(pos), self.width, self.height))
+        return cell
+
+    def place_agent(self, agent, pos):
+        """Puts an agent on a cell (if it already was on the grid, it is moved there)."""
+        if agent in self.cell_of:
+            self.move_agent(agent, pos)
+            return
+        cell = self.__cell__(pos)
+        self.occupancy[cell] += 1
+        self.cell_of[agent] = cell
+        agent.pos = pos
+
+    def move_agent(self, agent, pos):
+        cell = self.__cell__(pos)
+        old_cell = self.cell_of[agent]
+        if cell != old_cell:
+            self.occupancy[old_cell] -= 1
+            self.occupancy[cell] += 1
+            self.cell_of[agent] = cell
+        agent.pos = pos
+
+    def remove_agent(self, agent):
+        self.occupancy[self.cell_of.pop(agent)] -= 1
+        agent.pos = None
+
+    def is_cell_empty(self, pos) -> bool:
+        return self.occupancy[self.__cell__(pos)] == 0
+
+    def get_cell_list_contents(self, cell_list) -> List:
+        """Agents on these cells. (A scan of the agents: only meant for infrequent queries)"""
+        if isinstance(cell_list, tuple):
+            cell_list = [cell_list]
+        cells = set(self.__cell__(a_cell) for a_cell in cell_list)
+        return [agent for agent, cell in self.cell_of.items() if cell in cells]
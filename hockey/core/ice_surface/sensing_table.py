@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+"""Precomputed situations sensed by players on discrete (grid) ice.
+
+On a grid without obstacles, the bits a player senses (for most bits: see NOT_ON_TABLE) only depend on its
+cell, where it looks at (one of 4 directions), the cell of the puck, who has the puck (nobody, me, a teammate,
+an opponent), whether it is attacking, and whether it can't play the puck for a while. So we compute them
+once, and store them (as a .npy file, that is memory-mapped when read).
+A symmetric table only holds canonical situations (see symmetry.MirrorSymmetry): half of the rows.
+
+"""
+
+import json
+import os
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from geometry.point import Point
+from xcs.bitstrings import BitString as XCSBitString
+
+from hockey.behaviour.core.sensing_plan import SensingPlan
+from hockey.core.ice_surface.symmetry import MirrorSymmetry
+from hockey.core.ice_surface.transition_table import HEADINGS, heading_index
+from hockey.core.player.base import Player
+from hockey.core.player.forward import Forward
+
+# (a gaze within transition_table.TOLERANCE of one of these is snapped to it: see canonical_index_opt)
+HEADING_INDEX = {heading: idx for idx, heading in enumerate(HEADINGS)}
+# who has the puck, from the point of view of a player:
+NOBODY, ME, TEAMMATE, OPPONENT = 0, 1, 2, 3
+# quantities (see sensing_plan.QUANTITIES) that depend on more than the state: bits using them are not on the table.
+NOT_ON_TABLE = {'speed_bits', 'posts_vectors', 'posts_in_front', 'posts_visible', 'posts_angles', 'posts_to_my_right', 'posts_distances'}
+
+
+def owner_index(me: Player, puck_owner_opt: Optional[Player]) -> int:
+    """Who has the puck (same semantics as the bits 'have_puck' and 'my_team_has_puck')."""
+    if puck_owner_opt is None:
+        return NOBODY
+    elif puck_owner_opt.unique_id == me.unique_id:
+        return ME
+    elif type(puck_owner_opt) == type(me):
+        return TEAMMATE
+    else:
+        return OPPONENT
+
+
+class SensingTable(object):
+    """For each (cell, heading, puck cell, owner, attacking, unable to play): bits sensed (packed)."""
+
+    def __init__(self, width: int, height: int, reach: float, bit_fns: List[str], table: np.ndarray, symmetric: bool = False):
+        self.width = width
+        self.height = height
+        self.reach = reach
+        self.bit_fns = list(bit_fns)
+        self.table = table
+        self.symmetry_opt = MirrorSymmetry.of_grid(height) if symmetric else None
+        self.bitstrings = {} # type: Dict[bytes, XCSBitString]
+
+    @classmethod
+    def description_file_name(cls, full_file_name: str) -> str:
+        return os.path.splitext(full_file_name)[0] + ".json"
+
+    @classmethod
+    def can_tabulate(cls, bit_fns: List[str]) -> bool:
+        return len(SensingPlan.quantities_needed(bit_fns) & NOT_ON_TABLE) == 0
+
+    @classmethod
+    def build(cls, width: int, height: int, reach: float, bit_fns: List[str], symmetric: bool = False) -> 'SensingTable':
+        """Senses every state (if symmetric: with the player on a canonical row), with the same code players use (see SensingPlan)."""
+        if not cls.can_tabulate(bit_fns):
+            raise ValueError("Bits %s depend on more than the cells of the player and of the puck" % (bit_fns))
+        # local import: IceNxN can use a sensing table.
+        from hockey.core.ice_surface.no_obstacles import IceNxN
+        plan = SensingPlan(bit_fns)
+        world = IceNxN(width=width, height=height, how_many_defense=2, how_many_offense=2)
+        # players sensing, and puck owners for each of them:
+        me_and_owners = []
+        for my_team, other_team in [(world.defense, world.attack), (world.attack, world.defense)]:
+            me, teammate = my_team[0], my_team[1]
+            me.reach = reach
+            attacking_idx = int(type(me) == Forward)
+            owners = {NOBODY: None, ME: me, TEAMMATE: teammate, OPPONENT: other_team[0]}
+            me_and_owners.append((me, attacking_idx, owners))
+        n_bytes = (len(bit_fns) + 7) // 8
+        rows = MirrorSymmetry.canonical_rows(height) if symmetric else height
+        table = np.zeros((width, rows, len(HEADINGS), width, height, 4, 2, 2, n_bytes), dtype=np.uint8)
+        for x in range(width):
+            for y in range(rows):
+                for heading_idx, (heading_x, heading_y) in enumerate(HEADINGS):
+                    for puck_x in range(width):
+                        for puck_y in range(height):
+                            world.move_agent(world.puck, Point(puck_x, puck_y))
+                            for me, attacking_idx, owners in me_and_owners:
+                                world.move_agent(me, Point(x, y))
+                                me.set_looking_at_xy(heading_x, heading_y)
+                                for unable_idx, unable_time in enumerate([0.0, 1.0]):
+                                    me.unable_to_play_puck_time = unable_time
+                                    for an_owner_idx, owner_opt in owners.items():
+                                        table[x, y, heading_idx, puck_x, puck_y, an_owner_idx, attacking_idx, unable_idx] = \
+                                            np.packbits(np.array(plan(me, owner_opt), dtype=np.uint8))
+        return cls(width, height, reach, bit_fns, table, symmetric)
+
+    @classmethod
+    def load_or_build(cls, width: int, height: int, reach: float, bit_fns: List[str],
+                      full_file_name_opt: Optional[str] = None, symmetric: bool = False) -> 'SensingTable':
+        """If a file name is given, table is memory-mapped from there (and saved there if it had to be built)."""
+        if full_file_name_opt is None:
+            return cls.build(width, height, reach, bit_fns, symmetric)
+        description = {"width": width, "height": height, "reach": reach, "bit_fns": list(bit_fns), "symmetric": symmetric}
+        description_file_name = cls.description_file_name(full_file_name_opt)
+        if os.path.exists(full_file_name_opt) and os.path.exists(description_file_name):
+            with open(description_file_name) as f:
+                if json.load(f) == description:
+                    return cls(width, height, reach, bit_fns, np.load(full_file_name_opt, mmap_mode='r'), symmetric)
+            print("[sensing] '%s' was built for another rink or other bits; re-building it" % (full_file_name_opt))
+        print("[sensing] Building table of situations for a %dx%d rink..." % (width, height))
+        sensing = cls.build(width, height, reach, bit_fns, symmetric)
+        os.makedirs(os.path.dirname(full_file_name_opt) or ".", exist_ok=True)
+        np.save(full_file_name_opt, sensing.table)
+        with open(description_file_name, "w") as f:
+            json.dump(description, f)
+        return cls(width, height, reach, bit_fns, np.load(full_file_name_opt, mmap_mode='r'), symmetric)
+
+    def canonical_index_opt(self, me: Player, puck_owner_opt: Optional[Player]) -> Optional[Tuple[Tuple[int, ...], bool]]:
+        """
+        Where this situation is on the table (on a symmetric table: its canonical image). None if it isn't.
+
+        Returns:
+            (index, flipped); flipped is True if the index is the one of the mirror image of the situation.
+
+        """
+        if me.reach != self.reach:
+            return None
+        # (turning leaves rounding errors on a gaze, eg (6.1e-17, 1.0): it is snapped before anything else)
+        heading_idx = heading_index(*me.looking_at_xy())
+        if heading_idx is None:
+            return None
+        my_xy, puck_xy, heading_xy = tuple(me.pos), tuple(me.model.puck.pos), HEADINGS[heading_idx]
+        flipped = False
+        if self.symmetry_opt is not None:
+            my_xy, puck_xy, heading_xy, flipped = self.symmetry_opt.canonical(my_xy, puck_xy, heading_xy)
+            heading_idx = HEADING_INDEX[heading_xy]
+        (x, y), (puck_x, puck_y) = my_xy, puck_xy
+        for a_value, limit in [(x, self.width), (y, self.table.shape[1]), (puck_x, self.width), (puck_y, self.height)]:
+            if (a_value != int(a_value)) or not (0 <= a_value < limit):
+                return None
+        return (int(x), int(y), heading_idx, int(puck_x), int(puck_y),
+                owner_index(me, puck_owner_opt), int(type(me) == Forward), int(me.unable_to_play_puck_time > 0)), flipped
+
+    def index_opt(self, me: Player, puck_owner_opt: Optional[Player]) -> Optional[Tuple[int, ...]]:
+        """Where this situation is on the table (None if it isn't; a symmetric table only has the canonical ones)."""
+        found_opt = self.canonical_index_opt(me, puck_owner_opt)
+        if (found_opt is None) or found_opt[1]:
+            return None
+        return found_opt[0]
+
+    def __bits_at__(self, idx: Tuple[int, ...]) -> XCSBitString:
+        packed = self.table[idx]
+        key = packed.tobytes()
+        bits = self.bitstrings.get(key)
+        if bits is None:
+            bits = XCSBitString(np.unpackbits(packed)[:len(self.bit_fns)].tolist()) # (numpy 1.13 has no "count" here)
+            self.bitstrings[key] = bits
+        return bits
+
+    def lookup(self, me: Player, puck_owner_opt: Optional[Player]) -> Optional[XCSBitString]:
+        """Bits sensed by a player; None if this situation is not on the table."""
+        idx = self.index_opt(me, puck_owner_opt)
+        if idx is None:
+            return None
+        return self.__bits_at__(idx)
+
+    def lookup_canonical(self, me: Player, puck_owner_opt: Optional[Player]) -> Optional[Tuple[XCSBitString, bool]]:
+        """Bits sensed on the canonical image of a situation, and whether it was flipped. None if it is not on the table."""
+        found_opt = self.canonical_index_opt(me, puck_owner_opt)
+        if found_opt is None:
+            return None
+        idx, flipped = found_opt
+        return self.__bits_at__(idx), flipped
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Mirror symmetry of the ice.
+
+The ice (and its goal, centered on it) is symmetric about an horizontal line. A situation (where I am,
+where I look at, where the puck is) and its mirror image are the same situation, with left and right
+swapped: a player can sense the canonical one of the two, and mirror back the action it chooses.
+
+"""
+
+from typing import Tuple
+
+from hockey.behaviour.core.action import HockeyAction
+
+
+def mirror_action(action: HockeyAction) -> HockeyAction:
+    """Same action, turning to the other side (eg, TURN_HARD_LEFT <-> TURN_HARD_RIGHT). Going straight is its own mirror."""
+    goes_left, goes_right = bool(action & HockeyAction.LEFT), bool(action & HockeyAction.RIGHT)
+    if (goes_left == goes_right) or bool(action & HockeyAction.RADIANS_0):
+        return action
+    return action ^ (HockeyAction.LEFT | HockeyAction.RIGHT)
+
+
+class MirrorSymmetry(object):
+    """Reflection about the line 'y = axis_y'."""
+
+    def __init__(self, axis_y: float):
+        self.axis_y = axis_y
+
+    @classmethod
+    def of_grid(cls, height: int) -> 'MirrorSymmetry':
+        """Cells are 0, ..., height - 1: cell 'y' is the mirror of cell 'height - 1 - y'."""
+        return cls(axis_y=(height - 1) / 2)
+
+    @classmethod
+    def canonical_rows(cls, height: int) -> int:
+        """How many rows of a grid (from the bottom) hold all canonical positions of a player."""
+        return (height + 1) // 2
+
+    def mirror_y(self, y: float) -> float:
+        return 2 * self.axis_y - y
+
+    def is_canonical(self, my_y: float, puck_y: float, heading_y: float) -> bool:
+        """Below the axis: me (or, if I am on it, the puck; or, if it is on it too, where I look at)."""
+        for offset in [my_y - self.axis_y, puck_y - self.axis_y, heading_y]:
+            if offset != 0:
+                return offset < 0
+        return True
+
+    def canonical(self, my_xy: Tuple[float, float], puck_xy: Tuple[float, float], heading_xy: Tuple[float, float]) \
+            -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float], bool]:
+        """
+        Canonical image of a situation.
+
+        Returns:
+            (my position, puck position, heading, flipped); if flipped, they are the mirror image of the ones given.
+
+        """
+        if self.is_canonical(my_xy[1], puck_xy[1], heading_xy[1]):
+            return my_xy, puck_xy, heading_xy, False
+        return (my_xy[0], self.mirror_y(my_xy[1])), (puck_xy[0], self.mirror_y(puck_xy[1])), (heading_xy[0], -heading_xy[1]), True
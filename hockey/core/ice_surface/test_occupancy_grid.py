@@ -0,0 +1,62 @@
+import unittest
+
+from random import Random
+
+from mesa.space import MultiGrid
+
+from hockey.core.ice_surface.occupancy_grid import OccupancyGrid
+
+
+class Token(object):
+    """Something that can be placed on a grid."""
+
+    def __init__(self):
+        self.pos = None
+
+
+class TestOccupancyGrid(unittest.TestCase):
+    """Occupancy grid has to say what mesa's MultiGrid says."""
+
+    def setUp(self):
+        """Initialization"""
+        self.rnd = Random(333)
+        self.grid = OccupancyGrid(width=6, height=4)
+        self.multi_grid = MultiGrid(width=6, height=4, torus=False)
+        self.tokens = [Token() for _ in range(10)]
+
+    def __random_cell__(self):
+        return (self.rnd.randint(0, 5), self.rnd.randint(0, 3))
+
+    def test_same_as_multi_grid(self):
+        for token in self.tokens:
+            cell = self.__random_cell__()
+            self.grid.place_agent(token, cell)
+            self.multi_grid.place_agent(token, cell)
+        for _ in range(100):
+            token, cell = self.tokens[self.rnd.randint(0, 9)], self.__random_cell__()
+            self.grid.move_agent(token, cell)
+            self.multi_grid.move_agent(token, cell)
+            self.assertEqual(token.pos, cell)
+            for x in range(6):
+                for y in range(4):
+                    self.assertEqual(self.grid.is_cell_empty((x, y)), self.multi_grid.is_cell_empty((x, y)))
+                    self.assertEqual(set(self.grid.get_cell_list_contents((x, y))),
+                                     set(self.multi_grid.get_cell_list_contents((x, y))))
+        self.assertEqual(self.grid.occupancy.sum(), len(self.tokens))
+
+    def test_place_twice_moves(self):
+        token = self.tokens[0]
+        self.grid.place_agent(token, (0, 0))
+        self.grid.place_agent(token, (1, 2))
+        self.assertTrue(self.grid.is_cell_empty((0, 0)))
+        self.assertEqual(self.grid.occupancy.sum(), 1)
+
+    def test_outside(self):
+        with self.assertRaises(IndexError):
+            self.grid.place_agent(self.tokens[0], (6, 0))
+        with self.assertRaises(IndexError):
+            self.grid.place_agent(self.tokens[0], (-1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
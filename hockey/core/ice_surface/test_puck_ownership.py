@@ -0,0 +1,47 @@
+import unittest
+
+from geometry.vector import Vec2d
+
+from hockey.core.ice_surface.no_obstacles import IceNxN
+
+
+class TestPuckOwnership(unittest.TestCase):
+    """The world keeps track of who has the puck."""
+
+    def setUp(self):
+        """Initialization"""
+        self.ice = IceNxN(width=5, height=4, how_many_defense=1, how_many_offense=2)
+
+    def test_give_and_release(self):
+        forward, other_forward = self.ice.attack
+        defense = self.ice.defense[0]
+        self.assertIsNone(self.ice.who_has_the_puck())
+        self.ice.give_puck_to(forward)
+        self.assertIs(self.ice.who_has_the_puck(), forward)
+        self.assertTrue(self.ice.is_puck_owned_by(forward))
+        self.assertTrue(other_forward.is_puck_owned_by_my_team())
+        self.assertFalse(defense.is_puck_owned_by_my_team())
+        self.ice.give_puck_to(defense)
+        self.assertFalse(forward.have_puck)
+        self.assertIs(self.ice.who_has_the_puck(), defense)
+        self.ice.release_puck()
+        self.assertIsNone(self.ice.who_has_the_puck())
+        self.assertFalse(self.ice.puck.is_taken)
+
+    def test_send_puck(self):
+        forward = self.ice.attack[0]
+        self.ice.give_puck_to(forward)
+        self.assertTrue(forward.shoot_puck(direction=Vec2d(1, 0)))
+        self.assertFalse(self.ice.is_puck_taken())
+        self.assertIsNone(self.ice.who_has_the_puck())
+
+    def test_inconsistency_detected(self):
+        self.ice.setup_run(one_step_in_seconds=0.1, collect_data_every_secs=1, record_this_many_minutes=1)
+        self.ice.attack[0].have_puck = True # behind the world's back
+        self.assertIsNone(self.ice.who_has_the_puck()) # (queries don't check)
+        with self.assertRaises(RuntimeError):
+            self.ice.step()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from geometry.point import Point
+from xcs.bitstrings import BitString as XCSBitString
+
+from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
+from hockey.core.folder_manager import FolderManager
+from hockey.core.ice_surface.no_obstacles import IceNxN
+from hockey.core.ice_surface.transition_table import HEADINGS
+from util.geometry import fast_vector
+
+
+class TestSensingTable(unittest.TestCase):
+    """Situations looked up must be the ones players sense."""
+
+    def setUp(self):
+        """Initialization"""
+        random.seed(13)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.folder_manager = FolderManager(experiments_root_dir=self.tmp_dir.name, experiment_name="sensing")
+        self.ice = IceNxN(width=4, height=3, how_many_defense=1, how_many_offense=2)
+        self.assertTrue(self.ice.use_sensing_table(self.folder_manager))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_as_sensing(self):
+        players = self.ice.defense + self.ice.attack
+        for _ in range(500):
+            me = random.choice(players)
+            self.ice.move_agent(me, Point(random.randint(0, 3), random.randint(0, 2)))
+            self.ice.move_agent(self.ice.puck, Point(random.randint(0, 3), random.randint(0, 2)))
+            me.set_looking_at_xy(*random.choice(HEADINGS))
+            me.unable_to_play_puck_time = random.choice([0.0, 0.5])
+            owner_opt = random.choice([None] + players)
+            full_state = me.sense()
+            full_state.puck_owner_opt = owner_opt
+            full_state.update()
+            bitstring_state = BitstringEnvironmentState(full_state=full_state)
+            self.assertIsNotNone(self.ice.sensing_table.lookup(me, owner_opt))
+            self.assertEqual(bitstring_state.as_bitstring(), XCSBitString(bitstring_state.build_defs()))
+
+    def test_turned_heading_is_on_table(self):
+        """Turning leaves rounding errors on where a player looks at: those are on the table too."""
+        me = self.ice.attack[0]
+        self.ice.move_agent(me, Point(1, 1))
+        self.ice.move_agent(self.ice.puck, Point(3, 2))
+        heading = fast_vector.rotated(1.0, 0.0, math.cos(math.pi / 2), math.sin(math.pi / 2))
+        self.assertNotEqual(heading, (0.0, 1.0))
+        me.set_looking_at_xy(*heading)
+        full_state = me.sense()
+        full_state.update()
+        self.assertIsNotNone(self.ice.sensing_table.lookup(me, None))
+        self.assertEqual(BitstringEnvironmentState(full_state=full_state).as_bitstring(), XCSBitString(BitstringEnvironmentState(full_state=full_state).build_defs()))
+
+    def test_not_on_table(self):
+        me = self.ice.attack[0]
+        me.set_looking_at_xy(0.6, 0.8)
+        self.assertIsNone(self.ice.sensing_table.lookup(me, None))
+
+    def test_symmetric_table_has_mirror_images(self):
+        ice = IceNxN(width=4, height=3, how_many_defense=1, how_many_offense=1)
+        ice.use_symmetry()
+        self.assertTrue(ice.use_sensing_table(self.folder_manager))
+        self.assertEqual(ice.sensing_table.table.shape[1], 2)
+        me = ice.attack[0]
+        for _ in range(200):
+            my_xy, puck_xy, heading = (random.randint(0, 3), random.randint(0, 2)), (random.randint(0, 3), random.randint(0, 2)), random.choice(HEADINGS)
+            ice.move_agent(me, Point(*my_xy))
+            ice.move_agent(ice.puck, Point(*puck_xy))
+            me.set_looking_at_xy(*heading)
+            bits, flipped = BitstringEnvironmentState(full_state=me.sense()).as_canonical_bitstring()
+            if flipped:
+                # sensed as if on the mirror image:
+                ice.move_agent(me, Point(my_xy[0], 2 - my_xy[1]))
+                ice.move_agent(ice.puck, Point(puck_xy[0], 2 - puck_xy[1]))
+                me.set_looking_at_xy(heading[0], -heading[1])
+            self.assertEqual(bits, BitstringEnvironmentState(full_state=me.sense()).as_bitstring())
+
+    def test_off_table_situations_are_canonical_too(self):
+        ice = IceNxN(width=4, height=3, how_many_defense=1, how_many_offense=1)
+        ice.use_symmetry()
+        self.assertTrue(ice.use_sensing_table(self.folder_manager))
+        me = ice.attack[0]
+        # above the axis, looking at a direction that isn't on the table:
+        ice.move_agent(me, Point(1, 2))
+        ice.move_agent(ice.puck, Point(3, 1))
+        me.set_looking_at_xy(0.6, -0.8)
+        self.assertIsNone(ice.sensing_table.lookup_canonical(me, None))
+        ice.puck.next_event_opt = 7 # (any write of the puck's position would forget it)
+        bits, flipped = BitstringEnvironmentState(full_state=me.sense()).as_canonical_bitstring()
+        self.assertTrue(flipped)
+        # nobody was moved:
+        self.assertEqual((me.pos, ice.puck.pos, me.looking_at_xy()), (Point(1, 2), Point(3, 1), (0.6, -0.8)))
+        self.assertEqual(ice.puck.next_event_opt, 7)
+        ice.puck.next_event_opt = None
+        # same bits as sensing the mirror image:
+        ice.move_agent(me, Point(1, 0))
+        me.set_looking_at_xy(0.6, 0.8)
+        self.assertEqual(bits, BitstringEnvironmentState(full_state=me.sense()).as_bitstring())
+
+    def test_stored_next_to_experiment(self):
+        file_name = self.folder_manager.sensing_table_file_name(4, 3, full=True)
+        self.assertTrue(os.path.exists(file_name))
+        other_ice = IceNxN(width=4, height=3, how_many_defense=0, how_many_offense=1)
+        self.assertTrue(other_ice.use_sensing_table(self.folder_manager))
+        self.assertEqual(other_ice.sensing_table.table.shape, self.ice.sensing_table.table.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import itertools
+import unittest
+
+from hockey.behaviour.core.action import HockeyAction
+from hockey.core.ice_surface.symmetry import MirrorSymmetry, mirror_action
+
+
+class TestSymmetry(unittest.TestCase):
+
+    def test_mirror_action(self):
+        self.assertEqual(mirror_action(HockeyAction.TURN_HARD_LEFT), HockeyAction.TURN_HARD_RIGHT)
+        self.assertEqual(mirror_action(HockeyAction.TURN_HARD_RIGHT), HockeyAction.TURN_HARD_LEFT)
+        self.assertEqual(mirror_action(HockeyAction.SKATE_MIN_SPEED), HockeyAction.SKATE_MIN_SPEED)
+        for action in HockeyAction:
+            self.assertEqual(mirror_action(mirror_action(action)), action)
+
+    def test_canonical(self):
+        for height in [4, 5]:
+            symmetry = MirrorSymmetry.of_grid(height)
+            headings = [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)]
+            for my_y, puck_y, heading in itertools.product(range(height), range(height), headings):
+                my_xy, puck_xy = (1, my_y), (2, puck_y)
+                c_me, c_puck, c_heading, flipped = symmetry.canonical(my_xy, puck_xy, heading)
+                self.assertTrue(symmetry.is_canonical(c_me[1], c_puck[1], c_heading[1]))
+                self.assertLess(c_me[1], MirrorSymmetry.canonical_rows(height))
+                # a situation and its mirror image have the same canonical image:
+                mirrored = symmetry.canonical((1, height - 1 - my_y), (2, height - 1 - puck_y), (heading[0], -heading[1]))
+                self.assertEqual(mirrored[:3], (c_me, c_puck, c_heading))
+                if flipped:
+                    self.assertEqual(c_me, (1, height - 1 - my_y))
+
+
+if __name__ == '__main__':
+    unittest.main()
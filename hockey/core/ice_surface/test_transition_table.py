@@ -0,0 +1,45 @@
+import unittest
+
+from geometry.point import Point
+
+from hockey.core.ice_surface.no_obstacles import IceNxN
+from hockey.core.ice_surface.transition_table import TransitionTable, HEADINGS, SPEED_CLASSES, NOT_ON_TABLE
+
+
+class TestTransitionTable(unittest.TestCase):
+    """Precomputed moves must be the ones players do."""
+
+    def setUp(self):
+        """Initialization"""
+        self.ice = IceNxN(width=5, height=4, how_many_defense=0, how_many_offense=1)
+        self.transitions = TransitionTable.build(width=5, height=4)
+        self.player = self.ice.attack[0]
+
+    def test_same_as_player(self):
+        for x in range(5):
+            for y in range(4):
+                for heading in HEADINGS:
+                    for speed in SPEED_CLASSES:
+                        for an_action in self.transitions.actions:
+                            self.ice.move_agent(self.player, Point(x, y))
+                            self.player.set_looking_at_xy(*heading)
+                            self.player.set_speed_xy(heading[0] * speed, heading[1] * speed)
+                            expected = self.transitions.lookup(pos=self.player.pos, looking_at=heading,
+                                                               speed=self.player.speed_xy(), a=an_action)
+                            self.player.apply_actions([an_action])
+                            if expected is None:
+                                continue
+                            new_pos, new_gaze, new_speed = expected
+                            msg = "from (%d, %d), looking at %s, speed %d, action %s" % (x, y, heading, speed, an_action)
+                            self.assertEqual(tuple(self.player.pos), tuple(new_pos), msg=msg)
+                            for v1, v2 in zip(self.player.looking_at_xy() + self.player.speed_xy(), new_gaze + new_speed):
+                                self.assertAlmostEqual(v1, v2, places=5, msg=msg)
+
+    def test_turns_are_on_table(self):
+        """The moves a learning player does on a grid are all precomputed."""
+        self.assertNotEqual(self.transitions.table[2, 2, 0, 1, 0, 0], NOT_ON_TABLE)
+        self.assertTrue((self.transitions.table[:, :, :, :, :, 0] != NOT_ON_TABLE).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
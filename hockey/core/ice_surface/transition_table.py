@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""Precomputed moves of players on discrete (grid) ice.
+
+On a grid, where a player ends up after a (moving) action only depends on its cell, where it looks at
+(one of 4 directions), how fast it goes (0 or 1 cell per tick) and the action itself. So we compute it once.
+
+"""
+
+import os
+import numpy as np
+from typing import List, Optional, Tuple
+
+from geometry.point import Point
+
+from hockey.behaviour.core.action import HockeyAction
+from util.geometry import fast_vector
+from util.geometry.container import fold_into_walls
+
+# directions a player can look at on a grid:
+HEADINGS = [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)]
+# speeds (norm, in cells per tick) that give integer moves on a grid:
+SPEED_CLASSES = [0, 1]
+# each entry of the table: new 'x', new 'y', new heading (idx), new speed class (idx). -1 means 'not on table'
+NOT_ON_TABLE = -1
+TOLERANCE = 1e-6
+
+
+def tabulable_actions() -> List[HockeyAction]:
+    """Moves whose effect doesn't depend on the player (ie, on its power)."""
+    depends_on_power = HockeyAction.FULL_POWER | HockeyAction.HALF_POWER | HockeyAction.THIRD_OF_POWER
+    return [a for a in HockeyAction.__members__.values()
+            if bool(a & HockeyAction.MOVE) and (a != HockeyAction.MOVE) and not bool(a & depends_on_power)]
+
+def heading_index(x: float, y: float) -> Optional[int]:
+    for idx, (heading_x, heading_y) in enumerate(HEADINGS):
+        if fast_vector.almost_equal(x, y, heading_x, heading_y, tolerance=TOLERANCE):
+            return idx
+    return None
+
+def speed_class_index(x: float, y: float) -> Optional[int]:
+    speed = fast_vector.norm(x, y)
+    for idx, a_speed in enumerate(SPEED_CLASSES):
+        if abs(speed - a_speed) <= TOLERANCE:
+            return idx
+    return None
+
+
+class TransitionTable(object):
+    """For each (cell, heading, speed class, action): where does a player go?"""
+
+    def __init__(self, width: int, height: int, table: np.ndarray, actions: List[HockeyAction]):
+        self.width = width
+        self.height = height
+        self.table = table
+        self.actions = actions
+        self.action_idx = {an_action: idx for idx, an_action in enumerate(actions)}
+
+    @classmethod
+    def file_name(cls, width: int, height: int) -> str:
+        return "transitions_%dx%d.npz" % (width, height)
+
+    @classmethod
+    def move(cls,
+             width: int,
+             height: int,
+             x: int,
+             y: int,
+             heading: Tuple[float, float],
+             speed: float,
+             a: HockeyAction) -> Optional[Tuple[Tuple[int, int], int, int]]:
+        """
+        Same computations as Player.__parse_action__ (and the move after it) for one state.
+
+        Returns:
+            None if the result can't be represented on the table (eg, non-integer speeds).
+            Otherwise: new cell, new heading (idx), new speed class (idx).
+
+        """
+        # local import: Player depends on the ice surface.
+        from hockey.core.player.base import Player
+        heading_x, heading_y = heading
+        r = Player.direction_and_speed_xy_from(a, power=Player.MIN_POWER, looking_at_x=heading_x, looking_at_y=heading_y)
+        if r is None:
+            return None
+        direction_x, direction_y, new_speed = r
+        gaze_x, gaze_y = fast_vector.normalized(direction_x, direction_y) if (direction_x != 0 or direction_y != 0) else (1.0, 0.0)
+        if new_speed < 0:
+            new_speed = speed
+        speed_x, speed_y = fast_vector.scaled_to_norm(gaze_x, gaze_y, new_speed)
+        if (abs(round(speed_x) - speed_x) > 1e-5) or (abs(round(speed_y) - speed_y) > 1e-5):
+            return None # not a valid speed on a grid.
+        # move 1 tick. Container of players on a grid is 1 unit smaller than the grid (see ObjectOnIce):
+        new_x, flipped_x = fold_into_walls(position=x, displacement=speed_x, min_valid=0, max_valid=width - 1)
+        new_y, flipped_y = fold_into_walls(position=y, displacement=speed_y, min_valid=0, max_valid=height - 1)
+        speed_x = -speed_x if flipped_x else speed_x
+        speed_y = -speed_y if flipped_y else speed_y
+        if speed_x != 0 or speed_y != 0:
+            gaze_x, gaze_y = fast_vector.normalized(speed_x, speed_y)
+        new_heading_idx = heading_index(gaze_x, gaze_y)
+        new_speed_idx = speed_class_index(speed_x, speed_y)
+        if (new_heading_idx is None) or (new_speed_idx is None):
+            return None
+        cell_x, cell_y = Point(new_x, new_y).integerize()
+        return ((int(cell_x), int(cell_y)), new_heading_idx, new_speed_idx)
+
+    @classmethod
+    def build(cls, width: int, height: int) -> 'TransitionTable':
+        actions = tabulable_actions()
+        table = np.full((width, height, len(HEADINGS), len(SPEED_CLASSES), len(actions), 4), NOT_ON_TABLE, dtype=np.int16)
+        for x in range(width):
+            for y in range(height):
+                for heading_idx, heading in enumerate(HEADINGS):
+                    for speed_idx, speed in enumerate(SPEED_CLASSES):
+                        for action_idx, an_action in enumerate(actions):
+                            r = cls.move(width, height, x, y, heading, speed, an_action)
+                            if r is not None:
+                                (new_x, new_y), new_heading_idx, new_speed_idx = r
+                                table[x, y, heading_idx, speed_idx, action_idx] = (new_x, new_y, new_heading_idx, new_speed_idx)
+        return cls(width, height, table, actions)
+
+    @classmethod
+    def load_or_build(cls, width: int, height: int, directory_opt: Optional[str] = None) -> 'TransitionTable':
+        """If a directory is given, table is read from there (and saved there if it had to be built)."""
+        if directory_opt is None:
+            return cls.build(width, height)
+        full_file_name = os.path.join(directory_opt, cls.file_name(width, height))
+        action_names = [an_action.name for an_action in tabulable_actions()]
+        if os.path.exists(full_file_name):
+            with np.load(full_file_name) as stored:
+                if list(stored["actions"]) == action_names:
+                    return cls(width, height, stored["table"], tabulable_actions())
+            print("[transitions] '%s' was built for other actions; re-building it" % (full_file_name))
+        transitions = cls.build(width, height)
+        os.makedirs(directory_opt, exist_ok=True)
+        with open(full_file_name, "wb") as f:
+            np.savez(f, table=transitions.table, actions=np.array(action_names))
+        return transitions
+
+    def lookup(self,
+               pos: Point,
+               looking_at: Tuple[float, float],
+               speed: Tuple[float, float],
+               a: HockeyAction) -> Optional[Tuple[Point, Tuple[float, float], Tuple[float, float]]]:
+        """
+        Where does a player go?
+
+        Returns:
+            None if this situation is not on the table; otherwise new position, new gaze and new speed.
+
+        """
+        action_idx = self.action_idx.get(a)
+        if action_idx is None:
+            return None
+        x, y = pos
+        if (x != int(x)) or (y != int(y)) or not ((0 <= x < self.width) and (0 <= y < self.height)):
+            return None
+        heading_idx = heading_index(*looking_at)
+        speed_idx = speed_class_index(*speed)
+        if (heading_idx is None) or (speed_idx is None):
+            return None
+        if SPEED_CLASSES[speed_idx] != 0:
+            # speed has to go where I look at (see Player.__sanity_check_or_explode__)
+            if heading_index(*fast_vector.normalized(*speed)) != heading_idx:
+                return None
+        new_x, new_y, new_heading_idx, new_speed_idx = self.table[int(x), int(y), heading_idx, speed_idx, action_idx].tolist()
+        if new_x == NOT_ON_TABLE:
+            return None
+        new_heading_x, new_heading_y = HEADINGS[new_heading_idx]
+        new_speed = SPEED_CLASSES[new_speed_idx]
+        return (Point(new_x, new_y), (new_heading_x, new_heading_y), (new_heading_x * new_speed, new_heading_y * new_speed))
@@ -1,6 +1,7 @@
 import abc
-import uuid
+import itertools
 
+from functools import lru_cache
 from random import random
 from mesa import Agent
 import numpy as np
@@ -11,57 +12,110 @@ from hockey.core.model import TIME_PER_FRAME
 from util.base import FEET_IN_METER, GRAVITY_ACCELERATION
 from util.geometry.container import Container
 
+# ids of agents: unique for the whole process (so agents from different worlds never share one)
+_AGENT_IDS = itertools.count()
+
+
+@lru_cache(maxsize=None)
+def container_of_size(height: float, width: float) -> Container:
+    """Containers are never modified, so all agents living on same-sized ice share the same one."""
+    return Container(height=height, width=width)
+
+
 class ObjectOnIce(Agent):
     """Anything that goes on ice follows this behaviour."""
+
+    __slots__ = ('kind', 'physics_row', '_pos', '_speed', 'size', 'container')
+
     def __init__(self,
                  prefix_on_id: str,
                  hockey_world_model,
                  size: float,
                  pos_opt: Optional[Point] = None,
                  speed_opt: Optional[Vec2d] = None):
-        super().__init__(unique_id=prefix_on_id + "_" + str(uuid.uuid4()), model=hockey_world_model)
+        # if the world has batch physics, my position, speed (and heading) are also stored there:
+        physics = hockey_world_model.physics
+        self.physics_row = None if physics is None else physics.register(self)
+        self.kind = prefix_on_id
+        super().__init__(unique_id=next(_AGENT_IDS), model=hockey_world_model)
         if (pos_opt is None):
             self.pos = self.model.get_random_position()
         else:
             self.pos = pos_opt
         if (speed_opt is None):
-            self._speed = Vec2d(0, 0)
+            self.__store_speed__(Vec2d(0, 0))
         else:
-            self._speed = speed_opt
+            self.__store_speed__(speed_opt)
         self.size = size
         if self.model.is_continuous():
-            self.container = Container(height=self.model.height - 0.01, width=self.model.width - 0.01)
+            self.container = container_of_size(height=self.model.height - 0.01, width=self.model.width - 0.01)
         else:
-            self.container = Container(height=self.model.height - 1, width=self.model.width - 1)
+            self.container = container_of_size(height=self.model.height - 1, width=self.model.width - 1)
+
+    @property
+    def pos(self) -> Optional[Point]:
+        return self._pos
+
+    @pos.setter
+    def pos(self, value: Optional[Point]):
+        self._pos = value
+        if (self.physics_row is not None) and (value is not None):
+            x, y = value
+            self.model.physics.positions[self.physics_row] = (x, y)
 
     @property
     def speed(self) -> Vec2d:
         """I'm the 'x' property."""
         # print("getter of x called")
-        return self._speed
+        if self.physics_row is None:
+            return self._speed
+        return Vec2d(*self.model.physics.speeds[self.physics_row].tolist())
 
     @speed.setter
     def speed(self, value: Vec2d):
         # print("setter of x called")
-        if not self.model.is_continuous():
-            speed_on_x = value.x
-            if abs(round(speed_on_x) - speed_on_x) > 1e-5:
-                raise RuntimeError("WARNING ===> setting of %s's speed to %s, which gives a non-integer 'x' speed (~ %.2f)" %
-                      (self.unique_id, value, speed_on_x))
-            speed_on_y =value.y
-            if abs(round(speed_on_y) - speed_on_y) > 1e-5:
-                raise RuntimeError("WARNING ===> setting of %s's speed to %s, which gives a non-integer 'y' speed (~ %.2f)" %
-                      (self.unique_id, value, speed_on_y))
-        else:
-            print("[CONTINUOUS WORLD[ [%s] set speed to %s" %
-                  (self.unique_id, value))
-        self._speed = value
+        self.__check_speed__(value.x, value.y)
+        self.__store_speed__(value)
 
     @speed.deleter
     def speed(self):
         # print("deleter of x called")
         del self._speed
 
+    def __check_speed__(self, speed_on_x: float, speed_on_y: float):
+        if not self.model.checks_now():
+            return
+        if not self.model.is_continuous():
+            if abs(round(speed_on_x) - speed_on_x) > 1e-5:
+                raise RuntimeError("WARNING ===> setting of %s's speed to (%.2f, %.2f), which gives a non-integer 'x' speed (~ %.2f)" %
+                      (self.unique_id, speed_on_x, speed_on_y, speed_on_x))
+            if abs(round(speed_on_y) - speed_on_y) > 1e-5:
+                raise RuntimeError("WARNING ===> setting of %s's speed to (%.2f, %.2f), which gives a non-integer 'y' speed (~ %.2f)" %
+                      (self.unique_id, speed_on_x, speed_on_y, speed_on_y))
+        else:
+            print("[CONTINUOUS WORLD[ [%s] set speed to (%.2f, %.2f)" %
+                  (self.unique_id, speed_on_x, speed_on_y))
+
+    def __store_speed__(self, value: Vec2d):
+        if self.physics_row is None:
+            self._speed = value
+        else:
+            self.model.physics.speeds[self.physics_row] = (value.x, value.y)
+
+    def speed_xy(self) -> Tuple[float, float]:
+        """Speed as plain floats (no Vec2d is built)."""
+        if self.physics_row is None:
+            return (self._speed.x, self._speed.y)
+        x, y = self.model.physics.speeds[self.physics_row].tolist()
+        return (x, y)
+
+    def set_speed_xy(self, speed_on_x: float, speed_on_y: float):
+        """Same as setting 'speed', from plain floats."""
+        self.__check_speed__(speed_on_x, speed_on_y)
+        if self.physics_row is None:
+            self._speed = Vec2d(speed_on_x, speed_on_y)
+        else:
+            self.model.physics.speeds[self.physics_row] = (speed_on_x, speed_on_y)
 
     def is_moving(self) -> bool:
         return not self.speed.is_zero()
@@ -79,6 +133,12 @@ class ObjectOnIce(Agent):
         Returns:
 
         """
+        if self.physics_row is not None:
+            # the world moves all of us at once (see SkatingIce.step); if it is not ticking, I move right now.
+            self.model.physics.request_move(self.physics_row, for_how_long, friction_constant_opt)
+            if not self.model.defers_moves():
+                self.model.advance_pending_agents()
+            return
         new_pt, new_speed = self.container.particle_move(
             for_how_long=for_how_long,
             particle_diameter=0, # TODO: 0??????? whaaaa?? Isn't it self.size,
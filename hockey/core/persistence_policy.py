@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""When should a simulator write its (resident) brain to disk?"""
+
+from typing import Optional
+
+
+class PersistencePolicy(object):
+    """
+    Saves every 'every_episodes_opt' episodes and/or every 'every_seconds_opt' seconds (whatever comes first),
+    and, if 'on_exit', when the simulation ends. With nothing set, a brain is only kept in memory.
+    """
+
+    def __init__(self, every_episodes_opt: Optional[int] = 1, every_seconds_opt: Optional[float] = None, on_exit: bool = True):
+        if (every_episodes_opt is not None) and (every_episodes_opt <= 0):
+            raise ValueError("Saving every %d episodes makes no sense" % (every_episodes_opt))
+        if (every_seconds_opt is not None) and (every_seconds_opt <= 0):
+            raise ValueError("Saving every %.2f seconds makes no sense" % (every_seconds_opt))
+        self.every_episodes_opt = every_episodes_opt
+        self.every_seconds_opt = every_seconds_opt
+        self.on_exit = on_exit
+        self.episodes_since_saved = 0
+        self.last_saved_time_opt = None # type: Optional[float]
+
+    @classmethod
+    def every_episode(cls) -> 'PersistencePolicy':
+        return cls(every_episodes_opt=1)
+
+    @classmethod
+    def every(cls, episodes: int) -> 'PersistencePolicy':
+        return cls(every_episodes_opt=episodes)
+
+    @classmethod
+    def every_seconds(cls, seconds: float) -> 'PersistencePolicy':
+        return cls(every_episodes_opt=None, every_seconds_opt=seconds)
+
+    @classmethod
+    def only_on_exit(cls) -> 'PersistencePolicy':
+        return cls(every_episodes_opt=None, every_seconds_opt=None, on_exit=True)
+
+    def started(self, now: float):
+        """Time is measured from here (eg, when the brain was loaded)."""
+        self.last_saved_time_opt = now
+
+    def episode_done(self, now: float) -> bool:
+        """An episode just ended: should the brain be saved?"""
+        self.episodes_since_saved += 1
+        if (self.every_episodes_opt is not None) and (self.episodes_since_saved >= self.every_episodes_opt):
+            return True
+        if self.last_saved_time_opt is None:
+            self.last_saved_time_opt = now
+        return (self.every_seconds_opt is not None) and (now - self.last_saved_time_opt >= self.every_seconds_opt)
+
+    def saved(self, now: float):
+        self.episodes_since_saved = 0
+        self.last_saved_time_opt = now
+
+    def exiting(self) -> bool:
+        """The simulation ends: should the brain be saved?"""
+        return self.on_exit and (self.episodes_since_saved > 0)
@@ -13,11 +13,16 @@ from hockey.behaviour.core.action import HockeyAction
 from hockey.core.model import TIME_PER_FRAME
 from hockey.core.object_on_ice import ObjectOnIce
 from util.base import random_between, stick_length_for_height, INCHES_IN_FOOT
+from util.geometry import fast_vector, predicates
 from util.geometry.lines import StraightLine
 
 class Player(ObjectOnIce, Sensor):
     """Hockey Player."""
 
+    __slots__ = ('height', 'reach', 'moving_speed', 'sprinting_speed', 'power', 'brain', 'have_puck',
+                 '_looking_at', 'unable_to_play_puck_time', 'last_action', 'sensed_key', 'sensed',
+                 'sensing_state_opt')
+
     # Remember: all speeds are in feet/second.
     MIN_SPEED_MOVING = 14
     MAX_SPEED_MOVING = 22
@@ -47,20 +52,31 @@ class Player(ObjectOnIce, Sensor):
 
     VERY_LOW_SPEED = 0 # 1e-7 # (not 0, to avoid stupidities like 1/0)
 
+    # cosine and sine of the angles an action can ask for (multiples of Pi/10):
+    RADIANS_FLAGS_COS_SIN = [(flag, math.cos(math.pi * i / 10), math.sin(math.pi * i / 10))
+                             for i, flag in enumerate([HockeyAction.RADIANS_0,
+                                                       HockeyAction.RADIANS_PI_TIMES_1_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_2_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_3_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_4_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_5_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_6_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_7_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_8_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_9_OVER_10,
+                                                       HockeyAction.RADIANS_PI_TIMES_10_OVER_10])]
+
     @classmethod
-    def direction_and_speed_from(cls,
-                                 a: HockeyAction,
-                                 power: float,
-                                 looking_at: Vec2d) -> Optional[Tuple[Vec2d, float]]:
+    def direction_and_speed_xy_from(cls,
+                                    a: HockeyAction,
+                                    power: float,
+                                    looking_at_x: float,
+                                    looking_at_y: float) -> Optional[Tuple[float, float, float]]:
         """
-        
-        Args:
-            a: 
-            power: 
-            looking_at: 
+        Same as 'direction_and_speed_from', on plain floats.
 
         Returns:
-            On success: A tuple with direction, speed. On returning speed = -1 we indicate that speed should be kept as is.
+            On success: A tuple with direction (x and y), speed. On returning speed = -1 we indicate that speed should be kept as is.
             On error: None.
 
         """
@@ -95,34 +111,35 @@ class Player(ObjectOnIce, Sensor):
         else:
             return None  # this doesn't look like a speed/direction flag.
         # angle (in radians)
-        pi_over_10 = AngleInRadians.PI / 10
-        if bool(a & HockeyAction.RADIANS_0):
-            angle_value = 0
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_1_OVER_10):
-            angle_value = pi_over_10 * 1
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_2_OVER_10):
-            angle_value = pi_over_10 * 2
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_3_OVER_10):
-            angle_value = pi_over_10 * 3
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_4_OVER_10):
-            angle_value = pi_over_10 * 4
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_5_OVER_10):
-            angle_value = pi_over_10 * 5
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_6_OVER_10):
-            angle_value = pi_over_10 * 6
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_7_OVER_10):
-            angle_value = pi_over_10 * 7
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_8_OVER_10):
-            angle_value = pi_over_10 * 8
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_9_OVER_10):
-            angle_value = pi_over_10 * 9
-        elif bool(a & HockeyAction.RADIANS_PI_TIMES_10_OVER_10):
-            angle_value = pi_over_10 * 10
-        else:
-            return None  # this doesn't look like a speed/direction flag.
-        new_vector = looking_at.rotated_radians(
-            angle_radians=AngleInRadians(2 * AngleInRadians.PI + direction_multiplier * angle_value))
-        return (new_vector, speed)
+        for flag, cos_angle, sin_angle in cls.RADIANS_FLAGS_COS_SIN:
+            if bool(a & flag):
+                new_x, new_y = fast_vector.rotated(looking_at_x, looking_at_y,
+                                                   cos_angle=cos_angle, sin_angle=direction_multiplier * sin_angle)
+                return (new_x, new_y, speed)
+        return None  # this doesn't look like a speed/direction flag.
+
+    @classmethod
+    def direction_and_speed_from(cls,
+                                 a: HockeyAction,
+                                 power: float,
+                                 looking_at: Vec2d) -> Optional[Tuple[Vec2d, float]]:
+        """
+        
+        Args:
+            a: 
+            power: 
+            looking_at: 
+
+        Returns:
+            On success: A tuple with direction, speed. On returning speed = -1 we indicate that speed should be kept as is.
+            On error: None.
+
+        """
+        r = cls.direction_and_speed_xy_from(a, power=power, looking_at_x=looking_at.x, looking_at_y=looking_at.y)
+        if r is None:
+            return None
+        new_x, new_y, speed = r
+        return (Vec2d(new_x, new_y), speed)
 
     def __choose_random_speed__(self) -> float:
         """Returns a speed between 'moving' and 'sprinting' speeds."""
@@ -132,15 +149,26 @@ class Player(ObjectOnIce, Sensor):
                                     an_angle_opt: Optional[AngleInRadians] = None,
                                     a_speed_opt: Optional[float] = None) -> bool:
         """Sets speed vector from parameters. Returns True if speed was changed."""
-        if (an_angle_opt is not None):
-            self.looking_at = Vec2d.from_angle(an_angle_opt)
-        new_speed = a_speed_opt if (a_speed_opt is not None) else self.speed.norm()
-        if (an_angle_opt is not None) or (a_speed_opt is not None):
-            self.speed = self.looking_at.scaled_to_norm(new_speed)
-            assert self.speed.norm() <= 1 + 1e-3, "new speed's norm: %.2f" % (self.speed.norm())
-            return True
-        else:
+        gaze_opt = None if an_angle_opt is None else fast_vector.from_angle(an_angle_opt.value)
+        return self.__set_gaze_and_speed_xy__(gaze_opt=gaze_opt, a_speed_opt=a_speed_opt)
+
+    def __set_gaze_and_speed_xy__(self,
+                                  gaze_opt: Optional[Tuple[float, float]] = None,
+                                  a_speed_opt: Optional[float] = None) -> bool:
+        """Same as '__set_gaze_and_speed_from__', where the gaze is a unit vector (as plain floats)."""
+        if (gaze_opt is None) and (a_speed_opt is None):
             return False
+        if gaze_opt is not None:
+            self.set_looking_at_xy(*gaze_opt)
+            gaze_x, gaze_y = gaze_opt
+        else:
+            gaze_x, gaze_y = self.looking_at_xy()
+        new_speed = a_speed_opt if (a_speed_opt is not None) else fast_vector.norm(*self.speed_xy())
+        speed_x, speed_y = fast_vector.scaled_to_norm(gaze_x, gaze_y, new_speed)
+        self.set_speed_xy(speed_x, speed_y)
+        if self.model.checks_now():
+            assert fast_vector.norm(speed_x, speed_y) <= 1 + 1e-3, "new speed's norm: %.2f" % (fast_vector.norm(speed_x, speed_y))
+        return True
 
     def __init__(self, prefix_on_id: str, hockey_world_model, brain: Brain):
         Sensor.__init__(self, environment=hockey_world_model)
@@ -154,6 +182,11 @@ class Player(ObjectOnIce, Sensor):
         self.power = random_between(Player.MIN_POWER, Player.MAX_POWER)
         self.brain = brain
         self.have_puck = False
+        # quantities derived from where I am, where I look at and where the puck is (see __sensed__):
+        self.sensed_key = None
+        self.sensed = {}
+        # what I sense, refreshed in place at each 'sense':
+        self.sensing_state_opt = None
         self.looking_at = NULL_VECTOR
         angles_to_choose_from = [AngleInRadians(0), AngleInRadians(AngleInRadians.PI_HALF), AngleInRadians(AngleInRadians.PI), AngleInRadians(AngleInRadians.THREE_HALFS_OF_PI)]
         self.reset(to_angle=angles_to_choose_from[random.randint(0, 3)], to_speed=Player.VERY_LOW_SPEED) # very slow speed , random direction, to start
@@ -175,6 +208,32 @@ class Player(ObjectOnIce, Sensor):
             "Have puck = %s" % (self.have_puck)
 
 
+    @property
+    def looking_at(self) -> Vec2d:
+        if self.physics_row is None:
+            return self._looking_at
+        return Vec2d(*self.model.physics.headings[self.physics_row].tolist())
+
+    @looking_at.setter
+    def looking_at(self, value: Vec2d):
+        if self.physics_row is None:
+            self._looking_at = value
+        else:
+            self.model.physics.headings[self.physics_row] = (value.x, value.y)
+
+    def looking_at_xy(self) -> Tuple[float, float]:
+        """Where I look at, as plain floats (no Vec2d is built)."""
+        if self.physics_row is None:
+            return (self._looking_at.x, self._looking_at.y)
+        x, y = self.model.physics.headings[self.physics_row].tolist()
+        return (x, y)
+
+    def set_looking_at_xy(self, x: float, y: float):
+        if self.physics_row is None:
+            self._looking_at = Vec2d(x, y)
+        else:
+            self.model.physics.headings[self.physics_row] = (x, y)
+
     def angle_looking_at(self) -> AngleInRadians:
         return self.looking_at.angle_with_positive_x_axis()
 
@@ -197,11 +256,12 @@ class Player(ObjectOnIce, Sensor):
     #     #         self.__dict__["speed"] = NULL_VECTOR
 
     def sense(self) -> EnvironmentState:
-        from hockey.behaviour.core.environment_state import EnvironmentState as HockeyEnvironmentState
-        return HockeyEnvironmentState(
-            me=self,
-            puck_owner_opt=self.model.who_has_the_puck(),
-            puck_pos_opt=self.model.puck.pos)
+        """The same state is returned (refreshed) every time: keep a copy of it to remember a situation."""
+        if self.sensing_state_opt is None:
+            # (local import: environment states know about players)
+            from hockey.behaviour.core.environment_state import EnvironmentState as HockeyEnvironmentState
+            self.sensing_state_opt = HockeyEnvironmentState(me=self, puck_owner_opt=None, puck_pos_opt=None)
+        return self.sensing_state_opt.refresh(puck_owner_opt=self.model.who_has_the_puck(), puck_pos_opt=self.model.puck.pos)
 
     def move_around(self):
         # maybe irrealistic, but it'll do for now:
@@ -211,12 +271,42 @@ class Player(ObjectOnIce, Sensor):
         """True on success, False otherwise."""
         return self.__set_gaze_and_speed_from__(an_angle_opt=AngleInRadians.random())
 
+    def __sensed__(self, name: str, compute):
+        """
+        Value of a quantity that only depends on my position, my gaze and the puck's position.
+        It is computed once; moving me, turning me or moving the puck forgets all of them.
+        """
+        pos = self.pos
+        puck_pos = self.model.puck.pos
+        key = (pos.x, pos.y, self.looking_at_xy(), puck_pos.x, puck_pos.y)
+        if key != self.sensed_key:
+            self.sensed_key = key
+            self.sensed = {}
+        elif name in self.sensed:
+            return self.sensed[name]
+        value = compute()
+        self.sensed[name] = value
+        return value
+
+    def vector_to_puck(self) -> Vec2d:
+        """From me to the puck (whether I see it or not)."""
+        return self.__sensed__('vector_to_puck', lambda: self.model.vector_to_puck(self.pos))
+
+    def angle_to_puck(self) -> AngleInRadians:
+        """In [0, 2Pi], whether I see it or not. See angle_to_puck_opt."""
+        return self.__sensed__('angle_to_puck', lambda: self.model.angle_to_puck(self.pos, self.vector_looking_at()))
+
+    def vector_to_puck_xy(self) -> Tuple[float, float]:
+        """From me to the puck, as plain floats (no Vec2d is built)."""
+        puck_pos = self.model.puck.pos
+        return (puck_pos.x - self.pos.x, puck_pos.y - self.pos.y)
+
     def vector_me_to_puck_opt(self) -> Optional[Vec2d]:
         """If I see the puck, this is the vector to it."""
         if not self.can_see_puck():
             # print("Can't calculate a vector to puck because I don't see it") # TODO: put this on a log
             return None
-        return self.model.vector_to_puck(self.pos)
+        return self.vector_to_puck()
 
     def __pt_in_front_of_me__(self) -> Point:
         """Point that it's right in front of 'my eyes' at a distance of 'reach' """
@@ -225,29 +315,23 @@ class Player(ObjectOnIce, Sensor):
 
     def distance_to_puck_opt(self) -> Optional[float]:
         """Distance (in feet) of player that generated this state to the puck."""
-        v = self.vector_me_to_puck_opt()
-        if v is None: # I can't calculate vector to puck: probably I can't see the puck.
+        if not self.can_see_puck(): # I can't calculate vector to puck.
             return None
-        else:
-            return v.norm()
+        return self.__sensed__('distance_to_puck', lambda: self.vector_to_puck().norm())
 
 
     def can_reach_puck(self) -> bool:
         if self.unable_to_play_puck_time > 0:
             return False
+        elif self.model.puck.is_out_of_reach():
+            return False # (known without computing where the puck is: see Puck.fly)
         elif not self.can_see_puck():
             return False # if I can't see the puck, I can't reach it.
         elif self.on_top_of_puck():
             return True # YEAH!
         else:
-            d_to_puck = self.distance_to_puck_opt()
-            a_to_puck = self.angle_to_puck_opt()
-            # print("[my reach = %.2f feet] d to puck = %.2f feet" % (player.reach, d_to_puck))
-            return (d_to_puck is not None) and \
-                   (round(d_to_puck, 3) <= round(self.reach, 3)) and \
-                   (a_to_puck is not None) and \
-                   ((a_to_puck <= AngleInRadians(AngleInRadians.PI_HALF)) or
-                    (a_to_puck >= AngleInRadians(AngleInRadians.THREE_HALFS_OF_PI)))
+            # in front of me, and not further than my reach:
+            return predicates.within_reach(*self.looking_at_xy(), *self.vector_to_puck_xy(), reach=self.reach)
 
     def angle_to_puck_opt(self) -> Optional[AngleInRadians]:
         """
@@ -255,12 +339,9 @@ class Player(ObjectOnIce, Sensor):
         defined by a straight line right in front of me, then this angle will be in [Pi, 2Pi]
         If it's at my left, the angle is in [0,Pi]
         """
-        angle = self.model.angle_to_puck(self.pos, self.vector_looking_at())
-        if angle <= AngleInRadians(AngleInRadians.PI_HALF) or \
-                        angle >= AngleInRadians(AngleInRadians.THREE_HALFS_OF_PI):
-            return angle
-        else:
+        if not predicates.in_front(*self.looking_at_xy(), *self.vector_to_puck_xy()):
             return None
+        return self.angle_to_puck()
 
     def angles_to_goal(self) -> Tuple[Optional[AngleInRadians], Optional[AngleInRadians]]:
         """
@@ -269,17 +350,10 @@ class Player(ObjectOnIce, Sensor):
         defined by a straight line right in front of me, then this angle will be in [Pi, 2Pi]
         If it's at my left, the angle is in [0,Pi]
         """
-        def angle_visible(an_angle: AngleInRadians) -> bool:
-            return (an_angle.value <= AngleInRadians.PI_HALF) or (an_angle.value >= AngleInRadians.THREE_HALFS_OF_PI)
-        a1, a2 = self.model.angles_to_goal(a_pos=self.pos, looking_at=self.vector_looking_at())
-        if not angle_visible(a1):
-            r1 = None
-        else:
-            r1 = a1
-        if not angle_visible(a2):
-            r2 = None
-        else:
-            r2 = a2
+        looking_at = self.vector_looking_at()
+        v1, v2 = self.model.vectors_to_goal(self.pos)
+        r1 = looking_at.angle_to(v1) if predicates.in_front(looking_at.x, looking_at.y, v1.x, v1.y) else None
+        r2 = looking_at.angle_to(v2) if predicates.in_front(looking_at.x, looking_at.y, v2.x, v2.y) else None
         return (r1, r2)
         # one_post = Point(x=self.model.goal_position[0], y=self.model.goal_position[1][0])
         # other_post = Point(x=self.model.goal_position[0], y=self.model.goal_position[1][1])
@@ -307,20 +381,24 @@ class Player(ObjectOnIce, Sensor):
         return self.pos == self.model.puck.pos
 
     def can_see_puck(self) -> bool:
-        if self.on_top_of_puck():
-            return True
-        else:
-            angle_to_puck = self.angle_to_puck_opt()
-            return (angle_to_puck is not None) and \
-                   ((angle_to_puck <= AngleInRadians(AngleInRadians.PI_HALF)) or
-                    (angle_to_puck >= AngleInRadians(AngleInRadians.THREE_HALFS_OF_PI)))
+        return self.__sensed__('can_see_puck', self.__can_see_puck__)
+
+    def __can_see_puck__(self) -> bool:
+        return self.on_top_of_puck() or predicates.in_front(*self.looking_at_xy(), *self.vector_to_puck_xy())
 
     def can_see_goal_posts(self) -> Tuple[bool, bool]:
         """Can I see the FRONT of the goal posts?"""
         if self.pos.x > self.model.goal_position[0]: # I am behind the goal
             return (False, False)
-        a1, a2 = self.angles_to_goal()
-        return (a1 is not None, a2 is not None)
+        heading_x, heading_y = self.looking_at_xy()
+        v1, v2 = self.model.vectors_to_goal(self.pos)
+        return (predicates.in_front(heading_x, heading_y, v1.x, v1.y), predicates.in_front(heading_x, heading_y, v2.x, v2.y))
+
+    def goal_posts_to_my_right(self) -> Tuple[bool, bool]:
+        """Do I see each goal post to my right? (whether I am behind the goal or not)"""
+        heading_x, heading_y = self.looking_at_xy()
+        return tuple(predicates.in_front(heading_x, heading_y, v.x, v.y) and predicates.to_the_right(heading_x, heading_y, v.x, v.y)
+                     for v in self.model.vectors_to_goal(self.pos))
 
     def distance_to_goal_posts(self) -> Tuple[Optional[float], Optional[float]]:
         """Distance, in feet, to both goal posts"""
@@ -360,6 +438,11 @@ class Player(ObjectOnIce, Sensor):
             True if the action was successfully taken. False otherwise.
 
         """
+        if self.__move_from_transition_table__(a):
+            return True
+        checks = self.model.checks_now() # (if not: no asserts, no reporting)
+        if not checks:
+            self.last_action = "" # (not the one of a previous tick)
         action_taken = True
         # self.move_by_bouncing_from_walls(for_how_long=TIME_PER_FRAME / 2)
         do_move = True # unless otherwise stated, after taking the action I have to move
@@ -372,71 +455,118 @@ class Player(ObjectOnIce, Sensor):
         #     action_taken = self.align_with_puck()
         #     self.last_action = "Align with puck"
         if bool(a & HockeyAction.MOVE):
-            r = Player.direction_and_speed_from(a, power=self.power, looking_at=self.vector_looking_at())
-            assert r is not None # see the condition above
-            direction, speed = r
-            old_speed = self.speed
-            self.__set_gaze_and_speed_from__(an_angle_opt=direction.angle_with_positive_x_axis(),
-                                             a_speed_opt=speed if speed >= 0 else None)
-            # mini sanity-check
-            la_norm =  self.vector_looking_at()
-            dir_norm = direction.normalized()
-            if not ((abs(la_norm.x - dir_norm.x) <= 1e-3) and (abs(la_norm.y - dir_norm.y) <= 1e-3)):
-                # redo, for debugging purposes
-                self.speed = old_speed
-                self.__set_gaze_and_speed_from__(an_angle_opt=direction.angle_with_positive_x_axis(),
-                                                 a_speed_opt=speed if speed >= 0 else None)
-
-            assert (abs(la_norm.x - dir_norm.x) <= 1e-3) and (abs(la_norm.y - dir_norm.y) <= 1e-3), \
-                "looking at: %s, direction: %s" % (self.vector_looking_at().normalized(), direction.normalized())
-            self.last_action = "Move => speed = %.2f feet/sec, direction = %s, so I am going %s" % (self.current_speed(), self.angle_looking_at(), self.speed)
+            looking_at_x, looking_at_y = self.looking_at_xy()
+            r = Player.direction_and_speed_xy_from(a, power=self.power, looking_at_x=looking_at_x, looking_at_y=looking_at_y)
+            if r is None: # (can't be, given the condition above)
+                raise RuntimeError("Player does not know how to get a direction and speed for action %s" % (a))
+            direction_x, direction_y, speed = r
+            # a null direction has angle 0 (as Vec2d's does):
+            gaze = fast_vector.normalized(direction_x, direction_y) if (direction_x != 0 or direction_y != 0) else (1.0, 0.0)
+            self.__set_gaze_and_speed_xy__(gaze_opt=gaze, a_speed_opt=speed if speed >= 0 else None)
+            if checks:
+                speed_x, speed_y = self.speed_xy()
+                self.last_action = "Move => speed = %.2f feet/sec, direction = %.2f radians, so I am going (%.2f, %.2f)" % \
+                                   (fast_vector.norm(speed_x, speed_y), fast_vector.angle_with_positive_x_axis(*gaze), speed_x, speed_y)
         elif bool(a & HockeyAction.SHOOT):
-            r = Player.direction_and_speed_from(a, power=self.power, looking_at=self.vector_looking_at())
-            assert r is not None # see the condition above
-            direction, speed = r
-            assert speed > 0
-            self.last_action = "send puck, speed = %.2f feet/sec, direction = %s" % (speed, direction)
-            action_taken = self.__send_puck__(puck_speed_vector=direction, speed_multiplier=speed)
-            self.__set_gaze_and_speed_from__(a_speed_opt=self.current_speed() / 10) # shooting drastically slows me down
+            looking_at_x, looking_at_y = self.looking_at_xy()
+            r = Player.direction_and_speed_xy_from(a, power=self.power, looking_at_x=looking_at_x, looking_at_y=looking_at_y)
+            if r is None: # (can't be, given the condition above)
+                raise RuntimeError("Player does not know how to get a direction and speed for action %s" % (a))
+            direction_x, direction_y, speed = r
+            if checks:
+                assert speed > 0
+                self.last_action = "send puck, speed = %.2f feet/sec, direction = (%.2f, %.2f)" % (speed, direction_x, direction_y)
+            action_taken = self.__send_puck__(puck_speed_vector=Vec2d(direction_x, direction_y), speed_multiplier=speed)
+            # shooting drastically slows me down:
+            self.__set_gaze_and_speed_xy__(a_speed_opt=fast_vector.norm(*self.speed_xy()) / 10)
         else:
             action_taken = False
             raise RuntimeError("Player does not know how to interpret action %s" % (a))
         # wrap-up:
+        if checks and not action_taken:
+            self.last_action = "[FAILED] " + self.last_action
         old_pos = self.pos
         if do_move:
             self.move_by_bouncing_from_walls(for_how_long=1) # 1 == '1 tick' (or '1 step') TIME_PER_FRAME) # TIME_PER_FRAME / 2)
-            if self.current_speed() != 0:
-                self.looking_at = self.speed.normalized() # essentially because there are reboundings
+            if self.model.defers_moves():
+                return action_taken # the world will move me, and call 'wrap_up_move' (see SkatingIce.step)
+            speed_x, speed_y = self.speed_xy()
+            if speed_x != 0 or speed_y != 0:
+                self.set_looking_at_xy(*fast_vector.normalized(speed_x, speed_y)) # essentially because there are reboundings
+        if self.wrap_up_move():
+            action_taken = True
+
+        if checks and abs(self.pos.x - old_pos.x) == 1 and abs(self.pos.y - old_pos.y) == 1:
+            raise RuntimeError("HELLO")
+        return action_taken
+
+    def __move_from_transition_table__(self, a: HockeyAction) -> bool:
+        """
+        If the world has precomputed this move, does it (move included).
+
+        Returns:
+            True if the move was found on the table (and done), False otherwise.
+
+        """
+        if (self.model.transitions is None) or self.model.defers_moves() or not bool(a & HockeyAction.MOVE):
+            return False
+        r = self.model.transitions.lookup(pos=self.pos, looking_at=self.looking_at_xy(), speed=self.speed_xy(), a=a)
+        if r is None:
+            return False
+        new_pos, (gaze_x, gaze_y), (speed_x, speed_y) = r
+        self.set_looking_at_xy(gaze_x, gaze_y)
+        self.set_speed_xy(speed_x, speed_y)
+        self.model.move_agent(self, new_pos)
+        if self.model.checks_now():
+            self.last_action = "Move => speed = %.2f feet/sec, direction = %.2f radians, so I am going (%.2f, %.2f)" % \
+                               (fast_vector.norm(speed_x, speed_y), fast_vector.angle_with_positive_x_axis(gaze_x, gaze_y), speed_x, speed_y)
+        else:
+            self.last_action = ""
+        self.wrap_up_move()
+        return True
+
+    def wrap_up_move(self) -> bool:
+        """
+        What has to happen once I am on my new position: take the puck with me, check my sanity and
+        grab the puck if I'm close to it.
+
+        Returns:
+            True if I grabbed the puck.
+
+        """
         if self.have_puck:
             self.model.space.place_agent(self.model.puck, self.pos)
-        if not action_taken:
-            self.last_action = "[FAILED] " + self.last_action
         # if (a == HockeyAction.GRAB_PUCK) and action_taken:
         #     assert self.have_puck
+        checks = self.model.checks_now()
         # Sanity check: whatever I do. at the end sanity should prevail:
-        self.__sanity_check_or_explode__()
+        if checks:
+            self.__sanity_check_or_explode__()
         # grab the puck if you're REALLY close to it!
         if self.can_reach_puck():
-            action_taken = self.grab_puck()
-            print("GRAB PUCK BY PROXIMITY => succeeded? -> %s" % (action_taken))
-            assert action_taken
-            assert self.have_puck
-
-        if abs(self.pos.x - old_pos.x) == 1 and abs(self.pos.y - old_pos.y) == 1:
-            raise RuntimeError("HELLO")
-        return action_taken
+            grabbed = self.grab_puck()
+            if checks:
+                print("GRAB PUCK BY PROXIMITY => succeeded? -> %s" % (grabbed))
+                assert grabbed
+                assert self.have_puck
+            return grabbed
+        return False
 
     def __sanity_check_or_explode__(self):
         """Properties that have to hold at all moments"""
 
         # vector looking at is normalized
-        assert (self.vector_looking_at().norm() == 0) or abs(self.vector_looking_at().norm() - 1.0) < 1e-3, \
-            "self.vector_looking_at() = %s, so its norm() = %.2f" % (self.vector_looking_at(), self.vector_looking_at().norm())
+        looking_at_x, looking_at_y = self.looking_at_xy()
+        looking_at_norm = fast_vector.norm(looking_at_x, looking_at_y)
+        assert (looking_at_norm == 0) or abs(looking_at_norm - 1.0) < 1e-3, \
+            "looking at (%.4f, %.4f), so its norm() = %.2f" % (looking_at_x, looking_at_y, looking_at_norm)
         #
-        if self.current_speed() != 0:
-            assert self.speed.normalized() == self.vector_looking_at(), \
-                "angle looking at = %s, current speed = %.2f, speed = %s, looking at = %s" % \
-                (self.angle_looking_at(), self.current_speed(), self.speed.normalized(), self.vector_looking_at())
+        speed_x, speed_y = self.speed_xy()
+        if speed_x != 0 or speed_y != 0:
+            direction_x, direction_y = fast_vector.normalized(speed_x, speed_y)
+            assert fast_vector.almost_equal(direction_x, direction_y, looking_at_x, looking_at_y, tolerance=1e-6), \
+                "speed = (%.4f, %.4f), so direction = (%.4f, %.4f); looking at = (%.4f, %.4f)" % \
+                (speed_x, speed_y, direction_x, direction_y, looking_at_x, looking_at_y)
 
     def apply_actions(self, actions: List[HockeyAction]) -> bool:
         return [self.__parse_action__(an_action) for an_action in actions][-1]
@@ -451,11 +581,7 @@ class Player(ObjectOnIce, Sensor):
         self.__set_gaze_and_speed_from__(an_angle_opt=AngleInRadians(self.angle_looking_at().value - AngleInRadians.PI_HALF))
 
     def is_puck_owned_by_my_team(self) -> bool:
-        current_owner = self.model.who_has_the_puck()
-        if current_owner is None:
-            return False
-        else:
-            return type(self) == type(current_owner)
+        return self.model.is_puck_owned_by_team_of(self)
 
     def first_visible_goal_point(self) -> Optional[Point]:
         return self.model.first_visible_goal_point_from(a_position=self.pos)
@@ -463,6 +589,7 @@ class Player(ObjectOnIce, Sensor):
     def release_puck(self):
         if self.have_puck:
             self.have_puck = False
+            self.model.puck_owner_opt = None
             self.model.puck.set_free()
             self.model.puck.speed = Vec2d(0,0)
 
@@ -12,6 +12,8 @@ from hockey.core.player.base import Player
 
 class Defense(Player):
 
+    __slots__ = ()
+
     def __init__(self, hockey_world_model, brain: Brain):
         super().__init__("defense", hockey_world_model, brain)
 
@@ -10,6 +10,8 @@ from hockey.core.player.base import Player
 
 class Forward(Player):
 
+    __slots__ = ()
+
     def __init__(self, hockey_world_model, brain: Brain):
         super().__init__("forward", hockey_world_model, brain)
 
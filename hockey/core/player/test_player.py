@@ -1,4 +1,5 @@
 import math
+import tracemalloc
 import unittest
 from copy import copy
 from random import sample as randomsample
@@ -7,7 +8,9 @@ from geometry.angle import AngleInRadians
 from geometry.point import Point
 from geometry.vector import Vec2d, X_UNIT_VECTOR, Y_UNIT_VECTOR
 
+from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
 from hockey.core.ice_surface.half_rink import HockeyHalfRink
+from hockey.core.ice_surface.no_obstacles import IceNxN
 
 
 class TestBasePlayer(unittest.TestCase):
@@ -178,3 +181,61 @@ class TestBasePlayer(unittest.TestCase):
     #     self.assertNotEqual(direction, Y_UNIT_VECTOR)
     #     self.assertTrue(direction.x > Y_UNIT_VECTOR.x, "direction = %s" % (direction))
     #     self.assertTrue(direction.y < Y_UNIT_VECTOR.y, "direction = %s" % (direction))
+
+
+class TestSensedQuantities(unittest.TestCase):
+    """Quantities a player senses are remembered until something they depend on changes."""
+
+    def setUp(self):
+        """Initialization"""
+        self.ice = IceNxN(width=6, height=6, how_many_defense=0, how_many_offense=1)
+        self.player = self.ice.attack[0]
+        self.ice.space.place_agent(self.ice.puck, pos=Point(3, 3))
+        self.ice.space.place_agent(self.player, pos=Point(1, 3))
+        self.player.set_looking_at_xy(1.0, 0.0)
+
+    def __fresh_values__(self):
+        return (self.ice.vector_to_puck(self.player.pos),
+                self.ice.angle_to_puck(self.player.pos, self.player.vector_looking_at()))
+
+    def test_same_as_world(self):
+        for (x, y) in [(1, 3), (3, 1), (5, 5), (3, 3)]:
+            self.ice.move_agent(self.player, Point(x, y))
+            for gaze in [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0)]:
+                self.player.set_looking_at_xy(*gaze)
+                self.player.can_see_puck() # (fills the cache)
+                self.assertEqual((self.player.vector_to_puck(), self.player.angle_to_puck()), self.__fresh_values__())
+
+    def test_forgets_when_puck_moves(self):
+        self.assertTrue(self.player.can_see_puck())
+        self.assertAlmostEqual(self.player.distance_to_puck_opt(), 2)
+        self.ice.space.place_agent(self.ice.puck, pos=Point(0, 3))
+        self.assertFalse(self.player.can_see_puck())
+        self.assertIsNone(self.player.distance_to_puck_opt())
+
+    def test_forgets_when_turning(self):
+        self.assertTrue(self.player.can_see_puck())
+        self.player.set_looking_at_xy(-1.0, 0.0)
+        self.assertFalse(self.player.can_see_puck())
+
+    def test_sensing_reuses_state(self):
+        """One state per player, refreshed in place: sensing doesn't allocate."""
+        state = self.player.sense()
+        self.assertIs(BitstringEnvironmentState.of(self.player.sense()), BitstringEnvironmentState.of(state))
+        self.ice.space.place_agent(self.ice.puck, pos=Point(4, 4))
+        self.assertIs(self.player.sense(), state)
+        self.assertEqual(state.puck_pos_opt, Point(4, 4))
+        how_many_senses = 1000
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for _ in range(how_many_senses):
+                BitstringEnvironmentState.of(self.player.sense())
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        not_tracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        allocations = sum(stat.count_diff for stat in
+                          after.filter_traces(not_tracemalloc).compare_to(before.filter_traces(not_tracemalloc), 'lineno'))
+        # (way less than an allocation per sensing: what is left is the interpreter's own bookkeeping)
+        self.assertLess(allocations / how_many_senses, 0.01)
@@ -1,21 +1,35 @@
+import math
 import numpy as np
-from util.base import INCHES_IN_FOOT
+from typing import Optional, Tuple
+from util.base import INCHES_IN_FOOT, FEET_IN_METER, GRAVITY_ACCELERATION
+from geometry.point import Point
 from geometry.vector import Vec2d
 from hockey.core.object_on_ice import ObjectOnIce
+from util.geometry import fast_vector
+from util.geometry.container import glide_into_walls, glided_distance, ticks_to_stop, ticks_to_wall
 
 class Puck(ObjectOnIce):
     """How does a Puck behave?"""
 
+    __slots__ = ('radius', 'is_taken', 'prob_of_goal', 'ticks_in_flight', 'next_event_opt', 'in_flight_opt')
+
     # KINETIC_FRICTION_COEF = 0.15 # from https://hypertextbook.com/facts/2004/GennaAbleman.shtml
     KINETIC_FRICTION_COEF = 0.07 # http://people.westminstercollege.edu/faculty/ccline/courses/resources/wp/proj/211-w-frictiondrag.pdf
 
     # Elasticity represents the loss of speed a particle experiences when it hits a boundary.
     ELASTICITY = 0.77 # inspired by http://www.petercollingridge.co.uk/book/export/html/6
 
+    # on every tick, friction takes this much speed from each axis (see Container.particle_move):
+    DECELERATION_PER_TICK = GRAVITY_ACCELERATION * KINETIC_FRICTION_COEF / FEET_IN_METER
+
     def __init__(self, hockey_world_model):
         # initially, the puck goes around randomly at low speed
         speeds = tuple(np.random.normal(loc=0.0, scale=5.0, size=2))
         self.radius = (3 * 1/INCHES_IN_FOOT)/2 # 3 inches of diameter, this many feet
+        # event-driven flight: ticks elapsed since 'pos' and 'speed' were last brought up to date.
+        self.ticks_in_flight = 0
+        self.next_event_opt = None # (cached) ticks to next event; see 'ticks_to_next_event'
+        self.in_flight_opt = None # (cached) ticks in flight, position and speed then; see '__in_flight__'
         super().__init__("puck",
                          hockey_world_model,
                          size=self.radius,
@@ -35,6 +49,124 @@ class Puck(ObjectOnIce):
     #                 print("Changing value of '%s' from %.2f to %.2f" % (name, self.__dict__[name], value))
     #     self.__dict__[name] = value
 
+    # Event-driven flight (see 'fly'): reading 'pos' or 'speed' of a puck in flight computes them, but doesn't move
+    # the puck on the space; that only happens when it lands (on an event, or when they are written).
+
+    @property
+    def pos(self) -> Optional[Point]:
+        if self.ticks_in_flight > 0:
+            return self.__in_flight__()[0]
+        return self._pos
+
+    @pos.setter
+    def pos(self, value: Optional[Point]):
+        if self.ticks_in_flight > 0:
+            self.__land__()
+        self.__forget_flight__()
+        ObjectOnIce.pos.fset(self, value)
+
+    @property
+    def speed(self) -> Vec2d:
+        if self.ticks_in_flight > 0:
+            return self.__in_flight__()[1]
+        return ObjectOnIce.speed.fget(self)
+
+    @speed.setter
+    def speed(self, value: Vec2d):
+        if self.ticks_in_flight > 0:
+            self.__land__()
+        self.__forget_flight__()
+        ObjectOnIce.speed.fset(self, value)
+
+    def speed_xy(self) -> Tuple[float, float]:
+        if self.ticks_in_flight > 0:
+            speed = self.__in_flight__()[1]
+            return (speed.x, speed.y)
+        return ObjectOnIce.speed_xy(self)
+
+    def set_speed_xy(self, speed_on_x: float, speed_on_y: float):
+        if self.ticks_in_flight > 0:
+            self.__land__()
+        self.__forget_flight__()
+        ObjectOnIce.set_speed_xy(self, speed_on_x, speed_on_y)
+
+    def __forget_flight__(self):
+        """Position or speed changed: next event and flight are computed again."""
+        self.next_event_opt = None
+        self.in_flight_opt = None
+
+    def __in_flight__(self) -> Tuple[Point, Vec2d]:
+        """Where the puck is now, and how fast it goes (computed once per tick in flight)."""
+        if (self.in_flight_opt is None) or (self.in_flight_opt[0] != self.ticks_in_flight):
+            self.in_flight_opt = (self.ticks_in_flight,) + self.__glide__(self.ticks_in_flight)
+        _, pt, speed = self.in_flight_opt
+        return (pt, speed)
+
+    def __glide__(self, ticks: int) -> Tuple[Point, Vec2d]:
+        """Where the puck is, and how fast it goes, after gliding freely for this many ticks from where it last landed."""
+        x, y = self._pos
+        speed_x, speed_y = ObjectOnIce.speed_xy(self)
+        new_x, new_speed_x = glide_into_walls(x, speed_x, self.DECELERATION_PER_TICK, ticks, min_valid=0, max_valid=self.container.width)
+        new_y, new_speed_y = glide_into_walls(y, speed_y, self.DECELERATION_PER_TICK, ticks, min_valid=0, max_valid=self.container.height)
+        return (Point(new_x, new_y), Vec2d(new_speed_x, new_speed_y))
+
+    def __land__(self):
+        """Brings position and speed up to date, and moves the puck there on the space."""
+        new_pt, new_speed = self.__in_flight__()
+        self.ticks_in_flight = 0 # (first, so reading 'pos' while moving the agent is not recursive)
+        self.__store_speed__(new_speed)
+        self.model.move_agent(self, new_pt) # (this also forgets about the flight)
+
+    def ticks_to_next_event(self) -> float:
+        """Ticks (since last landing) until the puck either stops, hits a wall or might be reached by a player. Might be infinite."""
+        if self.next_event_opt is None:
+            self.next_event_opt = self.__ticks_to_next_event__()
+        return self.next_event_opt
+
+    def __ticks_to_next_event__(self) -> float:
+        x, y = self._pos
+        speed_x, speed_y = ObjectOnIce.speed_xy(self)
+        return min(max(ticks_to_stop(speed_x, self.DECELERATION_PER_TICK), ticks_to_stop(speed_y, self.DECELERATION_PER_TICK)),
+                   ticks_to_wall(x, speed_x, self.DECELERATION_PER_TICK, min_valid=0, max_valid=self.container.width),
+                   ticks_to_wall(y, speed_y, self.DECELERATION_PER_TICK, min_valid=0, max_valid=self.container.height),
+                   self.__ticks_to_reach__())
+
+    def __ticks_to_reach__(self) -> float:
+        """
+        Ticks (since last landing) before which no player can have the puck within reach, even skating straight
+        at it as fast as a player can; so it might be earlier than the real thing, never later. Might be infinite.
+        """
+        x, y = self._pos
+        speed_x, speed_y = ObjectOnIce.speed_xy(self)
+        result = float("inf")
+        for player in self.model.defense + self.model.attack:
+            player_x, player_y = player.pos
+            gap = fast_vector.norm(player_x - x, player_y - y) - player.reach
+            player_speed = max(player.MAX_SPEED_SPRINTING, fast_vector.norm(*player.speed_xy()))
+            # how much the gap can shrink in this many ticks (one extra tick for the player: it might have moved since landing)
+            closing = lambda ticks: glided_distance(speed_x, self.DECELERATION_PER_TICK, ticks) + \
+                                    glided_distance(speed_y, self.DECELERATION_PER_TICK, ticks) + (ticks + 1) * player_speed
+            # smallest number of ticks that closes the gap: closing(low) < gap <= closing(high)
+            low, high = 0, max(1, math.ceil(gap / player_speed))
+            if closing(1) >= gap:
+                return 1
+            while high - low > 1:
+                middle = (low + high) // 2
+                if closing(middle) >= gap:
+                    high = middle
+                else:
+                    low = middle
+            result = min(result, high)
+        return result
+
+    def is_out_of_reach(self) -> bool:
+        """In flight, and no player can reach it yet (see '__ticks_to_reach__'); finding it out doesn't land the puck."""
+        return (self.ticks_in_flight > 0) and (self.ticks_in_flight < self.ticks_to_next_event())
+
+    def is_stopped(self) -> bool:
+        speed_x, speed_y = ObjectOnIce.speed_xy(self)
+        return (self.ticks_in_flight == 0) and (speed_x == 0) and (speed_y == 0)
+
     def move_around(self):
         self.move_by_bouncing_from_walls(
             for_how_long=1,
@@ -46,7 +178,26 @@ class Puck(ObjectOnIce):
         self.is_taken = False
         # self.prob_of_goal = 0.0
 
+    def fly(self):
+        """
+        One tick of event-driven flight: the puck is only moved on the space when it stops, hits a wall,
+        might be reached by a player or is pushed (its position or speed are written). Reading them in between
+        (players sensing it, for example) computes them without moving it.
+        """
+        if self.is_stopped():
+            return # a stopped puck stays where it is.
+        if not self.model.is_continuous():
+            # on a grid the position is rounded after every tick, so there is no shortcut:
+            self.move_around()
+            return
+        self.ticks_in_flight += 1
+        if self.ticks_in_flight >= self.ticks_to_next_event():
+            self.__land__()
+
     def step(self):
         # if the puck is taken it will move with the carrier
         if not self.is_taken:
-            self.move_around()
+            if self.model.event_driven_puck and (self.physics_row is None):
+                self.fly()
+            else:
+                self.move_around()
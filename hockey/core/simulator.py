@@ -6,9 +6,14 @@ from mesa import Model
 from pathlib import Path
 import os
 import time
+from typing import Optional
 
+from hockey.behaviour.core.brain_file import of_pickled_model
 from hockey.behaviour.core.hockey_scenario import LearnToPlayHockeyProblem
+from hockey.behaviour.core.population_index import indexed_model
 from hockey.core.folder_manager import FolderManager
+from hockey.core.persistence_policy import PersistencePolicy
+from util.background_writer import BackgroundWriter
 import xcs
 import logging
 from xcs.scenarios import ScenarioObserver
@@ -44,44 +49,81 @@ class MesaModelSimulator(Simulator):
     def step(self):
         self.model.step()
 
+def show_good_rules(model):
+    dict = {}
+    for rule in model:
+        dict[rule.action] = dict.get(rule.action, []) + [rule]
+    # print("Actions: %s" %  (dict.keys()))
+    dict.update((k, sorted(rule_list, key=lambda rule: rule.fitness, reverse=True)) for k, rule_list in dict.items())
+    print("Best rules: (only showing actions that have rules with fitness > 0.5")
+    for act, rule_list in dict.items():
+        good_rules = [r for r in rule_list if r.fitness > 0.5]
+        if len(good_rules) > 0:
+            print("Action %s: %d good rules: " % (act, len(good_rules)))
+            for rule in good_rules:
+                print("\t %s (fitness: %.2f, experience: %d, avg. reward: %.2f, error: %.2f)" % (rule.condition, rule.fitness, rule.experience, rule.average_reward, rule.error))
+
 class ScenarioSimulator(Simulator):
 
     def __init__(self,
                  xcs_scenario: LearnToPlayHockeyProblem,
-                 folder_manager: FolderManager):
+                 folder_manager: FolderManager,
+                 use_symmetry: bool = False,
+                 persistence_policy_opt: Optional[PersistencePolicy] = None):
+        """
+        If use_symmetry, players sense the canonical image of their situations (see SkatingIce.use_symmetry).
+        The brain stays in memory from one episode to the next; it is saved following 'persistence_policy_opt'
+        (by default: after every episode). Brains and evaluations are written in the background.
+        """
         Simulator.__init__(self)
         self.hockey_problem = xcs_scenario
         self.running = False
         self.folder_manager = folder_manager
+        self.persistence_policy = persistence_policy_opt or PersistencePolicy.every_episode()
+        self.model_opt = None # type: Optional[xcs.ClassifierSet]
+        self.episode = 0 # (index of the episode running, or about to)
+        self.writer = BackgroundWriter()
+        if use_symmetry:
+            self.hockey_problem.hockey_world.use_symmetry()
+        # (training and evaluation then look up what players sense, if their ice allows it)
+        if self.hockey_problem.hockey_world.use_sensing_table(self.folder_manager):
+            print("[ScenarioSimulator] Situations sensed by players are looked up on a precomputed table%s" %
+                  (" (canonical images only)" if use_symmetry else ""))
 
     def run_until_done(self):
         start_time = time.time()
-        while self.hockey_problem.hockey_world.running:
-            self.run()
-            self.hockey_problem.reset()
-            elapsed_time = time.time() - start_time
-            print("run_until_done -> time so far: %.2f secs. (minute %d)" % (elapsed_time, int(elapsed_time // 60)))
+        try:
+            while self.hockey_problem.hockey_world.running:
+                self.run()
+                self.hockey_problem.reset()
+                elapsed_time = time.time() - start_time
+                print("run_until_done -> time so far: %.2f secs. (minute %d)" % (elapsed_time, int(elapsed_time // 60)))
+        finally:
+            if self.persistence_policy.exiting():
+                self.save_model()
+            self.close()
         print("run_until_done -> DONE")
 
-    def run(self):
-        self.scenario = ScenarioObserver(self.hockey_problem)
-        def show_good_rules(model):
-            dict = {}
-            for rule in model:
-                dict[rule.action] = dict.get(rule.action, []) + [rule]
-            # print("Actions: %s" %  (dict.keys()))
-            dict.update((k, sorted(rule_list, key=lambda rule: rule.fitness, reverse=True)) for k, rule_list in dict.items())
-            print("Best rules: (only showing actions that have rules with fitness > 0.5")
-            for act, rule_list in dict.items():
-                good_rules = [r for r in rule_list if r.fitness > 0.5]
-                if len(good_rules) > 0:
-                    print("Action %s: %d good rules: " % (act, len(good_rules)))
-                    for rule in good_rules:
-                        print("\t %s (fitness: %.2f, experience: %d, avg. reward: %.2f, error: %.2f)" % (rule.condition, rule.fitness, rule.experience, rule.average_reward, rule.error))
-
-        self.running = True
-
-        logging.root.setLevel(logging.INFO)
+    def close(self):
+        """Waits for everything to be written."""
+        self.writer.close()
+
+    def save_model(self):
+        """Writes the brain as it is after the last episode run."""
+        assert self.model_opt is not None
+        full_brain_file_name = self.folder_manager.brain_file_name(episode=self.episode - 1, full=True)
+        print("Saving model into file '%s' (in the background)..." % (full_brain_file_name))
+        # (the model is pickled once, here; the writer turns that snapshot into the format that is quick to load)
+        snapshot = pickle.dumps(self.model_opt)
+        self.writer.write_bytes(full_brain_file_name, snapshot)
+        self.writer.write_bytes(self.folder_manager.compact_brain_file_name(episode=self.episode - 1, full=True),
+                                snapshot, transform_opt=of_pickled_model)
+        self.persistence_policy.saved(now=time.time())
+
+    def resident_model(self) -> xcs.ClassifierSet:
+        """The brain: created, or loaded from the newest brain file, the first time only."""
+        if self.model_opt is not None:
+            return self.model_opt
         algorithm = xcs.XCSAlgorithm()
 
         # # Default parameter settings in test()
@@ -98,15 +140,28 @@ class ScenarioSimulator(Simulator):
         load_from = self.folder_manager.newest_brain_file()
         if load_from is None:
             print("Creating new algorithm for scenario...")
-            model = algorithm.new_model(self.scenario)
+            model = indexed_model(algorithm.new_model(self.scenario))
         else:
             if not Path(load_from).is_file():
                 raise RuntimeError("File '%s' does not contain a brain" % (load_from))
             last_modified_str = time.ctime(os.stat(load_from).st_mtime)
             print("[Simulator.run] Loading model from file '%s' (last modified on %s)..." % (load_from, last_modified_str))
-            model = pickle.load(open(load_from, 'rb'))
+            with open(load_from, 'rb') as f:
+                model = indexed_model(pickle.load(f))
             show_good_rules(model)
         print("Loading/Creation Done")
+        self.model_opt = model
+        # (episodes go on from the newest brain on disk)
+        self.episode, _ = self.folder_manager.chose_brain_file_name()
+        self.persistence_policy.started(now=time.time())
+        return model
+
+    def run(self):
+        self.scenario = ScenarioObserver(self.hockey_problem)
+        self.running = True
+
+        logging.root.setLevel(logging.INFO)
+        model = self.resident_model()
 
         model.algorithm.exploration_probability = .1 # .25
         model.algorithm.crossover_probability = .25
@@ -124,17 +179,18 @@ class ScenarioSimulator(Simulator):
         # Get a quick list of the best classifiers discovered.
         # show_good_rules(model)
 
-        idx, full_brain_file_name = self.folder_manager.chose_brain_file_name()
-        # brain_file_name, full_brain_file_name = self.folder_manager.chose_brain_file_name()
-        print("Saving model into file '%s'..." % (full_brain_file_name))
-        pickle.dump(model, open(full_brain_file_name, 'wb'))
-        print("Saving Done")
+        idx = self.episode
+        self.episode += 1
+        if self.persistence_policy.episode_done(now=time.time()):
+            self.save_model()
 
+        # (the brain in memory is evaluated, whether it was saved or not)
         evaluator = Evaluator(player=self.hockey_problem.hockey_world.attack[0],
-                              load_from_full_file_name=full_brain_file_name,
+                              load_from_full_file_name=None,
                               total_number_of_actions=len(self.hockey_problem.possible_actions), steps_in_height=1,
-                              steps_in_widht=1)
-        if not evaluator.save_performances_to(full_file_name=self.folder_manager.brain_eval_file_name(episode=idx, full=True)):
+                              steps_in_widht=1,
+                              model_opt=model)
+        if not evaluator.save_performances_to(full_file_name=self.folder_manager.brain_eval_file_name(episode=idx, full=True), writer_opt=self.writer):
             print("PROBLEM saving performances to disk.")
 
 
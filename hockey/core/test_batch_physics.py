@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Testing of the batch (all agents at once) physics.
+
+"""
+
+import unittest
+
+from random import random
+from geometry.point import Point
+from geometry.vector import Vec2d
+
+from hockey.core.batch_physics import BatchPhysics
+from util.base import random_between
+from util.geometry.container import Container
+
+
+class TestBatchPhysics(unittest.TestCase):
+    """Testing batch physics against the container's (one particle at a time) physics."""
+
+    def setUp(self):
+        """Initialization"""
+        self.physics = BatchPhysics(width=99, height=84, capacity=2)
+        self.container = Container(height=84, width=99)
+
+    def test_grows(self):
+        rows = [self.physics.register(an_agent=None) for _ in range(5)]
+        self.assertEqual(rows, list(range(5)))
+        self.assertGreaterEqual(self.physics.positions.shape[0], 5)
+
+    def test_only_pending_move(self):
+        [self.physics.register(an_agent=None) for _ in range(3)]
+        self.physics.speeds[:3] = (3, 4)
+        self.physics.request_move(row=1, for_how_long=1)
+        rows, new_positions = self.physics.advance_pending()
+        self.assertEqual(rows.tolist(), [1])
+        self.assertEqual(new_positions.tolist(), [[3, 4]])
+        self.assertEqual(self.physics.headings[1].tolist(), [0.6, 0.8])
+        self.assertEqual(len(self.physics.pending_rows()), 0)
+
+    def test_same_as_container(self):
+        for _ in range(100):
+            row = self.physics.register(an_agent=None)
+            pos = Point(random() * 99, random() * 84)
+            speed = Vec2d(random_between(-20, 20), random_between(-20, 20))
+            friction = random() * 0.1
+            self.physics.positions[row] = (pos.x, pos.y)
+            self.physics.speeds[row] = (speed.x, speed.y)
+            self.physics.request_move(row, for_how_long=1, friction_constant_opt=friction)
+            _, new_positions = self.physics.advance_pending()
+            expected_pt, expected_speed = self.container.particle_move(
+                for_how_long=1, particle_diameter=0, particle_pos=pos,
+                particle_speed_vector=speed, friction_constant_opt=friction)
+            self.assertAlmostEqual(new_positions[0][0], expected_pt.x, places=5)
+            self.assertAlmostEqual(new_positions[0][1], expected_pt.y, places=5)
+            self.assertAlmostEqual(self.physics.speeds[row][0], expected_speed.x, places=5)
+            self.assertAlmostEqual(self.physics.speeds[row][1], expected_speed.y, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
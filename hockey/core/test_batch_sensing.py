@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Testing of the batch (all players at once) sensing.
+
+"""
+
+import math
+import unittest
+from random import Random
+
+import numpy as np
+
+from geometry.point import Point
+
+from hockey.behaviour.core.bitstring_environment_state import BitstringEnvironmentState
+from hockey.behaviour.core.sensing_plan import SensingPlan
+from hockey.core import batch_sensing
+from hockey.core.batch_sensing import DEFAULT_BITS
+from hockey.core.ice_surface.half_rink import HockeyHalfRink
+from util import backends
+from util.geometry import fast_vector
+
+
+class TestBatchSensing(unittest.TestCase):
+    """Testing batch sensing against the (one player at a time) sensing plans."""
+
+    BITS = DEFAULT_BITS + ['puck_to_my_left', 'puck_closer_than_20_feet', 'angle_to_puck_less_than_3pi_over_10',
+                           'can_see_goal_post_1', 'goal_post_2_closer_than_10_feet', 'goal_post_1_to_my_right']
+
+    def setUp(self):
+        """Initialization"""
+        self.rnd = Random(333)
+        self.half_ice_rink = HockeyHalfRink(width=8, height=6, how_many_defense=3, how_many_offense=3)
+        self.players = self.half_ice_rink.defense + self.half_ice_rink.attack
+
+    def test_default_bits(self):
+        self.assertEqual(DEFAULT_BITS, BitstringEnvironmentState.bit_fns)
+
+    def test_kernels_on_every_backend(self):
+        headings = np.array([fast_vector.from_angle(self.rnd.uniform(0, 2 * math.pi)) for _ in range(200)])
+        vectors = np.array([(self.rnd.uniform(-20, 20), self.rnd.uniform(-20, 20)) for _ in range(200)])
+        expected_norms = [math.hypot(x, y) for x, y in vectors]
+        expected_angles = [(math.atan2(y, x) - math.atan2(hy, hx)) % (2 * math.pi) for (x, y), (hx, hy) in zip(vectors, headings)]
+        for a_backend in backends.available():
+            np.testing.assert_allclose(backends.kernel('norms', a_backend)(vectors), expected_norms, rtol=1e-12)
+            np.testing.assert_allclose(backends.kernel('angles_from_headings', a_backend)(headings, vectors), expected_angles, atol=1e-12)
+        np.testing.assert_allclose(batch_sensing.__norms_loop__(vectors), expected_norms, rtol=1e-12)
+        np.testing.assert_allclose(batch_sensing.__angles_from_headings_loop__(headings, vectors), expected_angles, atol=1e-12)
+
+    def test_same_as_plans(self):
+        world = self.half_ice_rink
+        plan = SensingPlan(self.BITS)
+        for _ in range(100):
+            world.release_puck()
+            for an_agent in [world.puck] + self.players:
+                world.space.place_agent(an_agent, pos=Point(self.rnd.randint(0, world.width - 1), self.rnd.randint(0, world.height - 1)))
+            for player in self.players:
+                player.set_looking_at_xy(*[(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)][self.rnd.randint(0, 3)])
+                player.unable_to_play_puck_time = self.rnd.choice([0, 0, 0.5])
+            if self.rnd.random() < 0.5:
+                world.give_puck_to(self.rnd.choice(self.players))
+            bits = world.sense_players(bit_fns=self.BITS)
+            self.assertEqual(bits.shape, (len(self.players), len(self.BITS)))
+            for row, player in enumerate(self.players):
+                self.assertEqual(bits[row].tolist(), plan(me=player, puck_owner_opt=world.who_has_the_puck()))
+
+
+if __name__ == '__main__':
+    unittest.main()
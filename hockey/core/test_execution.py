@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Testing of the execution modes (checked, sampled, unchecked).
+
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from hockey.core.execution import ExecutionMode, ExecutionPolicy
+from hockey.core.ice_surface.no_obstacles import IceNxN
+from hockey.core.model import TIME_PER_FRAME
+
+
+class TestExecution(unittest.TestCase):
+    """Checking less must not change what is simulated."""
+
+    def __trajectories__(self, policy: ExecutionPolicy, batch_physics: bool, how_many_ticks: int = 50):
+        """Positions, speeds and headings of a seeded game, simulated by the world (see SkatingIce.step)."""
+        random.seed(333)
+        np.random.seed(333)
+        ice = IceNxN(width=10, height=8, how_many_defense=1, how_many_offense=2,
+                     batch_physics=batch_physics, execution_opt=policy)
+        ice.setup_run(one_step_in_seconds=TIME_PER_FRAME, collect_data_every_secs=1, record_this_many_minutes=1)
+        trajectories = []
+        for _ in range(how_many_ticks):
+            ice.step()
+            trajectories.append([(tuple(an_agent.pos), an_agent.speed_xy()) for an_agent in [ice.puck] + ice.attack + ice.defense] +
+                                [player.looking_at_xy() for player in ice.attack + ice.defense])
+        return trajectories
+
+    def test_policy(self):
+        self.assertTrue(all(ExecutionPolicy().checks(tick) for tick in range(20)))
+        self.assertFalse(any(ExecutionPolicy(mode=ExecutionMode.UNCHECKED).checks(tick) for tick in range(20)))
+        sampled = ExecutionPolicy.sampling(fraction_of_ticks=0.25)
+        self.assertEqual([tick for tick in range(10) if sampled.checks(tick)], [0, 4, 8])
+
+    def test_same_trajectories(self):
+        for batch_physics in [False, True]:
+            checked = self.__trajectories__(ExecutionPolicy(), batch_physics=batch_physics)
+            self.assertEqual(checked, self.__trajectories__(ExecutionPolicy.sampling(fraction_of_ticks=0.1), batch_physics=batch_physics))
+            self.assertEqual(checked, self.__trajectories__(ExecutionPolicy(mode=ExecutionMode.UNCHECKED), batch_physics=batch_physics))
+
+    def test_nothing_reported_when_unchecked(self):
+        random.seed(333)
+        ice = IceNxN(width=10, height=8, how_many_defense=1, how_many_offense=2,
+                     execution_opt=ExecutionPolicy(mode=ExecutionMode.UNCHECKED))
+        ice.setup_run(one_step_in_seconds=TIME_PER_FRAME, collect_data_every_secs=1, record_this_many_minutes=1)
+        for player in ice.attack + ice.defense:
+            player.last_action = "from another tick"
+        ice.step()
+        self.assertEqual([player.last_action for player in ice.attack + ice.defense], ["", "", ""])
+
+
+if __name__ == '__main__':
+    unittest.main()
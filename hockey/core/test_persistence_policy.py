@@ -0,0 +1,43 @@
+import unittest
+
+from hockey.core.persistence_policy import PersistencePolicy
+
+
+class TestPersistencePolicy(unittest.TestCase):
+
+    def run_episodes(self, policy: PersistencePolicy, seconds_per_episode: float, how_many: int):
+        """At which episodes the brain gets saved."""
+        policy.started(now=0.0)
+        saved_at = []
+        for episode in range(1, how_many + 1):
+            now = episode * seconds_per_episode
+            if policy.episode_done(now=now):
+                policy.saved(now=now)
+                saved_at.append(episode)
+        return saved_at
+
+    def test_every_n_episodes(self):
+        self.assertEqual(self.run_episodes(PersistencePolicy.every_episode(), 1.0, 3), [1, 2, 3])
+        policy = PersistencePolicy.every(3)
+        self.assertEqual(self.run_episodes(policy, 1.0, 10), [3, 6, 9])
+        self.assertTrue(policy.exiting()) # episode 10 isn't saved yet
+
+    def test_every_t_seconds(self):
+        self.assertEqual(self.run_episodes(PersistencePolicy.every_seconds(10), 4.0, 10), [3, 6, 9])
+
+    def test_only_on_exit(self):
+        policy = PersistencePolicy.only_on_exit()
+        self.assertFalse(policy.exiting())
+        self.assertEqual(self.run_episodes(policy, 100.0, 5), [])
+        self.assertTrue(policy.exiting())
+        self.assertFalse(PersistencePolicy(every_episodes_opt=None, on_exit=False).exiting())
+
+    def test_wrong_settings(self):
+        with self.assertRaises(ValueError):
+            PersistencePolicy(every_episodes_opt=0)
+        with self.assertRaises(ValueError):
+            PersistencePolicy(every_seconds_opt=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
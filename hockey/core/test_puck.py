@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Testing of the event-driven flight of the puck (see Puck.fly).
+
+"""
+
+import unittest
+
+from geometry.point import Point
+from geometry.vector import Vec2d
+
+from hockey.core.ice_surface.half_rink_continuous import HockeyHalfRinkContinuous
+from hockey.core.model import TIME_PER_FRAME
+
+
+class TestPuckFlight(unittest.TestCase):
+    """A puck flying by events is where a puck moved tick by tick is; it just moves less often on the space."""
+
+    def __ice__(self, event_driven_puck: bool, how_many_players: int = 0) -> HockeyHalfRinkContinuous:
+        ice = HockeyHalfRinkContinuous(how_many_defense=0, how_many_offense=how_many_players, one_step_in_seconds=TIME_PER_FRAME,
+                                       collect_data_every_secs=1, record_this_many_minutes=1, event_driven_puck=event_driven_puck)
+        ice.move_agent(ice.puck, Point(0.2, 1.5))
+        return ice
+
+    def test_same_flight(self):
+        ticking, flying = self.__ice__(event_driven_puck=False), self.__ice__(event_driven_puck=True)
+        for ice in [ticking, flying]:
+            ice.puck.speed = Vec2d(7, -3) # (rebounds on the walls)
+        for _ in range(40):
+            ticking.step()
+            flying.step()
+            self.assertAlmostEqual(ticking.puck.pos.x, flying.puck.pos.x, places=5)
+            self.assertAlmostEqual(ticking.puck.pos.y, flying.puck.pos.y, places=5)
+            self.assertAlmostEqual(ticking.puck.speed.x, flying.puck.speed.x, places=5)
+            self.assertAlmostEqual(ticking.puck.speed.y, flying.puck.speed.y, places=5)
+
+    def test_reading_does_not_land(self):
+        ice = self.__ice__(event_driven_puck=True)
+        puck = ice.puck
+        puck.speed = Vec2d(4.6, 0) # stops on tick 3, before the wall
+        ice.step()
+        self.assertEqual(puck.ticks_in_flight, 1)
+        self.assertGreater(puck.pos.x, 0.2)
+        self.assertEqual(puck.ticks_in_flight, 1) # (still in flight)
+        self.assertEqual(tuple(puck._pos), (0.2, 1.5)) # (where the space has it)
+        self.assertTrue(puck.is_out_of_reach())
+        for _ in range(2):
+            ice.step()
+        self.assertEqual(puck.ticks_in_flight, 0) # stopped: landed
+        self.assertTrue(puck.is_stopped())
+        self.assertAlmostEqual(puck._pos.x, puck.pos.x)
+
+    def test_lands_where_players_might_reach_it(self):
+        ice = self.__ice__(event_driven_puck=True, how_many_players=1)
+        ice.puck.speed = Vec2d(4.6, 0)
+        # (on such a small ice, a player skating full speed could be anywhere after one tick)
+        self.assertEqual(ice.puck.ticks_to_next_event(), 1)
+        ice.step()
+        self.assertEqual(ice.puck.ticks_in_flight, 0)
+        self.assertFalse(ice.puck.is_out_of_reach())
+
+
+if __name__ == '__main__':
+    unittest.main()
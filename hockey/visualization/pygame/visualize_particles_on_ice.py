@@ -97,7 +97,8 @@ def visualize(argv, ice_environment: SkatingIce, renderable_ice: Renderable):
         defenses_seen = 0
         attackers_seen = 0
         for idx, row in df_step.iterrows():
-            agent_id = row['AgentID']
+            # agents ids used to start with their kind; now the kind has its own column:
+            agent_id = row['kind'] if 'kind' in row else row['AgentID']
             the_pos = Point(x=row['pos_x'], y=row['pos_y'])
             the_speed = Point(x=row['speed_x'], y=row['speed_y'])
             v = Vec2d.origin_to(a_pt=the_speed)
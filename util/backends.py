@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Implementations ('backends') of the numeric kernels that dominate our profiles.
+
+Every kernel has a 'numpy' implementation. If numba can be imported, a kernel can also have a 'numba' one:
+a loop, compiled the first time it runs, that gives the same results. The numba backend is then selected
+by default; machines without numba keep using numpy. Callers look kernels up by name (see 'kernel'), so
+'use' switches all of them at once.
+
+"""
+
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMPY = 'numpy'
+NUMBA = 'numba'
+
+# backend -> kernel name -> implementation
+KERNELS = {NUMPY: {}, NUMBA: {}} # type: Dict[str, Dict[str, Callable]]
+
+__selected__ = NUMBA if numba is not None else NUMPY
+
+
+def register(name: str, backend: str = NUMPY):
+    """Decorator: the function implements kernel 'name' on 'backend'."""
+    def do_register(fn: Callable) -> Callable:
+        KERNELS[backend][name] = fn
+        return fn
+    return do_register
+
+def register_jit(name: str, loop_fn: Callable):
+    """'loop_fn', compiled, implements kernel 'name' on numba (if numba is there; otherwise nothing happens)."""
+    if numba is not None:
+        KERNELS[NUMBA][name] = numba.njit(loop_fn)
+
+def available() -> List[str]:
+    return [NUMPY] if numba is None else [NUMPY, NUMBA]
+
+def selected() -> str:
+    return __selected__
+
+def use(backend: str):
+    """Selects a backend for all kernels."""
+    global __selected__
+    if backend not in available():
+        raise ValueError("Backend '%s' is not available here (available: %s)" % (backend, available()))
+    __selected__ = backend
+
+def kernel(name: str, backend_opt: Optional[str] = None) -> Callable:
+    """Kernel 'name' on the selected backend (or on 'backend_opt'). Falls back to numpy's if that backend doesn't have it."""
+    return KERNELS[backend_opt or __selected__].get(name) or KERNELS[NUMPY][name]
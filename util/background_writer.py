@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Writes files on a thread of its own, so that whoever produces them (eg, a training loop) doesn't wait for the disk.
+
+What is to be written is pickled right away, when submitted: that is the snapshot, and the object can be modified
+afterwards. Turning a snapshot into what goes on disk (eg, another file format) can also be left to the writer.
+Files are written atomically (to a temporary file first, then renamed), so a reader never sees half of one.
+If writes pile up (more than 'max_pending'), submitting waits for the writer to catch up.
+
+"""
+
+import os
+import pickle
+import queue
+import tempfile
+import threading
+from typing import Any, Callable, Optional
+
+
+def write_atomically(full_file_name: str, data: bytes):
+    """Either the file has all of 'data', or it is as it was before."""
+    directory, file_name = os.path.split(os.path.abspath(full_file_name))
+    fd, tmp_file_name = tempfile.mkstemp(dir=directory, prefix=file_name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file_name, full_file_name)
+    except BaseException:
+        if os.path.exists(tmp_file_name):
+            os.remove(tmp_file_name)
+        raise
+
+
+class BackgroundWriter(object):
+
+    __STOP__ = None
+
+    def __init__(self, max_pending: int = 2):
+        if max_pending <= 0:
+            raise ValueError("A writer needs room for at least 1 pending file (got %d)" % (max_pending))
+        self.pending = queue.Queue(maxsize=max_pending) # type: queue.Queue
+        self.error_opt = None # type: Optional[BaseException]
+        self.files_written = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.__write_pending__, name="background-writer", daemon=True)
+        self.thread.start()
+
+    def __write_pending__(self):
+        while True:
+            item = self.pending.get()
+            try:
+                if item is BackgroundWriter.__STOP__:
+                    return
+                full_file_name, data, transform_opt = item
+                write_atomically(full_file_name, data if transform_opt is None else transform_opt(data))
+                self.files_written += 1
+            except BaseException as e:
+                self.error_opt = e
+            finally:
+                self.pending.task_done()
+
+    def __raise_if_failed__(self):
+        if self.error_opt is not None:
+            e, self.error_opt = self.error_opt, None
+            raise RuntimeError("Writing in the background failed: %s" % (e)) from e
+
+    def write(self, full_file_name: str, obj: Any):
+        """Pickles 'obj' now and writes it later. Waits if there are already 'max_pending' files to write."""
+        self.write_bytes(full_file_name, pickle.dumps(obj))
+
+    def write_bytes(self, full_file_name: str, data: bytes, transform_opt: Optional[Callable[[bytes], bytes]] = None):
+        """Writes 'data' later; if 'transform_opt' is given, what it returns for 'data' (computed by the writer)."""
+        if self.closed:
+            raise RuntimeError("Writer is closed (can't write '%s')" % (full_file_name))
+        self.__raise_if_failed__()
+        self.pending.put((full_file_name, data, transform_opt))
+
+    def flush(self):
+        """Waits until everything submitted is on disk."""
+        self.pending.join()
+        self.__raise_if_failed__()
+
+    def close(self):
+        """Writes everything pending, then stops the writer."""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(BackgroundWriter.__STOP__)
+        self.thread.join()
+        self.__raise_if_failed__()
+
+    def __enter__(self) -> 'BackgroundWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
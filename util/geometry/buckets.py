@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""Uniform grid of buckets over a continuous (rectangular) space.
+
+Each item lives in the bucket of the square cell that contains it; proximity queries only look
+at the cells that intersect the region asked for, instead of at every item.
+
+"""
+
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class BucketIndex(object):
+    """Items (anything hashable) indexed by their (x, y) position."""
+
+    def __init__(self, width: float, height: float, cell_size: float):
+        """
+        Args:
+            width: size of the space on X (positions are in [0, width]).
+            height: size of the space on Y (positions are in [0, height]).
+            cell_size: side of each bucket. Queries are fastest when it is about the usual query radius.
+        """
+        assert cell_size > 0
+        self.cell_size = cell_size
+        self.cells_x = max(1, int(math.ceil(width / cell_size)))
+        self.cells_y = max(1, int(math.ceil(height / cell_size)))
+        # bucket -> items in it. Dicts are used as (insertion-ordered) sets, so queries are deterministic:
+        self.buckets = {} # type: Dict[Tuple[int, int], Dict[Hashable, None]]
+        self.positions = {} # type: Dict[Hashable, Tuple[float, float]]
+        self.cell_of = {} # type: Dict[Hashable, Tuple[int, int]]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.positions
+
+    def __cell__(self, x: float, y: float) -> Tuple[int, int]:
+        """Cell containing a point; points outside of the space go to the closest border cell."""
+        cell_x = min(max(int(x // self.cell_size), 0), self.cells_x - 1)
+        cell_y = min(max(int(y // self.cell_size), 0), self.cells_y - 1)
+        return (cell_x, cell_y)
+
+    def add(self, item: Hashable, x: float, y: float):
+        """Adds an item; if it was already there, it is moved."""
+        if item in self.positions:
+            self.move(item, x, y)
+            return
+        cell = self.__cell__(x, y)
+        self.buckets.setdefault(cell, {})[item] = None
+        self.positions[item] = (x, y)
+        self.cell_of[item] = cell
+
+    def move(self, item: Hashable, x: float, y: float):
+        """Only touches the buckets if the item changes of cell."""
+        self.positions[item] = (x, y)
+        old_cell = self.cell_of[item]
+        new_cell = self.__cell__(x, y)
+        if new_cell != old_cell:
+            self.__remove_from_bucket__(item, old_cell)
+            self.buckets.setdefault(new_cell, {})[item] = None
+            self.cell_of[item] = new_cell
+
+    def remove(self, item: Hashable):
+        self.__remove_from_bucket__(item, self.cell_of.pop(item))
+        del self.positions[item]
+
+    def __remove_from_bucket__(self, item: Hashable, cell: Tuple[int, int]):
+        bucket = self.buckets[cell]
+        del bucket[item]
+        if len(bucket) == 0:
+            del self.buckets[cell]
+
+    def __items_in_ring__(self, cell_x: int, cell_y: int, ring: int) -> List[Hashable]:
+        """Items of the cells at (Chebyshev) distance 'ring' of a cell."""
+        result = []
+        for i in range(cell_x - ring, cell_x + ring + 1):
+            if not (0 <= i < self.cells_x):
+                continue
+            on_border_x = (i == cell_x - ring) or (i == cell_x + ring)
+            for j in range(cell_y - ring, cell_y + ring + 1):
+                if not (0 <= j < self.cells_y):
+                    continue
+                if on_border_x or (j == cell_y - ring) or (j == cell_y + ring):
+                    result.extend(self.buckets.get((i, j), ()))
+        return result
+
+    def within(self, x: float, y: float, radius: float) -> List[Hashable]:
+        """Items at distance <= radius of (x, y), in no particular order."""
+        min_x, min_y = self.__cell__(x - radius, y - radius)
+        max_x, max_y = self.__cell__(x + radius, y + radius)
+        radius_squared = radius * radius
+        result = []
+        for i in range(min_x, max_x + 1):
+            for j in range(min_y, max_y + 1):
+                for item in self.buckets.get((i, j), ()):
+                    item_x, item_y = self.positions[item]
+                    if (item_x - x) ** 2 + (item_y - y) ** 2 <= radius_squared:
+                        result.append(item)
+        return result
+
+    def nearest(self,
+                x: float,
+                y: float,
+                accept: Callable[[Hashable], bool] = lambda item: True,
+                max_radius_opt: Optional[float] = None) -> Optional[Hashable]:
+        """
+        Closest item to (x, y) among the accepted ones.
+
+        Args:
+            x, y: where from.
+            accept: only items for which this is True are considered.
+            max_radius_opt: if given, items further away than this are ignored.
+
+        Returns:
+            None if there is no (accepted) item; otherwise the closest one (any of them, on ties).
+
+        """
+        cell_x, cell_y = self.__cell__(x, y)
+        max_ring = max(self.cells_x, self.cells_y)
+        best, best_distance_squared = None, math.inf
+        for ring in range(max_ring + 1):
+            # every item on this ring (and on the ones after it) is at least this far:
+            lower_bound = max(0.0, (ring - 1) * self.cell_size)
+            if (best is not None) and (lower_bound ** 2 > best_distance_squared):
+                break
+            if (max_radius_opt is not None) and (lower_bound > max_radius_opt):
+                break
+            for item in self.__items_in_ring__(cell_x, cell_y, ring):
+                if not accept(item):
+                    continue
+                item_x, item_y = self.positions[item]
+                distance_squared = (item_x - x) ** 2 + (item_y - y) ** 2
+                if distance_squared < best_distance_squared:
+                    best, best_distance_squared = item, distance_squared
+        if (best is not None) and (max_radius_opt is not None) and (best_distance_squared > max_radius_opt ** 2):
+            return None
+        return best
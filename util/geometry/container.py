@@ -3,16 +3,185 @@
 
 """
 
+import math
 import numpy as np
 from typing import Optional, Tuple
 
 from geometry.point import Point
 from geometry.vector import Vec2d
+from util import backends
 from util.base import FEET_IN_METER, GRAVITY_ACCELERATION
 
 __author__ = "Luis Da Costa"
 __email__ = "dacosta.le@gmail.com"
 
+def fold_into_walls(position: float, displacement: float, min_valid: float, max_valid: float) -> Tuple[float, bool]:
+    """
+    Where does a particle end when it travels 'displacement' from 'position', rebounding on walls at
+    'min_valid' and 'max_valid'? Works for any number of rebounds, without iterating on them: the
+    trajectory is unfolded on a line where walls are every (max_valid - min_valid) units, and then folded back.
+    As in Container.handle_walls, landing exactly on a wall counts as a rebound.
+
+    Args:
+        position: current position, in [min_valid, max_valid].
+        displacement: signed distance travelled (ie, speed * time).
+        min_valid: position of the 'lower' wall.
+        max_valid: position of the 'upper' wall.
+
+    Returns:
+        The new position, and True if the direction of movement is flipped (ie, odd number of rebounds).
+
+    """
+    length = max_valid - min_valid
+    if length <= 0:
+        return (min_valid, False) # no room to move.
+    if displacement >= 0:
+        unfolded = position - min_valid + displacement
+        rebounds = math.floor(unfolded / length)
+        offset = unfolded - rebounds * length
+        new_position = min_valid + (offset if rebounds % 2 == 0 else length - offset)
+    else:
+        unfolded = max_valid - position - displacement
+        rebounds = math.floor(unfolded / length)
+        offset = unfolded - rebounds * length
+        new_position = max_valid - (offset if rebounds % 2 == 0 else length - offset)
+    return (new_position, rebounds % 2 == 1)
+
+
+def fold_into_walls_array(positions: np.ndarray,
+                          displacements: np.ndarray,
+                          min_valid,
+                          max_valid) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized version of 'fold_into_walls'. Walls can be scalars or arrays that broadcast with 'positions'.
+    Runs on the selected backend (see util.backends).
+
+    Returns:
+        The new positions, and a boolean array that is True where the direction of movement is flipped.
+
+    """
+    positions, displacements = np.broadcast_arrays(np.asarray(positions, dtype=float), np.asarray(displacements, dtype=float))
+    shape = positions.shape
+    as_flat = lambda values: np.ascontiguousarray(np.broadcast_to(np.asarray(values, dtype=float), shape)).reshape(-1)
+    new_positions, flipped = backends.kernel('fold_into_walls')(as_flat(positions), as_flat(displacements), as_flat(min_valid), as_flat(max_valid))
+    return (new_positions.reshape(shape), flipped.reshape(shape))
+
+
+@backends.register('fold_into_walls')
+def __fold_into_walls_numpy__(positions: np.ndarray,
+                              displacements: np.ndarray,
+                              min_valid: np.ndarray,
+                              max_valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """'fold_into_walls' on 1-d arrays (of the same length)."""
+    length = max_valid - min_valid
+    has_room = length > 0
+    safe_length = np.where(has_room, length, 1.0)
+    forward = displacements >= 0
+    # distance travelled from the wall we are moving away from:
+    unfolded = np.where(forward, positions - min_valid, max_valid - positions) + np.abs(displacements)
+    rebounds = np.floor(unfolded / safe_length)
+    offset = unfolded - rebounds * safe_length
+    odd = (rebounds % 2) == 1
+    from_wall = np.where(odd, safe_length - offset, offset)
+    new_positions = np.where(forward, min_valid + from_wall, max_valid - from_wall)
+    return (np.where(has_room, new_positions, min_valid), odd & has_room)
+
+def __fold_into_walls_loop__(positions: np.ndarray,
+                             displacements: np.ndarray,
+                             min_valid: np.ndarray,
+                             max_valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Same, one particle at a time (compiled by the numba backend)."""
+    new_positions = np.empty(positions.shape[0])
+    flipped = np.zeros(positions.shape[0], dtype=np.bool_)
+    for i in range(positions.shape[0]):
+        length = max_valid[i] - min_valid[i]
+        if length <= 0:
+            new_positions[i] = min_valid[i]
+            continue
+        if displacements[i] >= 0:
+            unfolded = positions[i] - min_valid[i] + abs(displacements[i])
+        else:
+            unfolded = max_valid[i] - positions[i] + abs(displacements[i])
+        rebounds = math.floor(unfolded / length)
+        offset = unfolded - rebounds * length
+        from_wall = offset if rebounds % 2 == 0 else length - offset
+        new_positions[i] = min_valid[i] + from_wall if displacements[i] >= 0 else max_valid[i] - from_wall
+        flipped[i] = rebounds % 2 == 1
+    return (new_positions, flipped)
+
+backends.register_jit('fold_into_walls', __fold_into_walls_loop__)
+
+
+def glide_into_walls(position: float,
+                     speed: float,
+                     deceleration: float,
+                     ticks: int,
+                     min_valid: float,
+                     max_valid: float) -> Tuple[float, float]:
+    """
+    Where is (and how fast goes) a particle after 'ticks' ticks, if on each tick its speed first loses
+    'deceleration' (until it stops) and then it moves for 1 time unit, rebounding on walls?
+    Same as calling Container.particle_move 'ticks' times (on 1 axis), without iterating.
+
+    Returns:
+        New position and new speed.
+
+    """
+    magnitude = abs(speed)
+    distance = glided_distance(speed, deceleration, ticks)
+    direction = -1 if speed < 0 else 1
+    new_position, flipped = fold_into_walls(position, direction * distance, min_valid, max_valid)
+    new_magnitude = max(0.0, magnitude - deceleration * ticks)
+    return (new_position, (-direction if flipped else direction) * new_magnitude)
+
+
+def glided_distance(speed: float, deceleration: float, ticks: int) -> float:
+    """How far (along its way, rebounds included) does a particle decelerating as in 'glide_into_walls' go in 'ticks' ticks?"""
+    magnitude = abs(speed)
+    if deceleration > 0:
+        moving_ticks = min(ticks, math.floor(magnitude / deceleration))
+    else:
+        moving_ticks = ticks
+    # arithmetic series: on tick 'k' the particle travels (magnitude - k * deceleration)
+    return moving_ticks * magnitude - deceleration * moving_ticks * (moving_ticks + 1) / 2
+
+
+def ticks_to_stop(speed: float, deceleration: float) -> float:
+    """After how many ticks is a particle (decelerating as in 'glide_into_walls') stopped? Might be infinite."""
+    if speed == 0:
+        return 0
+    if deceleration <= 0:
+        return float("inf")
+    return math.ceil(abs(speed) / deceleration)
+
+
+def ticks_to_wall(position: float,
+                  speed: float,
+                  deceleration: float,
+                  min_valid: float,
+                  max_valid: float) -> float:
+    """On which tick (at least 1) does a particle (decelerating as in 'glide_into_walls') reach a wall? Might be never (infinite)."""
+    magnitude = abs(speed)
+    if magnitude == 0:
+        return float("inf")
+    distance = (max_valid - position) if speed > 0 else (position - min_valid)
+    if deceleration <= 0:
+        return max(1, math.ceil(distance / magnitude))
+    travelled = lambda ticks: ticks * magnitude - deceleration * ticks * (ticks + 1) / 2
+    last_moving_tick = math.floor(magnitude / deceleration)
+    if travelled(last_moving_tick) < distance:
+        return float("inf") # stops before
+    # smallest 'ticks' such that travelled(ticks) >= distance:
+    b = magnitude - deceleration / 2
+    ticks = max(1, math.ceil((b - math.sqrt(max(0.0, b * b - 2 * deceleration * distance))) / deceleration))
+    # (protect against rounding errors)
+    while travelled(ticks) < distance:
+        ticks += 1
+    while (ticks > 1) and (travelled(ticks - 1) >= distance):
+        ticks -= 1
+    return ticks
+
+
 class Container(object):
 
     def __init__(self, height: float, width: float):
@@ -41,59 +210,18 @@ class Container(object):
             curr_speed: 
             min_value: 
             max_value: 
-            goal_on_max: 
 
         Returns:
+            New position and new speed (any number of rebounds is handled, see 'fold_into_walls').
 
         """
-        # some definitions
         half_size = particle_diameter / 2
-        min_valid_position = min_value + half_size
-        max_valid_position = max_value - half_size
-        #
-        new_position = curr_position + curr_speed * length_of_movement
-        new_speed = curr_speed
-        if new_position <= min_valid_position:
-            new_position = 2 * min_valid_position - new_position
-            new_speed *= -1
-        elif new_position >= max_valid_position:
-            # formula is: (max_value - self.size) - (new_position - (max_value - self.size))
-            new_position = 2 * max_valid_position - new_position
-            new_speed *= -1
-
-        # print("initial position = %.2f, new_position = %.2f, min_valid_position: %.2f, max_valid_position = %.2f" % (curr_position, new_position, min_valid_position, max_valid_position))
-        if new_position >= min_valid_position and new_position <= max_valid_position:
-            # all good
-            return (new_position, new_speed)
-        else:
-            # rebounding again!
-            if new_position <= min_valid_position:
-                # distance travelled by the particle
-                d = (max_valid_position - curr_position + 1) + (max_valid_position - min_valid_position)
-                # time it took to travel:
-                t = abs(d / curr_speed)
-                # print("\tTravelled a distance of %.2f in %.2f time units" % (d, t))
-                # so let's make it rebound again!
-                return self.handle_walls(length_of_movement = length_of_movement - t,
-                     particle_diameter = particle_diameter,
-                     curr_position = min_valid_position,
-                     curr_speed = new_speed,
-                     min_value = min_value,
-                     max_value = max_value)
-            elif new_position >= max_valid_position:
-                # print("new_position >= max_valid_position")
-                # distance travelled by the particle
-                d = (curr_position - min_valid_position + 1) + (max_valid_position - min_valid_position)
-                # time it took to travel:
-                t = abs(d / curr_speed)
-                # print("\tTravelled a distance of %.2f in %.2f time units" % (d, t))
-                # so let's make it rebound again!
-                return self.handle_walls(length_of_movement = length_of_movement - t,
-                     particle_diameter = particle_diameter,
-                     curr_position = max_valid_position,
-                     curr_speed = new_speed,
-                     min_value = min_value,
-                     max_value = max_value)
+        new_position, flipped = fold_into_walls(
+            position=curr_position,
+            displacement=curr_speed * length_of_movement,
+            min_valid=min_value + half_size,
+            max_valid=max_value - half_size)
+        return (new_position, -curr_speed if flipped else curr_speed)
 
     # was: move_by_bouncing_from_walls
     def particle_move(self,
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""2D vectors as plain floats.
+
+Same operations as geometry.vector.Vec2d, but on (x, y) tuples of floats: nothing is allocated
+except the resulting tuple. Meant for hot paths; build Vec2d's only when handing results to the outside world.
+
+"""
+
+import math
+from typing import Tuple
+
+TWO_PI = 2 * math.pi
+
+XY = Tuple[float, float]
+
+
+def norm(x: float, y: float) -> float:
+    return math.hypot(x, y)
+
+def normalized(x: float, y: float) -> XY:
+    """Unit vector with the same direction; the null vector stays null."""
+    n = math.hypot(x, y)
+    if n == 0:
+        return (0.0, 0.0)
+    return (x / n, y / n)
+
+def scaled_to_norm(x: float, y: float, new_norm: float) -> XY:
+    n = math.hypot(x, y)
+    if n == 0:
+        return (0.0, 0.0)
+    factor = new_norm / n
+    return (x * factor, y * factor)
+
+def rotated(x: float, y: float, cos_angle: float, sin_angle: float) -> XY:
+    """Counter-clockwise rotation, with cosine and sine of the angle already computed."""
+    return (x * cos_angle - y * sin_angle, x * sin_angle + y * cos_angle)
+
+def rotated_radians(x: float, y: float, radians: float) -> XY:
+    """Counter-clockwise rotation."""
+    return rotated(x, y, math.cos(radians), math.sin(radians))
+
+def from_angle(radians: float) -> XY:
+    """Unit vector making this angle with the positive 'x' axis."""
+    return (math.cos(radians), math.sin(radians))
+
+def angle_with_positive_x_axis(x: float, y: float) -> float:
+    """In [0, 2Pi)."""
+    angle = math.atan2(y, x)
+    return angle + TWO_PI if angle < 0 else angle
+
+def almost_equal(x1: float, y1: float, x2: float, y2: float, tolerance: float) -> bool:
+    """True if both coordinates are within 'tolerance' of each other."""
+    return (abs(x1 - x2) <= tolerance) and (abs(y1 - y2) <= tolerance)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Where is a vector, seen from a heading? Answered with signs of dot and cross products (no angles).
+
+Same answers as comparing 'heading.angle_to(vector)' (counter-clockwise, in [0, 2Pi)) with Pi/2, 3Pi/2, etc;
+vectors within TOLERANCE (radians) of the limits of the field of vision are seen, as they are with angles.
+The null vector has no direction: it is not in front (nor to the right, nor straight ahead).
+Scalars are plain floats; array variants take (n, 2) arrays of headings and of vectors.
+
+"""
+
+import math
+import numpy as np
+
+# (about the angle that a dot product of 'TOLERANCE * |heading| * |vector|' represents)
+TOLERANCE = 1e-9
+TAN_PI_OVER_10 = math.tan(math.pi / 10)
+# 'round(d, 3) <= round(reach, 3)', on squares:
+REACH_ROUNDING = 5e-4
+
+
+def dot(ax: float, ay: float, bx: float, by: float) -> float:
+    return ax * bx + ay * by
+
+def cross(ax: float, ay: float, bx: float, by: float) -> float:
+    """Positive if b is counter-clockwise from a (ie, at its left)."""
+    return ax * by - ay * bx
+
+def in_front(heading_x: float, heading_y: float, x: float, y: float) -> bool:
+    """Angle from heading to vector in [0, Pi/2] or in [3Pi/2, 2Pi): can I see it?"""
+    size = abs(x) + abs(y)
+    return (size > 0) and (dot(heading_x, heading_y, x, y) >= -TOLERANCE * (abs(heading_x) + abs(heading_y)) * size)
+
+def to_the_right(heading_x: float, heading_y: float, x: float, y: float) -> bool:
+    """Angle from heading to vector in (Pi, 2Pi)."""
+    return cross(heading_x, heading_y, x, y) < 0
+
+def straight_ahead(heading_x: float, heading_y: float, x: float, y: float, tan_half_angle: float = TAN_PI_OVER_10) -> bool:
+    """Vector in a cone around the heading (by default: of Pi/10 on each side). Half angle has to be < Pi/2."""
+    d = dot(heading_x, heading_y, x, y)
+    c = cross(heading_x, heading_y, x, y)
+    return (d > 0) and (c * c <= (tan_half_angle * d) ** 2)
+
+def squared_reach(reach: float) -> float:
+    return (round(reach, 3) + REACH_ROUNDING) ** 2
+
+def within_reach(heading_x: float, heading_y: float, x: float, y: float, reach: float) -> bool:
+    """In front, and not further than 'reach'."""
+    return (x * x + y * y < squared_reach(reach)) and in_front(heading_x, heading_y, x, y)
+
+
+# on arrays:
+
+def in_front_array(headings: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    dots = (headings * vectors).sum(axis=1)
+    sizes = np.abs(vectors).sum(axis=1)
+    return (sizes > 0) & (dots >= -TOLERANCE * np.abs(headings).sum(axis=1) * sizes)
+
+def to_the_right_array(headings: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    return (headings[:, 0] * vectors[:, 1] - headings[:, 1] * vectors[:, 0]) < 0
+
+def straight_ahead_array(headings: np.ndarray, vectors: np.ndarray, tan_half_angle: float = TAN_PI_OVER_10) -> np.ndarray:
+    dots = (headings * vectors).sum(axis=1)
+    crosses = headings[:, 0] * vectors[:, 1] - headings[:, 1] * vectors[:, 0]
+    return (dots > 0) & (crosses * crosses <= (tan_half_angle * dots) ** 2)
+
+def within_reach_array(headings: np.ndarray, vectors: np.ndarray, reaches: np.ndarray) -> np.ndarray:
+    squared_reaches = (np.round(reaches, 3) + REACH_ROUNDING) ** 2
+    return ((vectors * vectors).sum(axis=1) < squared_reaches) & in_front_array(headings, vectors)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Testing of the buckets (spatial index) against brute force.
+
+"""
+
+import unittest
+
+import math
+from random import Random
+
+from util.geometry.buckets import BucketIndex
+
+
+class TestBuckets(unittest.TestCase):
+    """Index has to answer exactly what a scan of all items answers."""
+
+    def setUp(self):
+        """Initialization"""
+        self.rnd = Random(333)
+        self.index = BucketIndex(width=100, height=85, cell_size=7)
+        self.positions = {}
+        for item in range(200):
+            self.positions[item] = (self.rnd.random() * 100, self.rnd.random() * 85)
+            self.index.add(item, *self.positions[item])
+
+    def __distance__(self, item, x, y):
+        item_x, item_y = self.positions[item]
+        return math.hypot(item_x - x, item_y - y)
+
+    def test_moves_and_removals(self):
+        for item in range(0, 200, 3):
+            self.positions[item] = (self.rnd.random() * 100, self.rnd.random() * 85)
+            self.index.move(item, *self.positions[item])
+        for item in range(0, 200, 7):
+            del self.positions[item]
+            self.index.remove(item)
+        self.assertEqual(len(self.index), len(self.positions))
+        self.assertEqual(sum(len(bucket) for bucket in self.index.buckets.values()), len(self.positions))
+        self.test_within()
+
+    def test_within(self):
+        for _ in range(50):
+            x, y, radius = self.rnd.random() * 100, self.rnd.random() * 85, self.rnd.random() * 30
+            expected = sorted(item for item in self.positions if self.__distance__(item, x, y) <= radius)
+            self.assertEqual(sorted(self.index.within(x, y, radius)), expected)
+
+    def test_nearest(self):
+        for _ in range(50):
+            x, y = self.rnd.random() * 120 - 10, self.rnd.random() * 100 - 10
+            even = lambda item: item % 2 == 0
+            expected = min((item for item in self.positions if even(item)), key=lambda item: self.__distance__(item, x, y))
+            found = self.index.nearest(x, y, accept=even)
+            self.assertAlmostEqual(self.__distance__(found, x, y), self.__distance__(expected, x, y))
+        self.assertIsNone(self.index.nearest(50, 40, accept=lambda item: False))
+        self.assertIsNone(BucketIndex(width=10, height=10, cell_size=1).nearest(5, 5))
+
+    def test_nearest_within_radius(self):
+        index = BucketIndex(width=10, height=10, cell_size=1)
+        index.add("far", 9, 9)
+        self.assertIsNone(index.nearest(0, 0, max_radius_opt=5))
+        self.assertEqual(index.nearest(0, 0, max_radius_opt=13), "far")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,14 +6,32 @@
 import unittest
 
 import math
+import numpy as np
 from random import randint, random
 from geometry.point import Point
 from geometry.vector import Vec2d
-from util.geometry.container import Container
-from util.base import random_between
+from util import backends
+from util.geometry import container
+from util.geometry.container import Container, fold_into_walls, fold_into_walls_array, glide_into_walls, glided_distance, \
+    ticks_to_stop, ticks_to_wall
+from util.base import random_between, FEET_IN_METER, GRAVITY_ACCELERATION
 
 from util.geometry.lines import StraightLine
 
+def rebound_by_rebound(position: float, displacement: float, min_valid: float, max_valid: float):
+    """Reference: follows the particle from wall to wall. Returns new position and whether direction flipped."""
+    flips = 0
+    while True:
+        if displacement >= 0 and position + displacement >= max_valid:
+            displacement = -(position + displacement - max_valid)
+            position = max_valid
+        elif displacement < 0 and position + displacement <= min_valid:
+            displacement = min_valid - (position + displacement)
+            position = min_valid
+        else:
+            return (position + displacement, flips % 2 == 1)
+        flips += 1
+
 class TestContainer(unittest.TestCase):
     """Testing particles moving on a container."""
 
@@ -120,5 +138,111 @@ class TestContainer(unittest.TestCase):
                 # 'x' coordinates maintain certain consistency:
                 self.assertTrue((new_pt.x - initial_pos.x) * (new_speed.x) > 0, msg = conds_msg)
 
+    def test_fold_one_rebound(self):
+        """With (at most) 1 rebound, results are the ones of the original formula."""
+        for _ in range(200):
+            min_valid, max_valid = 0.5, 84.5
+            position = random_between(min_valid, max_valid)
+            displacement = random_between(-(max_valid - min_valid), max_valid - min_valid)
+            new_position = position + displacement
+            if new_position <= min_valid:
+                expected = (2 * min_valid - new_position, True)
+            elif new_position >= max_valid:
+                expected = (2 * max_valid - new_position, True)
+            else:
+                expected = (new_position, False)
+            if not (min_valid <= expected[0] <= max_valid):
+                continue # more than 1 rebound
+            result = fold_into_walls(position, displacement, min_valid, max_valid)
+            self.assertAlmostEqual(result[0], expected[0])
+            self.assertEqual(result[1], expected[1])
+
+    def test_fold_many_rebounds(self):
+        for _ in range(500):
+            min_valid = random_between(-5, 5)
+            max_valid = min_valid + random_between(0.5, 10)
+            position = random_between(min_valid, max_valid)
+            displacement = random_between(-200, 200)
+            new_position, flipped = fold_into_walls(position, displacement, min_valid, max_valid)
+            expected_position, expected_flipped = rebound_by_rebound(position, displacement, min_valid, max_valid)
+            msg = "from %.4f, moving %.4f, walls on [%.4f, %.4f]" % (position, displacement, min_valid, max_valid)
+            self.assertAlmostEqual(new_position, expected_position, places=6, msg=msg)
+            self.assertEqual(flipped, expected_flipped, msg=msg)
+
+    def test_fold_exact_cases(self):
+        self.assertEqual(fold_into_walls(3, 1, 0, 4), (4, True)) # landing on a wall is a rebound
+        self.assertEqual(fold_into_walls(0, -1, 0, 4), (1, True))
+        self.assertEqual(fold_into_walls(1, 8, 0, 4), (1, False))
+        self.assertEqual(fold_into_walls(1, -10, 0, 4), (1, True))
+        self.assertEqual(fold_into_walls(2, 0, 0, 4), (2, False))
+
+    def test_fold_array_same_as_scalar(self):
+        positions = [random_between(0, 4) for _ in range(100)]
+        displacements = [random_between(-50, 50) for _ in range(100)]
+        new_positions, flipped = fold_into_walls_array(np.array(positions), np.array(displacements), 0, 4)
+        for i in range(100):
+            expected_position, expected_flipped = fold_into_walls(positions[i], displacements[i], 0, 4)
+            self.assertAlmostEqual(new_positions[i], expected_position)
+            self.assertEqual(bool(flipped[i]), expected_flipped)
+
+    def test_fold_on_every_backend(self):
+        n = 200
+        positions = np.array([random_between(0, 4) for _ in range(n)])
+        displacements = np.array([random_between(-50, 50) for _ in range(n)])
+        min_valid = np.zeros(n)
+        max_valid = np.array([4.0] * (n - 1) + [0.0]) # (last one: no room to move)
+        expected = [fold_into_walls(positions[i], displacements[i], min_valid[i], max_valid[i]) for i in range(n)]
+        for fold_fn in [backends.kernel('fold_into_walls', a_backend) for a_backend in backends.available()] + \
+                       [container.__fold_into_walls_loop__]:
+            new_positions, flipped = fold_fn(positions, displacements, min_valid, max_valid)
+            for i in range(n):
+                self.assertAlmostEqual(new_positions[i], expected[i][0], places=9)
+                self.assertEqual(bool(flipped[i]), expected[i][1])
+
+    def test_fast_particle_on_small_container(self):
+        """A shot on a tiny rink, for a long time: many rebounds, no recursion."""
+        container = Container(height=4, width=4)
+        new_pt, new_speed = container.particle_move(
+            for_how_long=100, particle_diameter=0, particle_pos=Point(1, 2),
+            particle_speed_vector=Vec2d(161, -97), friction_constant_opt=None)
+        self.assertTrue(0 <= new_pt.x <= 4 and 0 <= new_pt.y <= 4, msg="got to %s" % (new_pt))
+        self.assertAlmostEqual(abs(new_speed.x), 161)
+        self.assertAlmostEqual(abs(new_speed.y), 97)
+
+    def test_glide_same_as_ticking(self):
+        """Gliding for many ticks at once ends where moving tick by tick (with friction) does."""
+        container = Container(height=30, width=40)
+        friction = 0.07
+        deceleration = GRAVITY_ACCELERATION * friction / FEET_IN_METER
+        for _ in range(50):
+            pos = Point(random_between(0, 40), random_between(0, 30))
+            speed = Vec2d(random_between(-20, 20), random_between(-20, 20))
+            ticks = randint(0, 100)
+            new_x, new_speed_x = glide_into_walls(pos.x, speed.x, deceleration, ticks, min_valid=0, max_valid=40)
+            new_y, new_speed_y = glide_into_walls(pos.y, speed.y, deceleration, ticks, min_valid=0, max_valid=30)
+            for _ in range(ticks):
+                pos, speed = container.particle_move(for_how_long=1, particle_diameter=0, particle_pos=pos,
+                                                     particle_speed_vector=speed, friction_constant_opt=friction)
+            self.assertAlmostEqual(new_x, pos.x, places=5)
+            self.assertAlmostEqual(new_y, pos.y, places=5)
+            self.assertAlmostEqual(new_speed_x, speed.x, places=5)
+            self.assertAlmostEqual(new_speed_y, speed.y, places=5)
 
+    def test_events(self):
+        self.assertEqual(ticks_to_stop(speed=0, deceleration=1), 0)
+        self.assertEqual(ticks_to_stop(speed=-2.5, deceleration=1), 3)
+        self.assertEqual(ticks_to_stop(speed=2.5, deceleration=0), float("inf"))
+        # travels 4, then 7 (4 + 3), then 9...
+        self.assertEqual(ticks_to_wall(position=1, speed=5, deceleration=1, min_valid=0, max_valid=8), 2)
+        self.assertEqual(ticks_to_wall(position=7, speed=-5, deceleration=1, min_valid=0, max_valid=8), 2)
+        self.assertEqual(ticks_to_wall(position=1, speed=5, deceleration=1, min_valid=0, max_valid=20), float("inf"))
+        self.assertEqual(ticks_to_wall(position=1, speed=2, deceleration=0, min_valid=0, max_valid=8), 4)
 
+    def test_glided_distance(self):
+        # travels 4, then 3, 2, 1 and stops:
+        self.assertEqual(glided_distance(speed=-5, deceleration=1, ticks=2), 7)
+        self.assertEqual(glided_distance(speed=5, deceleration=1, ticks=100), 10)
+        self.assertEqual(glided_distance(speed=2, deceleration=0, ticks=3), 6)
+        # (same as where it goes, if it doesn't hit a wall)
+        new_x, _ = glide_into_walls(1, 5, deceleration=1, ticks=2, min_valid=0, max_valid=100)
+        self.assertEqual(new_x - 1, glided_distance(speed=5, deceleration=1, ticks=2))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""Testing of 2D vectors on plain floats.
+
+"""
+
+import math
+import unittest
+
+from util.geometry import fast_vector
+
+
+class TestFastVector(unittest.TestCase):
+    """Testing vectors as plain floats."""
+
+    def test_rotation(self):
+        x, y = fast_vector.rotated_radians(1, 0, math.pi / 2)
+        self.assertAlmostEqual(x, 0)
+        self.assertAlmostEqual(y, 1) # counter-clockwise
+        x, y = fast_vector.rotated(3, 4, cos_angle=math.cos(-math.pi), sin_angle=math.sin(-math.pi))
+        self.assertAlmostEqual(x, -3)
+        self.assertAlmostEqual(y, -4)
+
+    def test_norms(self):
+        self.assertEqual(fast_vector.norm(3, 4), 5)
+        self.assertEqual(fast_vector.normalized(3, 4), (0.6, 0.8))
+        self.assertEqual(fast_vector.normalized(0, 0), (0.0, 0.0))
+        self.assertEqual(fast_vector.scaled_to_norm(3, 4, 10), (6, 8))
+
+    def test_angles(self):
+        for i in range(20):
+            angle = i * math.pi / 10
+            x, y = fast_vector.from_angle(angle)
+            self.assertAlmostEqual(fast_vector.angle_with_positive_x_axis(x, y) % (2 * math.pi), angle % (2 * math.pi))
+        self.assertAlmostEqual(fast_vector.angle_with_positive_x_axis(0, -1), 3 * math.pi / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
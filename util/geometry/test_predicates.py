@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Testing of predicates: same answers as with angles.
+
+"""
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from util.geometry import fast_vector, predicates
+
+
+def angle_from_to(heading, vector) -> float:
+    return (fast_vector.angle_with_positive_x_axis(*vector) - fast_vector.angle_with_positive_x_axis(*heading)) % (2 * math.pi)
+
+
+class TestPredicates(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(7)
+        grid = [(x, y) for x in range(-4, 5) for y in range(-4, 5) if (x, y) != (0, 0)]
+        self.headings = [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)] + \
+                        [fast_vector.from_angle(random.uniform(0, 2 * math.pi)) for _ in range(20)]
+        self.vectors = grid + [(random.uniform(-10, 10), random.uniform(-10, 10)) for _ in range(200)]
+
+    def test_same_as_angles(self):
+        for heading in self.headings:
+            for vector in self.vectors:
+                a = angle_from_to(heading, vector)
+                msg = "heading %s, vector %s (angle %.5f)" % (heading, vector, a)
+                if min(abs(a - math.pi / 2), abs(a - 3 * math.pi / 2)) > 1e-6:
+                    self.assertEqual(predicates.in_front(*heading, *vector), (a <= math.pi / 2) or (a >= 3 * math.pi / 2), msg=msg)
+                if min(a, abs(a - math.pi), 2 * math.pi - a) > 1e-6:
+                    self.assertEqual(predicates.to_the_right(*heading, *vector), a > math.pi, msg=msg)
+                if min(abs(a - math.pi / 10), abs(a - (2 * math.pi - math.pi / 10))) > 1e-6:
+                    self.assertEqual(predicates.straight_ahead(*heading, *vector),
+                                     (a <= math.pi / 10) or (a >= 2 * math.pi - math.pi / 10), msg=msg)
+
+    def test_limits_of_vision_are_seen(self):
+        self.assertTrue(predicates.in_front(0.0, 1.0, 3.0, 0.0))
+        self.assertTrue(predicates.in_front(0.0, 1.0, -3.0, 0.0))
+        self.assertFalse(predicates.in_front(0.0, 1.0, -3.0, -0.01))
+        self.assertFalse(predicates.in_front(0.0, 1.0, 0.0, 0.0))
+
+    def test_reach(self):
+        for vector in self.vectors:
+            d = fast_vector.norm(*vector)
+            if abs(d - 2.5) > 1e-3:
+                self.assertEqual(predicates.within_reach(1.0, 0.0, *vector, reach=2.5),
+                                 (round(d, 3) <= 2.5) and predicates.in_front(1.0, 0.0, *vector))
+        self.assertTrue(predicates.within_reach(0.0, 1.0, 1.0, 0.0, reach=1))
+
+    def test_arrays(self):
+        pairs = [(h, v) for h in self.headings for v in self.vectors]
+        headings = np.array([h for h, _ in pairs])
+        vectors = np.array([v for _, v in pairs], dtype=np.float64)
+        reaches = np.full(len(pairs), 2.5)
+        for array_fn, scalar_fn in [(predicates.in_front_array, predicates.in_front),
+                                    (predicates.to_the_right_array, predicates.to_the_right),
+                                    (predicates.straight_ahead_array, predicates.straight_ahead)]:
+            self.assertEqual(array_fn(headings, vectors).tolist(), [scalar_fn(*h, *v) for h, v in pairs])
+        self.assertEqual(predicates.within_reach_array(headings, vectors, reaches).tolist(),
+                         [predicates.within_reach(*h, *v, reach=2.5) for h, v in pairs])
+
+
+if __name__ == '__main__':
+    unittest.main()
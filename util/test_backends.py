@@ -0,0 +1,34 @@
+import unittest
+
+from util import backends
+
+
+class TestBackends(unittest.TestCase):
+    """Choosing where kernels run."""
+
+    def tearDown(self):
+        backends.use(backends.available()[-1])
+
+    def test_numpy_always_there(self):
+        self.assertIn(backends.NUMPY, backends.available())
+        backends.use(backends.NUMPY)
+        self.assertEqual(backends.selected(), backends.NUMPY)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            backends.use('not_a_backend')
+        if backends.numba is None:
+            with self.assertRaises(ValueError):
+                backends.use(backends.NUMBA)
+
+    def test_kernels_fall_back_to_numpy(self):
+        numpy_fn = backends.register('a_test_kernel')(lambda x: x + 1)
+        self.assertIs(backends.kernel('a_test_kernel', backends.NUMBA), numpy_fn)
+        backends.register_jit('a_test_kernel', lambda x: x + 1)
+        self.assertEqual(backends.kernel('a_test_kernel')(1), 2)
+        del backends.KERNELS[backends.NUMPY]['a_test_kernel']
+        backends.KERNELS[backends.NUMBA].pop('a_test_kernel', None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import pickle
+import tempfile
+import threading
+import unittest
+
+from util import background_writer
+from util.background_writer import BackgroundWriter, write_atomically
+
+
+class TestBackgroundWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Initialization"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def file_name(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_snapshots_written_on_close(self):
+        brain = {'rules': [1, 2]}
+        with BackgroundWriter(max_pending=1) as writer:
+            writer.write(self.file_name("brain_1.bin"), brain)
+            brain['rules'].append(3) # (after the snapshot)
+            writer.write(self.file_name("brain_2.bin"), brain)
+        with open(self.file_name("brain_1.bin"), 'rb') as f:
+            self.assertEqual(pickle.load(f), {'rules': [1, 2]})
+        with open(self.file_name("brain_2.bin"), 'rb') as f:
+            self.assertEqual(pickle.load(f), {'rules': [1, 2, 3]})
+        self.assertEqual(writer.files_written, 2)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["brain_1.bin", "brain_2.bin"]) # no temporary files left
+        with self.assertRaises(RuntimeError):
+            writer.write(self.file_name("brain_3.bin"), brain)
+
+    def test_transformed_by_the_writer(self):
+        transformed_on = []
+        def transform(data: bytes) -> bytes:
+            transformed_on.append(threading.current_thread())
+            return data.upper()
+        with BackgroundWriter() as writer:
+            writer.write_bytes(self.file_name("brain.txt"), b'rules', transform_opt=transform)
+        with open(self.file_name("brain.txt"), 'rb') as f:
+            self.assertEqual(f.read(), b'RULES')
+        self.assertEqual(transformed_on, [writer.thread]) # (not the caller's)
+
+    def test_back_pressure(self):
+        can_write = threading.Event()
+        actual_write = background_writer.write_atomically
+        def slow_write(full_file_name, data):
+            can_write.wait()
+            actual_write(full_file_name, data)
+        background_writer.write_atomically = slow_write
+        try:
+            writer = BackgroundWriter(max_pending=1)
+            writer.write(self.file_name("a.bin"), 'a') # being written
+            writer.write(self.file_name("b.bin"), 'b') # pending
+            third = threading.Thread(target=writer.write, args=(self.file_name("c.bin"), 'c'))
+            third.start()
+            third.join(timeout=0.2)
+            self.assertTrue(third.is_alive()) # waits for room
+            can_write.set()
+            third.join()
+            writer.close()
+        finally:
+            background_writer.write_atomically = actual_write
+        self.assertEqual(writer.files_written, 3)
+
+    def test_errors_are_reported(self):
+        writer = BackgroundWriter()
+        writer.write(self.file_name(os.path.join("no_such_dir", "brain.bin")), 'x')
+        with self.assertRaises(RuntimeError):
+            writer.flush()
+        writer.close()
+
+    def test_atomic_write_keeps_old_file_on_failure(self):
+        write_atomically(self.file_name("eval.csv"), b'old')
+        with self.assertRaises(TypeError):
+            write_atomically(self.file_name("eval.csv"), 'not bytes')
+        with open(self.file_name("eval.csv"), 'rb') as f:
+            self.assertEqual(f.read(), b'old')
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["eval.csv"])
+
+
+if __name__ == '__main__':
+    unittest.main()